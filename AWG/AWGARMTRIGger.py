@@ -1,20 +1,20 @@
 #import AWG modules
-from AWGConnection import AWG_connection
-from logger import awg_logger
+from AWGSession import AWG_session
 
 #import other libraries
 import time
 
 class AWG_ARM_TRIGger_Controller:
-    def __init__(self, ip_address):
+    def __init__(self, ip_address, session: AWG_session = None):
         self.ip_address = ip_address
 
-        #create insatces for connection and logger classes
-        self.connection = AWG_connection(ip_address)
-        self.log = awg_logger()
+        #share one session (connection, resource manager and logger) per instrument
+        self.session = session if session is not None else AWG_session(ip_address)
+        self.connection = self.session.connection
+        self.log = self.session.log
 
-        #select the recourse from connection class
-        self.resource = self.connection.get_resource()
+        #the session resolves the live resource lazily on every call
+        self.resource = self.session
 
     def set_abort(self):
         """
@@ -49,7 +49,7 @@ class AWG_ARM_TRIGger_Controller:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_module_delay()))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_module_delay)))
                 return {"Status": f"Module delay set to {delay_value}", "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(command, duration_ms=0, response=str(e))
@@ -70,7 +70,7 @@ class AWG_ARM_TRIGger_Controller:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response= str(self.get_module_delay()))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_module_delay)))
                 return {"Status": f"Module delay set to minimum", "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(command, duration_ms=0, response=str(e))
@@ -91,7 +91,7 @@ class AWG_ARM_TRIGger_Controller:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response= str(self.get_module_delay()))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_module_delay)))
                 return {"Status": f"Module delay set to maximum", "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(command, duration_ms=0, response=str(e))
@@ -134,7 +134,7 @@ class AWG_ARM_TRIGger_Controller:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                delay_query = self.get_sample_delay(channel)
+                delay_query = self.session.verify(command, self.get_sample_delay, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(delay_query))
                 return {
                     "Status": f"Sample delay for channel {channel} set to {delay_value}",
@@ -161,7 +161,7 @@ class AWG_ARM_TRIGger_Controller:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                delay_query = self.get_sample_delay(channel)
+                delay_query = self.session.verify(command, self.get_sample_delay, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(delay_query))
                 return {
                     "Status": f"Sample delay for channel {channel} set to MINimum",
@@ -188,7 +188,7 @@ class AWG_ARM_TRIGger_Controller:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                delay_query = self.get_sample_delay(channel)
+                delay_query = self.session.verify(command, self.get_sample_delay, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(delay_query))
                 return {
                     "Status": f"Sample delay for channel {channel} set to MAXimum",
@@ -198,7 +198,30 @@ class AWG_ARM_TRIGger_Controller:
                 self.log._log_command(command, duration_ms=0, response=str(e))
                 return {"Error": str(e)}
         return {"Error": "Device not connected"}
-        
+
+    def get_sample_delay(self, channel: int):
+        """
+        Query the sample delay of a specific channel.
+        Args:
+            channel (int): Channel number (1–4)
+        Returns:
+            dict: {"Channel": ..., "Delay": float_value, "Duration(ms)": ...} or {"Error": ...}
+        """
+        if self.resource:
+            if channel not in [1, 2, 3, 4]:
+                return {"Error": "Invalid channel. Must be 1, 2, 3, or 4."}
+            try:
+                command = f":ARM:SDEL{channel}?"
+                start_time = time.time()
+                response = self.resource.query(command)
+                duration = (time.time() - start_time) * 1000
+                self.log._log_command(command, duration_ms=duration, response=response.strip())
+                return {"Channel": channel, "Delay": float(response.strip()), "Duration(ms)": duration}
+            except Exception as e:
+                self.log._log_command(command, duration_ms=0, response=str(e))
+                return {"Error": str(e)}
+        return {"Error": "Device not connected"}
+
     def set_arming_mode(self, mode: str):
         """
         
@@ -216,7 +239,7 @@ class AWG_ARM_TRIGger_Controller:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                mode_query = self.get_arming_mode()
+                mode_query = self.session.verify(command, self.get_arming_mode)
                 self.log._log_command(command, duration_ms=duration, response=str(mode_query))
                 return {"Status": f"Arming mode set to {mode.upper()}", "Duration(ms)": duration}
             except Exception as e:
@@ -261,7 +284,7 @@ class AWG_ARM_TRIGger_Controller:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                cont_mode = self.get_continuous_mode()
+                cont_mode = self.session.verify(command, self.get_continuous_mode)
                 self.log._log_command(command, duration_ms=duration, response=str(cont_mode))
                 return {"Status": f"Continuous mode set to {valid_states[state_upper]}", "Duration(ms)": duration}
             except Exception as e:
@@ -307,7 +330,7 @@ class AWG_ARM_TRIGger_Controller:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                gate_mode = self.get_gate_mode()
+                gate_mode = self.session.verify(command, self.get_gate_mode)
                 self.log._log_command(command, duration_ms=duration, response=str(gate_mode))
                 return {"Status": f"Gate mode set to {valid_states[state_upper]}", "Duration(ms)": duration}
             except Exception as e:
@@ -375,7 +398,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                level_query = self.get_trigger_level()
+                level_query = self.session.verify(command, self.get_trigger_level)
                 self.log._log_command(command, duration_ms=duration, response=str(level_query))
                 return {
                     "Status": f"Trigger level set to {level_value}",
@@ -400,7 +423,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                level_query = self.get_trigger_level()
+                level_query = self.session.verify(command, self.get_trigger_level)
                 self.log._log_command(command, duration_ms=duration, response=str(level_query))
                 return {"Status": "Trigger level set to MINimum", "Duration(ms)": duration}
             except Exception as e:
@@ -422,7 +445,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                level_query = self.get_trigger_level()
+                level_query = self.session.verify(command, self.get_trigger_level)
                 self.log._log_command(command, duration_ms=duration, response=str(level_query))
                 return {"Status": "Trigger level set to MAXimum", "Duration(ms)": duration}
             except Exception as e:
@@ -472,7 +495,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                slope_query = self.get_trigger_slope()
+                slope_query = self.session.verify(command, self.get_trigger_slope)
                 self.log._log_command(command, duration_ms=duration, response=str(slope_query))
                 return {"Status": f"Trigger slope set to {slope_upper}", "Duration(ms)": duration}
             except Exception as e:
@@ -523,7 +546,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                source_query = self.get_trigger_source()
+                source_query = self.session.verify(command, self.get_trigger_source)
                 self.log._log_command(command, duration_ms=duration, response=str(source_query))
                 return {"Status": f"Trigger source set to {source_upper}", "Duration(ms)": duration}
             except Exception as e:
@@ -570,7 +593,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                freq_query = self.get_trigger_frequency()
+                freq_query = self.session.verify(command, self.get_trigger_frequency)
                 self.log._log_command(command, duration_ms=duration, response=str(freq_query))
                 return {"Status": f"Trigger frequency set to {frequency} Hz", "Duration(ms)": duration}
             except Exception as e:
@@ -592,7 +615,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                freq_query = self.get_trigger_frequency()
+                freq_query = self.session.verify(command, self.get_trigger_frequency)
                 self.log._log_command(command, duration_ms=duration, response=str(freq_query))
                 return {"Status": "Trigger frequency set to MINimum", "Duration(ms)": duration}
             except Exception as e:
@@ -614,7 +637,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                freq_query = self.get_trigger_frequency()
+                freq_query = self.session.verify(command, self.get_trigger_frequency)
                 self.log._log_command(command, duration_ms=duration, response=str(freq_query))
                 return {"Status": "Trigger frequency set to MAXimum", "Duration(ms)": duration}
             except Exception as e:
@@ -664,7 +687,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                mode_query = self.get_trigger_operation_mode()
+                mode_query = self.session.verify(command, self.get_trigger_operation_mode)
                 self.log._log_command(command, duration_ms=duration, response=str(mode_query))
                 return {"Status": f"Trigger operation mode set to {mode_upper}", "Duration(ms)": duration}
             except Exception as e:
@@ -711,7 +734,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_event_level()
+                response = self.session.verify(command, self.get_event_level)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": f"Event input level set to {level_value}", "Duration(ms)": duration}
             except Exception as e:
@@ -733,7 +756,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_event_level()
+                response = self.session.verify(command, self.get_event_level)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": "Event input level set to MINimum", "Duration(ms)": duration}
             except Exception as e:
@@ -755,7 +778,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_event_level()
+                response = self.session.verify(command, self.get_event_level)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": "Event input level set to MAXimum", "Duration(ms)": duration}
             except Exception as e:
@@ -806,7 +829,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_event_slope()
+                response = self.session.verify(command, self.get_event_slope)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": f"Event input slope set to {slope_upper}", "Duration(ms)": duration}
             except Exception as e:
@@ -857,7 +880,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_trigger_enable_source()
+                response = self.session.verify(command, self.get_trigger_enable_source)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": f"Enable source set to {source_upper}", "Duration(ms)": duration}
             except Exception as e:
@@ -908,7 +931,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_enable_hw_disable_state()
+                response = self.session.verify(command, self.get_enable_hw_disable_state)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": f"HW Disable set to {state_upper}", "Duration(ms)": duration}
             except Exception as e:
@@ -959,7 +982,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_trigger_hw_disable_state()
+                response = self.session.verify(command, self.get_trigger_hw_disable_state)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": f"Trigger HW disable state set to {state_upper}", "Duration(ms)": duration}
             except Exception as e:
@@ -1010,7 +1033,7 @@ class AWG_ARM_TRIGger_Controller:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_advance_hw_disable_state()
+                response = self.session.verify(command, self.get_advance_hw_disable_state)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": f"Advance HW disable state set to {state_upper}", "Duration(ms)": duration}
             except Exception as e:
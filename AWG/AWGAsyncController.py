@@ -0,0 +1,160 @@
+#import awg modules
+from AWGController import AWG_Controller
+from AWGBatch import MAX_MESSAGE_BYTES
+
+#import other modules
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+#Worker threads of the pool shared by all AsyncAWG_Controllers without their own executor
+SHARED_IO_WORKERS = 16
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def shared_io_executor() -> ThreadPoolExecutor:
+    """The I/O thread pool shared by all instruments (created on first use)."""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(max_workers=SHARED_IO_WORKERS, thread_name_prefix="awg-io")
+        return _shared_executor
+
+
+class AWG_instrument_executor(Executor):
+    """
+    View of a (possibly shared) executor that runs every call for one instrument under
+    that instrument's I/O lock, so a write/read pair is never interleaved with another
+    call on the same session, whichever worker thread runs it.
+    """
+
+    def __init__(self, executor: Executor, lock: threading.Lock):
+        self._executor = executor
+        self.lock = lock
+
+    def _locked(self, function, *args, **kwargs):
+        with self.lock:
+            return function(*args, **kwargs)
+
+    def submit(self, function, *args, **kwargs):
+        return self._executor.submit(self._locked, function, *args, **kwargs)
+
+
+class AWG_async_subsystem:
+    """
+    Awaitable view of one subsystem: every public method becomes a coroutine that runs
+    the blocking call on the controller's I/O executor.
+    """
+
+    def __init__(self, subsystem, controller):
+        self._subsystem = subsystem
+        self._controller = controller
+
+    def __getattr__(self, name):
+        attr = getattr(self._subsystem, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self._controller._run(attr, *args, **kwargs)
+
+        return method
+
+
+class AWG_async_batch:
+    """Async context manager around AWG_batch; enter and exit run on the I/O executor."""
+
+    def __init__(self, controller, max_message_bytes: int):
+        self._controller = controller
+        self._batch = controller.controller.batch(max_message_bytes)
+
+    async def __aenter__(self):
+        return await self._controller._run(self._batch.__enter__)
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return await self._controller._run(self._batch.__exit__, exc_type, exc_value, traceback)
+
+
+class AsyncAWG_Controller:
+    """
+    asyncio front end for AWG_Controller.
+
+    Blocking pyvisa I/O runs on a thread pool shared by all instruments (or on the given
+    `executor`), so a single event loop (e.g. the GUI loop) drives dozens of instruments
+    without a thread per instrument. Calls to the same instrument still run one at a
+    time and in order: they wait their turn on the event loop, and in the pool they hold
+    the instrument's I/O lock. Subsystems are exposed under the same attribute names as
+    on AWG_Controller, with awaitable methods:
+
+        awg = AsyncAWG_Controller("192.168.1.100")
+        await awg.connect()
+        await awg.output.set_output_state(1, True)
+        async with awg.batch():
+            await awg.VoltageSubsystem.set_output_voltage(1, 0.5)
+        await awg.close()
+
+    Other threads that talk to the same instrument (e.g. AWG_status_monitor.start) should
+    go through `io_executor`, which applies the same lock.
+    """
+
+    def __init__(self, ip_address: str, executor: Executor = None, **controller_options):
+        self.ip_address = ip_address
+        self.controller = AWG_Controller(ip_address, **controller_options)
+
+        # Shared worker threads; the per-instrument lock keeps each session's I/O serialized
+        self.io_executor = AWG_instrument_executor(executor if executor is not None else shared_io_executor(),
+                                                   threading.Lock())
+        # Created in the running loop on first use (see _order_lock)
+        self._order = None
+        self._order_loop = None
+
+        for name, subsystem in vars(self.controller).items():
+            if hasattr(subsystem, "resource") and name != "session":
+                setattr(self, name, AWG_async_subsystem(subsystem, self))
+        self.connection = AWG_async_subsystem(self.controller.connection, self)
+
+    def _order_lock(self) -> asyncio.Lock:
+        # Before Python 3.10 an asyncio.Lock binds to the loop current at construction, so
+        # it is created inside the running loop (again if the controller moves to a new loop)
+        loop = asyncio.get_running_loop()
+        if self._order_loop is not loop:
+            self._order = asyncio.Lock()
+            self._order_loop = loop
+        return self._order
+
+    async def _run(self, function, *args, **kwargs):
+        # Coroutines for this instrument queue here in FIFO order, so calls are never reordered
+        async with self._order_lock():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.io_executor, functools.partial(function, *args, **kwargs))
+
+    async def connect(self):
+        """Open the VISA connection on the I/O executor."""
+        return await self._run(self.controller.connection.connect)
+
+    async def disconnect(self):
+        """Close the VISA connection on the I/O executor."""
+        return await self._run(self.controller.connection.disconnect)
+
+    def batch(self, max_message_bytes: int = MAX_MESSAGE_BYTES):
+        """Async version of AWG_Controller.batch()."""
+        return AWG_async_batch(self, max_message_bytes)
+
+    async def flush_verifications(self):
+        return await self._run(self.controller.flush_verifications)
+
+    async def close(self):
+        """Disconnect; the I/O threads stay available to the other instruments."""
+        return await self.disconnect()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
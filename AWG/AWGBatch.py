@@ -0,0 +1,239 @@
+#import other modules
+import re
+import time
+
+#Upper bound for one ';'-joined SCPI message
+MAX_MESSAGE_BYTES = 8192
+
+#Safety limit when draining the error queue
+MAX_ERROR_DRAIN = 100
+
+#SCPI string arguments and string responses, e.g. "a;b" or 'a?b' ('""' inside is an escaped quote)
+QUOTED_STRING = re.compile(r'"[^"]*"|\'[^\']*\'')
+
+
+def _mask_strings(text: str) -> str:
+    # Same length as `text`, with the contents of quoted strings blanked out
+    return QUOTED_STRING.sub(lambda match: " " * len(match.group()), text)
+
+
+def split_unquoted(text: str, separator: str = ";") -> list:
+    """Split a SCPI message or response at `separator`, except inside quoted strings."""
+    parts = []
+    start = 0
+    for index, char in enumerate(_mask_strings(text)):
+        if char == separator:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def group_commands(commands: list, max_message_bytes: int = MAX_MESSAGE_BYTES) -> list:
+    """Split commands into groups whose ';'-joined message is at most max_message_bytes."""
+    groups = []
+    current = []
+    size = 0
+    for command in commands:
+        if current and size + len(command) + 1 > max_message_bytes:
+            groups.append(current)
+            current = []
+            size = 0
+        current.append(command)
+        size += len(command) + 1
+    if current:
+        groups.append(current)
+    return groups
+
+
+def is_query(command: str) -> bool:
+    """True if a command (or any command of a ';'-joined message) is a query; '?' in strings doesn't count."""
+    return "?" in _mask_strings(command)
+
+
+class AWG_batch:
+    """
+    Command batch (transaction) on a shared AWG_session.
+
+    While the batch is open, every command written through the session is queued
+    instead of sent. On exit the queue is sent as one ';'-joined SCPI message (or a few,
+    if it exceeds `max_message_bytes`), followed by a single '*OPC?;:SYST:ERR?' round
+    trip that synchronizes, starts draining the error queue and carries the setters'
+    read-back queries (inside a batch they are always deferred, see AWG_session.verify).
+    Queries issued inside the batch flush the queue first, so they always see the
+    queued settings.
+    If the block raises, the queued commands are discarded, and the client-side state
+    (settings cache, sequence table shadow, deferred verifications) is dropped since
+    part of the batch may or may not have reached the instrument.
+
+    Usage:
+        with awg.batch() as batch:
+            awg.output.set_output_state(1, True)
+            awg.VoltageSubsystem.set_output_voltage(1, 0.5)
+        batch.result  # {"Commands": ..., "Messages": ..., "Errors": [...], "Verified": {...}, "Duration(ms)": ...}
+    """
+
+    def __init__(self, session, max_message_bytes: int = MAX_MESSAGE_BYTES):
+        self.session = session
+        self.max_message_bytes = max_message_bytes
+        self.commands = []
+        self.errors = []
+        self.verified = {}
+        self.result = None
+
+        self._command_count = 0
+        self._message_count = 0
+        self._outer = None
+
+    def __enter__(self):
+        if self.session._batch is not None:
+            # Nested batch: join the outer one
+            self._outer = self.session._batch
+            return self._outer
+        self.session._batch = self
+        self._start_time = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._outer is not None:
+            return False
+        self.session._batch = None
+
+        if exc_type is not None:
+            self.session.log._log_command("<batch>", duration_ms=0,
+                                          response=f"Discarded {len(self.commands)} queued commands: {exc_value}")
+            self.commands = []
+            self.abort()
+            return False
+
+        self.flush()
+        self.sync()
+        duration = (time.time() - self._start_time) * 1000
+        self.result = {
+            "Commands": self._command_count,
+            "Messages": self._message_count,
+            "Errors": self.errors,
+            "Verified": self.verified,
+            "Duration(ms)": duration
+        }
+        return False
+
+    def abort(self):
+        """
+        Drop the client-side state of an aborted batch.
+
+        Messages already sent (size-limited flushes or queries inside the block) got no
+        sync; their errors are drained here so they don't surface in a later batch.
+        """
+        self.session.cache.invalidate()
+        self.session.sequence_shadow.invalidate()
+        self.session._deferred_queries = []
+        if not self._message_count:
+            return
+        try:
+            resource = self.session.get_resource()
+            for _ in range(MAX_ERROR_DRAIN):
+                error = resource.query(":SYST:ERR?").strip()
+                self.session.log._log_command(":SYST:ERR?", duration_ms=0, response=error)
+                if self._error_code(error) == 0:
+                    break
+                self.errors.append(error)
+        except Exception as e:
+            self.session.log._log_command(":SYST:ERR?", duration_ms=0, response=str(e))
+
+    # --------------------- QUEUE HANDLING ---------------------
+
+    def add(self, command: str):
+        """
+        Queue a command. Commands without a leading ':' or '*' are made absolute.
+
+        A ';'-joined compound command is kept whole, so its relative headers keep their
+        path and it is never split across messages.
+        """
+        command = command.strip()
+        if not command.startswith((":", "*")):
+            command = ":" + command
+        self.commands.append(command)
+        self._command_count += 1
+
+    def flush(self, query: str = None):
+        """
+        Send all queued commands as ';'-joined messages.
+
+        Args:
+            query (str, optional): Query appended to the last message; its response is left
+                for the caller to read.
+        """
+        if query is not None:
+            self.add(query)
+        if not self.commands:
+            return
+
+        resource = self.session.get_resource()
+        for message in self._join(self.commands):
+            start_time = time.time()
+            resource.write(message)
+            duration = (time.time() - start_time) * 1000
+            self._message_count += 1
+            self.session.log._log_command(message, duration_ms=duration, response="OK")
+        self.commands = []
+
+    def sync(self):
+        """
+        Wait for completion with *OPC? and drain the error queue into self.errors.
+
+        Deferred setter verifications are appended to the same message, so the whole
+        batch is confirmed in one round trip.
+        """
+        resource = self.session.get_resource()
+        queries = self.session._deferred_queries
+        self.session._deferred_queries = []
+
+        # Read-backs that don't fit in the sync message follow in flush_verifications()
+        budget = self.max_message_bytes - len("*OPC?;:SYST:ERR?")
+        count = 0
+        for query in queries:
+            budget -= len(query) + 1
+            if budget < 0:
+                break
+            count += 1
+        self.session._deferred_queries = queries[count:]
+        queries = queries[:count]
+        message = ";".join(["*OPC?", ":SYST:ERR?"] + queries)
+
+        start_time = time.time()
+        response = resource.query(message).strip()
+        duration = (time.time() - start_time) * 1000
+        self.session.log._log_command(message, duration_ms=duration, response=response)
+
+        fields = split_unquoted(response)
+        error = fields[1] if len(fields) > 1 else "0"
+        if queries:
+            self.verified = self.session._store_verifications(queries, fields[2:])
+        self.verified.update(self.session.flush_verifications(self.max_message_bytes))
+        for _ in range(MAX_ERROR_DRAIN):
+            if self._error_code(error) == 0:
+                break
+            self.errors.append(error)
+            error = resource.query(":SYST:ERR?").strip()
+            self.session.log._log_command(":SYST:ERR?", duration_ms=0, response=error)
+
+        if self.errors:
+            # Some queued settings may have been rejected; cached values can't be trusted
+            self.session.cache.invalidate()
+            self.session.sequence_shadow.discard()
+        else:
+            # A clean error queue confirms every write sent so far
+            self.session.cache.confirm()
+            self.session.sequence_shadow.confirm()
+
+    def _join(self, commands: list) -> list:
+        """Split commands into ';'-joined messages of at most max_message_bytes."""
+        return [";".join(group) for group in group_commands(commands, self.max_message_bytes)]
+
+    @staticmethod
+    def _error_code(error: str) -> int:
+        try:
+            return int(error.split(",", 1)[0])
+        except ValueError:
+            return -1
@@ -1,22 +1,21 @@
 #import the required AWG modules
-from VISAInterface import pyvisa_interface
-from AWGConnection import AWG_connection
-from logger import awg_logger
+from AWGSession import AWG_session
 
 import time
 
 
 
 class AWG_common_commands:
-    def __init__(self, ip_address: str):
+    def __init__(self, ip_address: str, session: AWG_session = None):
         self.ip_address = ip_address
 
-        #create insatces for connection and logger classes
-        self.connection = AWG_connection(ip_address)
-        self.log = awg_logger()
+        #share one session (connection, resource manager and logger) per instrument
+        self.session = session if session is not None else AWG_session(ip_address)
+        self.connection = self.session.connection
+        self.log = self.session.log
 
-        #select the recourse from connection class
-        self.resource = self.connection.get_resource()
+        #the session resolves the live resource lazily on every call
+        self.resource = self.session
         
     """Returns the instrument’s identification string containing manufacturer, model number, serial number, and firmware revision details."""
     def get_device_identity(self):
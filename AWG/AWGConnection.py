@@ -1,5 +1,7 @@
 from logger import awg_logger
 from VISAInterface import pyvisa_interface
+from AWGTransport import TRANSPORTS, SCPI_SOCKET_PORT, socket_transport, visa_resource_string
+from AWGSimulator import AWG_simulated_resource, get_simulated_instrument
 import time
 
 
@@ -9,7 +11,7 @@ class AWG_connection:
     Handles connection, communication, logging, and device limits.
     """
 
-    def __init__(self, ip_address: str):
+    def __init__(self, ip_address: str, transport: str = "vxi11", port: int = SCPI_SOCKET_PORT):
         # Device limits (fixed, not editable by user)
         self._device_voltage_limit = 3  # Volts
         self._device_frequency_limit = 6e9  # Hz
@@ -17,7 +19,6 @@ class AWG_connection:
 
         # VISA interface setup
         self.visa = pyvisa_interface()
-        self._rm = self.visa.rm
         self._resource = None
 
         # Logger setup
@@ -26,6 +27,20 @@ class AWG_connection:
         # IP address
         self.ip_address = ip_address
 
+        # Transport: "vxi11" (default), "hislip", "visa-socket" (pyvisa raw socket), "socket" (pure Python)
+        # or "sim" (in-process AWG_simulated_instrument, no hardware needed)
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Invalid transport '{transport}'. Must be one of {TRANSPORTS}")
+        self.transport = transport
+        self.port = port
+
+    def _resource_string(self):
+        if self.transport == "socket":
+            return f"TCPIP0::{self.ip_address}::{self.port}::SOCKET"
+        if self.transport == "sim":
+            return f"SIM::{self.ip_address}::INSTR"
+        return visa_resource_string(self.ip_address, self.transport, self.port)
+
     # --------------------- SETTINGS TAB METHODS ---------------------
 
     def connect(self):
@@ -33,9 +48,15 @@ class AWG_connection:
         if self.log._log_file_path is None:
             self.log._initialize_log_file(f"awg_{self.ip_address}")
 
+        resource_string = self._resource_string()
         try:
             start_time = time.time()
-            self._resource = self._rm.open_resource(f"TCPIP0::{self.ip_address}::inst0::INSTR")
+            if self.transport == "socket":
+                self._resource = socket_transport(self.ip_address, self.port)
+            elif self.transport == "sim":
+                self._resource = AWG_simulated_resource(get_simulated_instrument(self.ip_address), resource_string)
+            else:
+                self._resource = self.visa.rm.open_resource(resource_string)
             self._resource.write_termination = '\n'
             self._resource.read_termination = '\n'
             self._resource.timeout = 5000  # milliseconds
@@ -47,13 +68,13 @@ class AWG_connection:
             idn = self._resource.query("*IDN?")
             idn_duration = (time.time() - idn_start) * 1000
 
-            self.log._log_command(f"TCPIP0::{self.ip_address}::inst0::INSTR", duration_ms=connect_duration, response=True)
+            self.log._log_command(resource_string, duration_ms=connect_duration, response=True)
             self.log._log_command("*IDN?", duration_ms=idn_duration, response=idn.strip())
 
             return {"IDN": idn.strip(), "ConnectTime(ms)": connect_duration}
 
         except Exception as e:
-            self.log._log_command(f"TCPIP0::{self.ip_address}::inst0::INSTR", duration_ms=0, response=str(e))
+            self.log._log_command(resource_string, duration_ms=0, response=str(e))
             return {"Error": str(e), "ConnectTime(ms)": None}
 
     def disconnect(self):
@@ -63,6 +84,7 @@ class AWG_connection:
             self._resource.close()
             duration = (time.time() - start_time) * 1000
             self.log._log_command("resource.close()", duration_ms=duration, response="Device disconnected")
+            self.log.flush()
             self._resource = None
             self.visa.resource = None
             return {"Status": "Disconnected", "Duration(ms)": duration}
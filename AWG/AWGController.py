@@ -1,4 +1,5 @@
-from AWGConnection import AWG_connection
+from AWGSession import AWG_session
+from AWGBatch import MAX_MESSAGE_BYTES
 from AWGCommonCommands import AWG_common_commands
 from AWGStaus import AWG_system_status
 from AWGARMTRIGger import AWG_ARM_TRIGger_Controller
@@ -16,27 +17,86 @@ from AWGCarrier import AWG_carrier
 from AWGStableSubsyatem import AWG_stable_system
 from AWGTestSubsystem import AWG_test
 from AWGTraceSubsystem import AWG_trace_system
+from AWGSegmentAllocator import AWG_segment_allocator
+from AWGWaveformCache import AWG_waveform_cache
+from AWGStatusMonitor import AWG_status_monitor, AWG_status_transitions
 
 
 class AWG_Controller:
-    def __init__(self, ip_address: str):
+    def __init__(self, ip_address: str, verification_policy: str = "always", state_cache: bool = False,
+                 transport: str = "vxi11", port: int = 5025):
         self.ip_address = ip_address
-        self.connection = AWG_connection(ip_address)
-        self.common_commands = AWG_common_commands(ip_address)
-        self.status = AWG_system_status(ip_address)
-        self.arm_trig = AWG_ARM_TRIGger_Controller(ip_address)
-        self.triggerInput = AWG_Trigger_input(ip_address)
-        self.instrument = AWG_instrument(ip_address)
-        self.format = AWG_format(ip_address)
-        self.memmory = AWG_memmory(ip_address)
-        self.output =AWG_output(ip_address)
-        self.SamplingFrequency = AWG_sampling_frequency(ip_address)
-        self.ROscillator = AWG_Reference_Oscillator(ip_address)
-        self.VoltageSubsystem = AWG_Voltage_Subsystem(ip_address)
-        self.FunctionMode = AWG_Function_Mode(ip_address)
-        self.FrequencyPhaseResponse = AWG_frequency_phase_response(ip_address)
-        self.carrier = AWG_carrier(ip_address)
-        self.Stable = AWG_stable_system(ip_address)
-        self.TestSubsystem = AWG_test(ip_address)
-        self.TraceSubsyatem = AWG_trace_system(ip_address)
 
+        #one shared session per instrument, injected into every subsystem
+        self.session = AWG_session(ip_address, transport=transport, port=port)
+        self.session.set_verification_policy(verification_policy)
+        self.session.set_state_cache(state_cache)
+        self.cache = self.session.cache
+        self.connection = self.session.connection
+        self.common_commands = AWG_common_commands(ip_address, session=self.session)
+        self.status = AWG_system_status(ip_address, session=self.session)
+        self.status_monitor = AWG_status_monitor(self.status)
+        self.status_transitions = AWG_status_transitions(self.status)
+        self.arm_trig = AWG_ARM_TRIGger_Controller(ip_address, session=self.session)
+        self.triggerInput = AWG_Trigger_input(ip_address, session=self.session)
+        self.instrument = AWG_instrument(ip_address, session=self.session)
+        self.format = AWG_format(ip_address, session=self.session)
+        self.memmory = AWG_memmory(ip_address, session=self.session)
+        self.output =AWG_output(ip_address, session=self.session)
+        self.SamplingFrequency = AWG_sampling_frequency(ip_address, session=self.session)
+        self.ROscillator = AWG_Reference_Oscillator(ip_address, session=self.session)
+        self.VoltageSubsystem = AWG_Voltage_Subsystem(ip_address, session=self.session)
+        self.FunctionMode = AWG_Function_Mode(ip_address, session=self.session)
+        self.FrequencyPhaseResponse = AWG_frequency_phase_response(ip_address, session=self.session)
+        self.carrier = AWG_carrier(ip_address, session=self.session)
+        self.Stable = AWG_stable_system(ip_address, session=self.session)
+        self.TestSubsystem = AWG_test(ip_address, session=self.session)
+        self.TraceSubsyatem = AWG_trace_system(ip_address, session=self.session)
+        self.allocator = AWG_segment_allocator(self.TraceSubsyatem)
+        self.waveform_cache = AWG_waveform_cache(self.TraceSubsyatem, self.allocator)
+
+    def batch(self, max_message_bytes: int = MAX_MESSAGE_BYTES):
+        """
+        Collect setter commands from all subsystems and send them as one ';'-joined message,
+        closed by a single *OPC? sync and :SYST:ERR? drain.
+
+        Usage:
+            with awg.batch() as batch:
+                for ch in (1, 2, 3, 4):
+                    awg.output.set_output_state(ch, True)
+                    awg.VoltageSubsystem.set_output_voltage(ch, 0.5)
+            print(batch.result)
+        """
+        return self.session.batch(max_message_bytes)
+
+    def set_verification_policy(self, policy: str):
+        """
+        Set how setters read back their value: "always" (default), "never", or "deferred",
+        where all read-backs are sent as one multi-query when the enclosing batch() closes
+        (or on flush_verifications()). Inside a batch() "always" read-backs are deferred too.
+        """
+        self.session.set_verification_policy(policy)
+
+    def flush_verifications(self):
+        """Send all deferred read-back queries in one round trip; returns {query: response}."""
+        return self.session.flush_verifications()
+
+    def set_state_cache(self, enabled: bool):
+        """
+        Enable or disable the client-side settings cache. When enabled, getters are served
+        from values this controller wrote or read before, and setters whose value is
+        unchanged are not sent. *RST, :MMEM:LOAD:CST and reconnects clear the cache.
+        """
+        self.session.set_state_cache(enabled)
+
+    def enable_trace(self, path: str = None, format: str = "jsonl"):
+        """
+        Trace every SCPI exchange to a JSONL or binary file (perf_counter_ns timestamps, header,
+        bytes sent/received, latency, error) and keep per-header latency histograms.
+        trace.summary() reports p50/p99/max per header.
+        """
+        return self.session.enable_trace(path, format)
+
+    def disable_trace(self):
+        """Stop tracing and close the trace file; returns the trace for a final summary()."""
+        return self.session.disable_trace()
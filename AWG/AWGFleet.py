@@ -0,0 +1,163 @@
+#import awg modules
+from AWGController import AWG_Controller
+from AWGTraceSubsystem import quantize_to_dac
+
+#import other modules
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+
+class AWG_Fleet:
+    """
+    A rack of M8195As driven as one: every operation fans out to all instruments in parallel.
+
+    Each instrument keeps its own AWG_Controller (own connection, session and log); the
+    fleet runs the per-instrument calls on a thread pool, so bring-up time is set by the
+    slowest instrument instead of the sum of all of them. Calls to the same instrument
+    are serialized by a per-instrument lock.
+
+    Every operation returns {ip_address: result}, where each result is the usual dict of
+    the underlying method or {"Error": ...}; one failing instrument never stops the others.
+
+        fleet = AWG_Fleet(["192.168.1.100", "192.168.1.101"], transport="hislip")
+        fleet.connect()
+        fleet.set_output_state(1, True)
+        fleet.upload(1, codes)
+        fleet.start_signal_generation()
+        print(fleet.errors(fleet.poll_status()))
+    """
+
+    def __init__(self, ip_addresses, max_workers: int = None, **controller_options):
+        ip_addresses = list(ip_addresses)
+        if len(set(ip_addresses)) != len(ip_addresses):
+            raise ValueError("Duplicate instrument address in fleet")
+        self.controllers = {ip: AWG_Controller(ip, **controller_options) for ip in ip_addresses}
+        self._locks = {ip: threading.Lock() for ip in ip_addresses}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or max(len(ip_addresses), 1),
+                                            thread_name_prefix="awg-fleet")
+
+    def __len__(self):
+        return len(self.controllers)
+
+    def __getitem__(self, ip_address: str) -> AWG_Controller:
+        return self.controllers[ip_address]
+
+    # --------------------- FAN-OUT ---------------------
+
+    def _call(self, ip_address: str, function, args, kwargs):
+        with self._locks[ip_address]:
+            try:
+                return function(self.controllers[ip_address], *args, **kwargs)
+            except Exception as e:
+                return {"Error": str(e)}
+
+    def map(self, function, *args, instruments=None, **kwargs) -> dict:
+        """
+        Run function(controller, *args, **kwargs) on every instrument in parallel.
+
+        Args:
+            function (callable | str): Callable taking the controller first, or an attribute
+                path of a controller method such as "output.set_output_state"
+            instruments (list, optional): Subset of the fleet's IP addresses (all by default)
+
+        Returns:
+            dict: {ip_address: result}, in fleet order
+        """
+        if isinstance(function, str):
+            function = _method_caller(function)
+        instruments = list(self.controllers) if instruments is None else list(instruments)
+        futures = {ip: self._executor.submit(self._call, ip, function, args, kwargs) for ip in instruments}
+        return {ip: future.result() for ip, future in futures.items()}
+
+    @staticmethod
+    def errors(results: dict) -> dict:
+        """The failed entries of a fan-out result: {ip_address: error message}."""
+        return {ip: result["Error"] for ip, result in results.items()
+                if isinstance(result, dict) and "Error" in result}
+
+    # --------------------- OPERATIONS ---------------------
+
+    def connect(self, **kwargs) -> dict:
+        return self.map(lambda awg: awg.connection.connect(**kwargs))
+
+    def disconnect(self) -> dict:
+        return self.map(lambda awg: awg.connection.disconnect())
+
+    def set_output_state(self, channel: int, state: bool, **kwargs) -> dict:
+        return self.map("output.set_output_state", channel, state, **kwargs)
+
+    def start_signal_generation(self, **kwargs) -> dict:
+        return self.map("arm_trig.start_signal_generation", **kwargs)
+
+    def upload(self, channel: int, samples, select: bool = True, **kwargs) -> dict:
+        """
+        Upload the same waveform to all instruments through their waveform caches.
+
+        The samples are quantized once and shared (read-only) by all upload threads;
+        instruments that already hold the waveform only select its segment.
+
+        Returns:
+            dict: {ip_address: {"SegmentID": ..., "Hit": ..., ...} or {"Error": ...}}
+        """
+        codes = quantize_to_dac(samples)
+        return self.map(lambda awg: awg.waveform_cache.upload(channel, codes, select=select, **kwargs))
+
+    def poll_status(self, function=None) -> dict:
+        """
+        Read the status of every instrument in parallel.
+
+        Args:
+            function (callable, optional): function(controller) returning the status; by default
+                the status byte and the questionable and operation conditions
+
+        Returns:
+            dict: {ip_address: {..., "Duration(ms)": ...} or {"Error": ...}}
+        """
+        return self.map(function if function is not None else _read_status)
+
+    def close(self):
+        """Disconnect all instruments and stop the worker threads."""
+        results = self.disconnect()
+        self._executor.shutdown(wait=True)
+        return results
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def _method_caller(path: str):
+    """Turn "subsystem.method" into a function(controller, *args, **kwargs)."""
+    names = path.split(".")
+
+    def call(controller, *args, **kwargs):
+        target = controller
+        for name in names:
+            target = getattr(target, name)
+        return target(*args, **kwargs)
+    return call
+
+
+def _read_status(awg: AWG_Controller) -> dict:
+    start_time = time.time()
+    status_byte = awg.status.query_status_byte_register()
+    if "Error" in status_byte:
+        return status_byte
+    # get_questionable_condition() returns the bare register value (or an "Error: ..." string)
+    questionable = awg.status.get_questionable_condition()
+    if not isinstance(questionable, int):
+        return {"Error": str(questionable).replace("Error: ", "", 1)}
+    operation = awg.status.get_operation_condition()
+    if "Error" in operation:
+        return operation
+    return {
+        "StatusByte": status_byte["StatusByte"],
+        "QuestionableCondition": questionable,
+        "OperationCondition": operation["OperationCondition"],
+        "Duration(ms)": (time.time() - start_time) * 1000
+    }
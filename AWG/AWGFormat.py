@@ -1,20 +1,20 @@
 #import awg modules
-from AWGConnection import AWG_connection
-from logger import awg_logger
+from AWGSession import AWG_session
 
 #import other modules
 import time
 
 class AWG_format:
-    def __init__(self, ip_address):
+    def __init__(self, ip_address, session: AWG_session = None):
         self.ip_address = ip_address
 
-        #create insatces for connection and logger classes
-        self.connection = AWG_connection(ip_address)
-        self.log = awg_logger()
+        #share one session (connection, resource manager and logger) per instrument
+        self.session = session if session is not None else AWG_session(ip_address)
+        self.connection = self.session.connection
+        self.log = self.session.log
 
-        #select the recourse from connection class
-        self.resource = self.connection.get_resource()
+        #the session resolves the live resource lazily on every call
+        self.resource = self.session
 
     def set_byte_order(self, order: str):
         """
@@ -37,7 +37,8 @@ class AWG_format:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_byte_order()
+                self.session.byte_order = order
+                response = self.session.verify(command, self.get_byte_order)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": f"Byte order set to {order}", "Duration(ms)": duration}
             except Exception as e:
@@ -60,6 +61,7 @@ class AWG_format:
                 duration = (time.time() - start_time) * 1000
     
                 byte_order = response.strip()
+                self.session.byte_order = "SWAPped" if byte_order.upper().startswith("SWAP") else "NORMal"
                 self.log._log_command(command, duration_ms=duration, response=byte_order)
                 return {"Byte Order": byte_order, "Duration(ms)": duration}
             except Exception as e:
@@ -1,20 +1,20 @@
 #import awg modules
-from AWGConnection import AWG_connection
-from logger import awg_logger
+from AWGSession import AWG_session
 
 #import other modules
 import time
 
 class AWG_frequency_phase_response:
-    def __init__(self, ip_address):
+    def __init__(self, ip_address, session: AWG_session = None):
         self.ip_address = ip_address
 
-        #create insatces for connection and logger classes
-        self.connection = AWG_connection(ip_address)
-        self.log = awg_logger()
+        #share one session (connection, resource manager and logger) per instrument
+        self.session = session if session is not None else AWG_session(ip_address)
+        self.connection = self.session.connection
+        self.log = self.session.log
 
-        #select the recourse from connection class
-        self.resource = self.connection.get_resource()
+        #the session resolves the live resource lazily on every call
+        self.resource = self.session
 
     def get_channel_characteristics(self, channel: int, amplitude: float = None, sample_frequency: float = None):
         """
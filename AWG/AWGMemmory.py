@@ -1,20 +1,21 @@
 #import awg modules
-from AWGConnection import AWG_connection
-from logger import awg_logger
+from AWGSession import AWG_session
+from IEEEBlock import ieee_block_message
 
 #import other modules
 import time
 
 class AWG_memmory:
-    def __init__(self, ip_address):
+    def __init__(self, ip_address, session: AWG_session = None):
         self.ip_address = ip_address
 
-        #create insatces for connection and logger classes
-        self.connection = AWG_connection(ip_address)
-        self.log = awg_logger()
+        #share one session (connection, resource manager and logger) per instrument
+        self.session = session if session is not None else AWG_session(ip_address)
+        self.connection = self.session.connection
+        self.log = self.session.log
 
-        #select the recourse from connection class
-        self.resource = self.connection.get_resource()
+        #the session resolves the live resource lazily on every call
+        self.resource = self.session
 
     def get_directory_catalog(self, directory_name: str = ""):
         """
@@ -92,7 +93,7 @@ class AWG_memmory:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_default_directory()
+                response = self.session.verify(command, self.get_default_directory)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": f"Default directory set to '{directory_path or 'System Default'}'", "Duration(ms)": duration}
             except Exception as e:
@@ -185,9 +186,7 @@ class AWG_memmory:
         if self.resource:
             try:
                 data_len = len(data)
-                len_str = str(data_len)
-                block_header = f"#{len(len_str)}{len_str}"
-                full_payload = f':MMEM:DATA "{file_path}",'.encode() + block_header.encode() + data
+                full_payload = ieee_block_message(f':MMEM:DATA "{file_path}",', data, self.resource.write_termination)
 
                 start_time = time.time()
                 self.resource.write_raw(full_payload)
@@ -214,6 +213,7 @@ class AWG_memmory:
             try:
                 command = f':MMEM:DATA? "{file_path}"'
                 start_time = time.time()
+                self.resource.write(command)
                 raw_response = self.resource.read_raw()
                 duration = (time.time() - start_time) * 1000
 
@@ -0,0 +1,199 @@
+#import awg modules
+from AWGFleet import AWG_Fleet
+from AWGBatch import AWG_batch, MAX_ERROR_DRAIN
+
+#import other modules
+import threading
+import time
+
+START_COMMANDS = {"immediate": ":INIT:IMM", "trigger": ":TRIG:BEG"}
+START_STRATEGIES = ("loop", "threads")
+
+
+class AWG_multi_module_sequencer:
+    """
+    Coordinated start of several modules so they begin generating together.
+
+    stage() prepares all modules in parallel. It aborts any running output, applies the
+    per-module :ARM:MDEL and per-channel :ARM:SDEL skews and waits for *OPC?. In
+    "trigger" mode it also arms every module (:INIT:IMM) so the final event is :TRIG:BEG.
+    Modules configured as multi-module slaves (:INST:MMOD:MODE? SLAVe) are armed during
+    staging and are not fired; their master starts them.
+
+    start() fires the final command on all modules at once, with every resource resolved
+    and the command pre-encoded beforehand, so nothing but one write_raw per module is
+    timed. Two strategies are offered:
+
+    - "loop" sends back to back from one thread. This is best when a write only queues
+      bytes in the socket (raw socket, HiSLIP); the spread is N short sends.
+    - "threads" parks one thread per module on a barrier. This is best when every write
+      is a blocking round trip (VXI-11 RPC), since the round trips then overlap.
+
+    The host-side send times are measured with perf_counter_ns and reported as the
+    achieved spread.
+    """
+
+    def __init__(self, fleet: AWG_Fleet, mode: str = "immediate", strategy: str = "loop"):
+        if mode not in START_COMMANDS:
+            raise ValueError(f"Invalid start mode '{mode}'. Must be one of {tuple(START_COMMANDS)}")
+        if strategy not in START_STRATEGIES:
+            raise ValueError(f"Invalid start strategy '{strategy}'. Must be one of {START_STRATEGIES}")
+        self.fleet = fleet
+        self.mode = mode
+        self.strategy = strategy
+        self.staged = {}
+
+    # --------------------- STAGING ---------------------
+
+    def _stage_module(self, awg, module_delay, sample_delays: dict, prepare) -> dict:
+        start_time = time.time()
+        if prepare is not None:
+            response = prepare(awg)
+            if isinstance(response, dict) and "Error" in response:
+                return response
+
+        responses = [awg.arm_trig.set_abort()]
+        if module_delay is not None:
+            responses.append(awg.arm_trig.set_custom_module_delay(str(module_delay)))
+        for channel, delay in sample_delays.items():
+            responses.append(awg.arm_trig.set_custom_sample_delay(channel, str(delay)))
+        config = awg.instrument.get_multi_module_config_state()
+        mode = awg.instrument.get_multi_module_mode()
+        responses += [config, mode]
+        for response in responses:
+            if "Error" in response:
+                return response
+
+        slave = mode["Multi-Module Mode"].upper().startswith("SLAV")
+        if slave or self.mode == "trigger":
+            response = awg.arm_trig.start_signal_generation()
+            if "Error" in response:
+                return response
+        # A rejected :ARM:MDEL/:ARM:SDEL (or arm) must not leave the module marked as staged
+        error = awg.session.query("*OPC?;:SYST:ERR?").strip().split(";", 1)[-1]
+        errors = []
+        for _ in range(MAX_ERROR_DRAIN):
+            if AWG_batch._error_code(error) == 0:
+                break
+            errors.append(error)
+            error = awg.session.query(":SYST:ERR?").strip()
+        if errors:
+            return {"Error": "; ".join(errors)}
+
+        return {
+            "MultiModule": config["Multi-Module Config"],
+            "Mode": mode["Multi-Module Mode"],
+            "Fire": not slave,
+            "Duration(ms)": (time.time() - start_time) * 1000
+        }
+
+    def stage(self, module_delays: dict = None, sample_delays: dict = None, prepare=None) -> dict:
+        """
+        Prepare all modules in parallel for a synchronized start.
+
+        Args:
+            module_delays (dict, optional): {ip_address: :ARM:MDEL value in seconds}
+            sample_delays (dict, optional): {ip_address: {channel: :ARM:SDEL value}}
+            prepare (callable, optional): prepare(controller) run first on each module, e.g. uploads
+
+        Returns:
+            dict: {ip_address: {"MultiModule": ..., "Mode": ..., "Fire": bool, "Duration(ms)": ...} or {"Error": ...}}
+                (errors include instrument errors drained from :SYST:ERR? after staging)
+        """
+        module_delays = module_delays or {}
+        sample_delays = sample_delays or {}
+        results = self.fleet.map(lambda awg: self._stage_module(
+            awg, module_delays.get(awg.ip_address), sample_delays.get(awg.ip_address, {}), prepare))
+        self.staged = {ip: result for ip, result in results.items() if "Error" not in result}
+        return results
+
+    # --------------------- START ---------------------
+
+    def start(self, timeout: float = 10.0) -> dict:
+        """
+        Fire the start command on all staged modules at once and measure the host-side skew.
+
+        Returns:
+            dict: {"Strategy": ..., "Modules": {ip_address: {"Offset(us)": ..., "Write(us)": ...} or {"Error": ...}},
+                   "Spread(us)": ..., "CompletionSpread(us)": ..., "Command": ...} or {"Error": ...}
+        """
+        if not self.staged:
+            return {"Error": "No staged modules; call stage() first"}
+        command = START_COMMANDS[self.mode]
+        message = (command + "\n").encode()
+        fire = [ip for ip, staged in self.staged.items() if staged["Fire"]]
+        if not fire:
+            return {"Error": "All staged modules are multi-module slaves"}
+
+        # Resolve every resource up front, so the timed part only writes
+        resources = {ip: self.fleet[ip].session.get_resource() for ip in fire}
+        timings = {}
+
+        # Hold the instrument locks so no fleet call interleaves with the start command
+        locks = [self.fleet._locks[ip] for ip in fire]
+        for lock in locks:
+            lock.acquire()
+        try:
+            if self.strategy == "loop":
+                self._fire_loop(resources, message, timings)
+            else:
+                self._fire_threads(resources, message, timings, timeout)
+        finally:
+            for lock in locks:
+                lock.release()
+
+        modules = {}
+        sent = [timing[0] for timing in timings.values() if isinstance(timing, tuple)]
+        done = [timing[1] for timing in timings.values() if isinstance(timing, tuple)]
+        first = min(sent) if sent else 0
+        for ip in fire:
+            timing = timings.get(ip, TimeoutError("start thread did not finish"))
+            if isinstance(timing, Exception):
+                modules[ip] = {"Error": str(timing)}
+                self.fleet[ip].session.log._log_command(command, duration_ms=0, response=str(timing))
+                continue
+            modules[ip] = {"Offset(us)": (timing[0] - first) / 1e3, "Write(us)": (timing[1] - timing[0]) / 1e3}
+            self.fleet[ip].session.log._log_command(command, duration_ms=(timing[1] - timing[0]) / 1e6,
+                                            response=f"synchronized start, offset {modules[ip]['Offset(us)']:.1f} us")
+
+        return {
+            "Strategy": self.strategy,
+            "Modules": modules,
+            "Spread(us)": (max(sent) - first) / 1e3 if sent else None,
+            "CompletionSpread(us)": (max(done) - min(done)) / 1e3 if done else None,
+            "Command": command
+        }
+
+    @staticmethod
+    def _fire_loop(resources: dict, message: bytes, timings: dict):
+        for ip, resource in resources.items():
+            try:
+                sent = time.perf_counter_ns()
+                resource.write_raw(message)
+                timings[ip] = (sent, time.perf_counter_ns())
+            except Exception as e:
+                timings[ip] = e
+
+    @staticmethod
+    def _fire_threads(resources: dict, message: bytes, timings: dict, timeout: float):
+        barrier = threading.Barrier(len(resources) + 1)
+
+        def fire_one(ip, resource):
+            try:
+                barrier.wait(timeout)
+                sent = time.perf_counter_ns()
+                resource.write_raw(message)
+                timings[ip] = (sent, time.perf_counter_ns())
+            except Exception as e:
+                timings[ip] = e
+
+        threads = [threading.Thread(target=fire_one, args=item, name=f"awg-start-{item[0]}")
+                   for item in resources.items()]
+        for thread in threads:
+            thread.start()
+        try:
+            barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            pass  # a module thread did not arrive in time; every waiting thread records the error
+        for thread in threads:
+            thread.join(timeout)
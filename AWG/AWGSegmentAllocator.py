@@ -0,0 +1,385 @@
+#import awg modules
+from AWGTraceSubsystem import AWG_trace_system, SEGMENT_GRANULARITY
+from AWGBatch import AWG_batch
+
+#import other modules
+import time
+
+MAX_SEGMENT_ID = 16777215
+
+
+def segment_id_matches(previous: dict, current: dict, segment_id: int) -> bool:
+    """True if a segment exists in both catalogs with the same length."""
+    return segment_id in current and previous.get(segment_id) == current[segment_id]
+
+
+class AWG_segment_allocator:
+    """
+    Client-side model of each channel's waveform segment memory.
+
+    The layout is mirrored as address-ordered (start, size, segment_id) blocks, with sizes
+    rounded up to the segment granularity and new segments placed first-fit, the way the
+    instrument allocates. sync() rebuilds the model from :TRAC:CAT? and :TRAC:FREE?;
+    segments this allocator did not place itself get estimated (packed) addresses, and
+    the instrument's reported largest contiguous block always bounds the prediction.
+
+    With the model the allocator picks segment IDs, predicts whether a definition fits,
+    and plans the smallest set of segments to delete and re-upload to make room.
+    """
+
+    def __init__(self, trace_system: AWG_trace_system, granularity: int = SEGMENT_GRANULARITY):
+        self.trace = trace_system
+        self.resource = trace_system.resource
+        self.log = trace_system.log
+        self.granularity = granularity
+
+        # channel -> {"Memory": total samples, "Blocks": [(start, size, segment_id)], "Lengths": {id: length},
+        #             "Contiguous": largest free block reported by the instrument}
+        self.channels = {}
+
+    # --------------------- MODEL ---------------------
+
+    def _size(self, length: int) -> int:
+        return -(-length // self.granularity) * self.granularity
+
+    def _channel(self, channel: int) -> dict:
+        """The model of a channel (synced on first use), or {"Error": ...}."""
+        if channel not in [1, 2, 3, 4]:
+            return {"Error": "Invalid channel. Must be 1, 2, 3, or 4"}
+        if channel not in self.channels:
+            response = self.sync(channel)
+            if "Error" in response:
+                return response
+        return self.channels[channel]
+
+    def sync(self, channel: int):
+        """
+        Rebuild the model of a channel from the instrument's catalog and free-memory report.
+
+        Returns:
+            dict: {"Segments": ..., "Memory": ..., "Free": ..., "Contiguous": ..., "Duration(ms)": ...} or {"Error": ...}
+        """
+        start_time = time.time()
+        catalog = self.trace.get_segment_catalog(channel)
+        if "Error" in catalog:
+            return catalog
+        memory = self.trace.get_waveform_memory_info(channel)
+        if "Error" in memory:
+            return memory
+
+        segments = {segment_id: length for segment_id, length in catalog["Segments"] if segment_id != 0}
+        previous = self.channels.get(channel)
+        known = {}
+        if previous is not None:
+            # Keep the addresses of segments this allocator placed and that still exist unchanged
+            known = {block[2]: block for block in previous["Blocks"]
+                     if segment_id_matches(previous["Lengths"], segments, block[2])}
+
+        blocks = sorted(known.values())
+        for segment_id, length in sorted(segments.items()):
+            if segment_id not in known:
+                start = self._first_fit(blocks, self._size(length), None)
+                blocks.append((start if start is not None else self._end(blocks), self._size(length), segment_id))
+                blocks.sort()
+
+        self.channels[channel] = {
+            "Memory": memory["Bytes_Available"] + memory["Bytes_In_Use"],
+            "Blocks": blocks,
+            "Lengths": segments,
+            "Contiguous": memory["Contiguous_Bytes"],
+        }
+        duration = (time.time() - start_time) * 1000
+        return {
+            "Segments": len(segments),
+            "Memory": self.channels[channel]["Memory"],
+            "Free": memory["Bytes_Available"],
+            "Contiguous": memory["Contiguous_Bytes"],
+            "Duration(ms)": duration
+        }
+
+    @staticmethod
+    def _end(blocks: list) -> int:
+        return max((start + size for start, size, _ in blocks), default=0)
+
+    @staticmethod
+    def _gaps(blocks: list, memory: int) -> list:
+        """Free (start, size) gaps between the address-ordered blocks."""
+        gaps = []
+        address = 0
+        for start, size, _ in blocks:
+            if start > address:
+                gaps.append((address, start - address))
+            address = max(address, start + size)
+        if memory is not None and memory > address:
+            gaps.append((address, memory - address))
+        return gaps
+
+    def _first_fit(self, blocks: list, size: int, memory: int):
+        for start, gap in self._gaps(blocks, memory if memory is not None else float("inf")):
+            if gap >= size:
+                return start
+        return None
+
+    # --------------------- QUERIES ---------------------
+
+    def free_space(self, channel: int) -> dict:
+        """
+        Returns:
+            dict: {"Free": ..., "LargestContiguous": ..., "Gaps": [(start, size), ...], "Fragmentation": 0..1}
+                or {"Error": ...}
+        """
+        state = self._channel(channel)
+        if "Error" in state:
+            return state
+        gaps = self._gaps(state["Blocks"], state["Memory"])
+        free = sum(size for _, size in gaps)
+        largest = min(max((size for _, size in gaps), default=0), state["Contiguous"])
+        return {
+            "Free": free,
+            "LargestContiguous": largest,
+            "Gaps": gaps,
+            "Fragmentation": 1 - largest / free if free else 0.0
+        }
+
+    def next_segment_id(self, channel: int, exclude=()) -> dict:
+        """
+        Lowest segment ID not in use on the channel.
+
+        Args:
+            channel (int): Channel number (1–4)
+            exclude (iterable, optional): IDs to skip even if free (e.g. segments about to be re-defined)
+
+        Returns:
+            dict: {"SegmentID": ...} or {"Error": ...}
+        """
+        state = self._channel(channel)
+        if "Error" in state:
+            return state
+        used = set(state["Lengths"]) | set(exclude)
+        segment_id = 1
+        while segment_id in used:
+            segment_id += 1
+        if segment_id > MAX_SEGMENT_ID:
+            return {"Error": "No free segment ID"}
+        return {"SegmentID": segment_id}
+
+    def check_define(self, channel: int, length: int) -> dict:
+        """
+        Predict whether a segment of `length` samples can be defined.
+
+        Returns:
+            dict: {"Fits": bool, "Reason": "OK" | "Fragmented" | "OutOfMemory", "Address": ... or None}
+                or {"Error": ...}
+        """
+        state = self._channel(channel)
+        if "Error" in state:
+            return state
+        size = self._size(length)
+        free = self.free_space(channel)
+        address = self._first_fit(state["Blocks"], size, state["Memory"])
+        if address is not None and size <= state["Contiguous"]:
+            return {"Fits": True, "Reason": "OK", "Address": address}
+        reason = "Fragmented" if free["Free"] >= size else "OutOfMemory"
+        return {"Fits": False, "Reason": reason, "Address": None}
+
+    # --------------------- SEGMENT OPERATIONS ---------------------
+
+    def define(self, channel: int, length: int, segment_id: int = None, init_value: int = None):
+        """
+        Define a segment after checking that it fits; the model is updated on success.
+
+        Args:
+            channel (int): Channel number (1–4)
+            length (int): Segment length in samples
+            segment_id (int, optional): Segment ID; the lowest free ID if omitted
+            init_value (int, optional): Initial DAC value
+
+        Returns:
+            dict: define_waveform_segment() result plus "SegmentID", or {"Error": ..., "Reason": ..., "Plan": ...}
+                when the segment would not fit (nothing is sent to the instrument)
+        """
+        check = self.check_define(channel, length)
+        if "Error" in check:
+            return check
+        if segment_id is None:
+            response = self.next_segment_id(channel)
+            if "Error" in response:
+                return response
+            segment_id = response["SegmentID"]
+        if not check["Fits"]:
+            plan = self.plan_defragmentation(channel, length) if check["Reason"] == "Fragmented" else None
+            return {"Error": f"Segment of {length} samples does not fit ({check['Reason']})",
+                    "Reason": check["Reason"], "Plan": plan}
+
+        response = self.trace.define_waveform_segment(channel, segment_id, length, init_value)
+        if "Error" not in response:
+            self._place(channel, segment_id, length, check["Address"])
+            response["SegmentID"] = segment_id
+        return response
+
+    def delete(self, channel: int, segment_id: int):
+        """Delete a segment on the instrument and release it in the model."""
+        response = self.trace.delete_waveform_segment(channel, segment_id)
+        if "Error" not in response:
+            self._release(channel, segment_id)
+        return response
+
+    def _place(self, channel: int, segment_id: int, length: int, address: int):
+        state = self._channel(channel)
+        if "Error" in state:
+            return
+        size = self._size(length)
+        state["Blocks"].append((address, size, segment_id))
+        state["Blocks"].sort()
+        state["Lengths"][segment_id] = length
+        gaps = self._gaps(state["Blocks"], state["Memory"])
+        state["Contiguous"] = max((s for _, s in gaps), default=0)
+
+    def _release(self, channel: int, segment_id: int):
+        state = self._channel(channel)
+        if "Error" in state:
+            return
+        state["Blocks"] = [block for block in state["Blocks"] if block[2] != segment_id]
+        state["Lengths"].pop(segment_id, None)
+        gaps = self._gaps(state["Blocks"], state["Memory"])
+        state["Contiguous"] = max((s for _, s in gaps), default=0)
+
+    # --------------------- DEFRAGMENTATION ---------------------
+
+    def plan_defragmentation(self, channel: int, length: int = None) -> dict:
+        """
+        Plan the smallest delete/re-upload sequence that makes room.
+
+        With `length`, finds the address window of that size whose segments hold the fewest
+        samples: deleting them opens a gap the new segment is defined into, after which they
+        are re-defined first-fit elsewhere (largest first). Without `length`, plans a full
+        compaction that only moves the segments after the first gap. Placement is simulated
+        first-fit, like the instrument, so "Feasible" tells whether the plan will succeed.
+
+        Returns:
+            dict: {"Length": ..., "Delete": [segment_id, ...], "Redefine": [(segment_id, length), ...] in order,
+                   "MovedSamples": ..., "Feasible": bool} or {"Error": ...}
+        """
+        state = self._channel(channel)
+        if "Error" in state:
+            return state
+        blocks = state["Blocks"]
+        memory = state["Memory"]
+
+        if length is None:
+            address = 0
+            moved = []
+            for start, size, segment_id in blocks:
+                if moved or start != address:
+                    moved.append((start, size, segment_id))
+                else:
+                    address += size
+            return self._plan(state, moved, None, sorted(moved), length)
+
+        size = self._size(length)
+        best = None
+        # Candidate windows start at 0 or right after a block; a window costs the blocks overlapping it
+        for candidate in [0] + [start + s for start, s, _ in blocks]:
+            if candidate + size > memory:
+                continue
+            overlapping = [b for b in blocks if b[0] < candidate + size and b[0] + b[1] > candidate]
+            cost = sum(b[1] for b in overlapping)
+            if best is None or cost < best[0]:
+                best = (cost, overlapping)
+        if best is None:
+            return {"Length": length, "Delete": [], "Redefine": [], "MovedSamples": 0, "Feasible": False}
+
+        moved = best[1]
+        return self._plan(state, moved, size, sorted(moved, key=lambda b: -b[1]), length)
+
+    def _plan(self, state: dict, moved: list, size, order: list, length) -> dict:
+        moved_ids = {segment_id for _, _, segment_id in moved}
+        remaining = sorted(b for b in state["Blocks"] if b[2] not in moved_ids)
+
+        # Simulate the instrument's first-fit placement: new segment first, then the moved ones
+        feasible = True
+        placements = ([(size, 0)] if size is not None else []) + [(s, segment_id) for _, s, segment_id in order]
+        for block_size, segment_id in placements:
+            start = self._first_fit(remaining, block_size, state["Memory"])
+            if start is None:
+                feasible = False
+                break
+            remaining.append((start, block_size, segment_id))
+            remaining.sort()
+
+        return {
+            "Length": length,
+            "Delete": [segment_id for _, _, segment_id in moved],
+            "Redefine": [(segment_id, state["Lengths"][segment_id]) for _, _, segment_id in order],
+            "MovedSamples": sum(state["Lengths"][segment_id] for _, _, segment_id in moved),
+            "Feasible": feasible
+        }
+
+    def execute_plan(self, channel: int, plan: dict, reupload, length: int = None, segment_id: int = None):
+        """
+        Carry out a defragmentation plan.
+
+        Args:
+            channel (int): Channel number (1–4)
+            plan (dict): Result of plan_defragmentation()
+            reupload (callable): reupload(channel, segment_id, length) writes a moved segment's data
+                again after it has been re-defined (the caller owns the sample data)
+            length (int, optional): Length of the new segment the plan made room for; it is defined
+                right after the deletes, before the moved segments are re-defined
+            segment_id (int, optional): ID for the new segment (if omitted, the lowest ID that is
+                free and not one of the plan's deleted segments)
+
+        Every definition is checked with :SYST:ERR?; the first rejected one stops the plan.
+
+        Returns:
+            dict: {"Status": ..., "Moved": ..., "SegmentID": ... or None, "Duration(ms)": ...} or {"Error": ...}
+        """
+        if not plan["Feasible"]:
+            return {"Error": "Plan is not feasible"}
+        start_time = time.time()
+        if length is not None and segment_id is None:
+            # The deleted IDs are free only until their segments are re-defined below
+            response = self.next_segment_id(channel, exclude=plan["Delete"])
+            if "Error" in response:
+                return response
+            segment_id = response["SegmentID"]
+
+        for moved_id in plan["Delete"]:
+            response = self.delete(channel, moved_id)
+            if "Error" in response:
+                return response
+
+        new_id = None
+        if length is not None:
+            response = self._define_checked(channel, length, segment_id)
+            if "Error" in response:
+                return response
+            new_id = response["SegmentID"]
+
+        for moved_id, moved_length in plan["Redefine"]:
+            response = self._define_checked(channel, moved_length, moved_id)
+            if "Error" in response:
+                return response
+            response = reupload(channel, moved_id, moved_length)
+            if isinstance(response, dict) and "Error" in response:
+                return response
+
+        duration = (time.time() - start_time) * 1000
+        self.log._log_command(f":TRAC{channel}:DEF <defragment>", duration_ms=duration,
+                              response=f"{len(plan['Redefine'])} segments moved")
+        return {"Status": "Defragmented", "Moved": len(plan["Redefine"]), "SegmentID": new_id,
+                "Duration(ms)": duration}
+
+    def _define_checked(self, channel: int, length: int, segment_id: int) -> dict:
+        # define() only writes :TRAC:DEF; a rejected definition shows up in the error queue
+        response = self.define(channel, length, segment_id)
+        if "Error" in response:
+            return response
+        try:
+            error = self.resource.query(":SYST:ERR?").strip()
+        except Exception as e:
+            return {"Error": str(e)}
+        if AWG_batch._error_code(error) != 0:
+            self._release(channel, segment_id)
+            return {"Error": error, "SegmentID": segment_id}
+        return response
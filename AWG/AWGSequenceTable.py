@@ -0,0 +1,392 @@
+#import other modules
+import numpy as np
+
+#Control word bits of a sequence table entry
+CONTROL_COMMAND = 1 << 31          # entry is a command (e.g. idle delay), not a data entry
+CONTROL_END_SEQUENCE = 1 << 30     # last entry of a sequence
+CONTROL_END_SCENARIO = 1 << 29     # last entry of the scenario
+CONTROL_INIT_SEQUENCE = 1 << 28    # first entry of a sequence
+CONTROL_MARKER_ENABLE = 1 << 24    # enable segment markers
+SEQUENCE_ADVANCE_SHIFT = 20        # bits 23..20
+SEGMENT_ADVANCE_SHIFT = 16         # bits 19..16
+
+#Advancement modes (sequence and segment advance fields)
+ADVANCE_MODES = {"AUTO": 0, "COND": 1, "REP": 2, "SING": 3}
+
+#End offset meaning "up to the end of the segment"
+END_OFFSET_ALL = 0xFFFFFFFF
+
+MAX_SEGMENT_ID = 16777215
+MAX_SEQUENCE_ENTRIES = 16777215
+
+#One entry = the six 32-bit words of :STAB:DATA, in order, so the table can be viewed as (N, 6) words
+SEQUENCE_ENTRY_DTYPE = np.dtype([
+    ("control", np.uint32),
+    ("sequence_loops", np.uint32),
+    ("segment_loops", np.uint32),
+    ("segment_id", np.uint32),
+    ("start_offset", np.uint32),
+    ("end_offset", np.uint32),
+])
+
+
+def _advance_code(mode) -> np.ndarray:
+    if isinstance(mode, str):
+        if mode.upper() not in ADVANCE_MODES:
+            raise ValueError(f"Invalid advance mode '{mode}'. Must be one of {list(ADVANCE_MODES)}")
+        return np.uint32(ADVANCE_MODES[mode.upper()])
+    return np.asarray(mode, dtype=np.uint32)
+
+
+def pack_control_words(init_sequence=False, end_sequence=False, end_scenario=False, marker_enable=False,
+                       sequence_advance="AUTO", segment_advance="AUTO", command=False) -> np.ndarray:
+    """
+    Build control words from flags, vectorized: every argument may be a scalar or an array.
+
+    Args:
+        init_sequence, end_sequence, end_scenario, marker_enable, command (bool or array of bool)
+        sequence_advance, segment_advance (str or array of advance codes, see ADVANCE_MODES)
+
+    Returns:
+        np.ndarray: uint32 control words (broadcast shape of the arguments)
+    """
+    control = (np.asarray(init_sequence, dtype=np.uint32) * np.uint32(CONTROL_INIT_SEQUENCE)
+               | np.asarray(end_sequence, dtype=np.uint32) * np.uint32(CONTROL_END_SEQUENCE)
+               | np.asarray(end_scenario, dtype=np.uint32) * np.uint32(CONTROL_END_SCENARIO)
+               | np.asarray(marker_enable, dtype=np.uint32) * np.uint32(CONTROL_MARKER_ENABLE)
+               | np.asarray(command, dtype=np.uint32) * np.uint32(CONTROL_COMMAND))
+    control |= (_advance_code(sequence_advance) & np.uint32(0xF)) << np.uint32(SEQUENCE_ADVANCE_SHIFT)
+    control |= (_advance_code(segment_advance) & np.uint32(0xF)) << np.uint32(SEGMENT_ADVANCE_SHIFT)
+    return control.astype(np.uint32)
+
+
+def unpack_control_words(control) -> dict:
+    """Split control words into their flag and advance-mode fields (arrays)."""
+    control = np.asarray(control, dtype=np.uint32)
+    return {
+        "command": (control & CONTROL_COMMAND) != 0,
+        "init_sequence": (control & CONTROL_INIT_SEQUENCE) != 0,
+        "end_sequence": (control & CONTROL_END_SEQUENCE) != 0,
+        "end_scenario": (control & CONTROL_END_SCENARIO) != 0,
+        "marker_enable": (control & CONTROL_MARKER_ENABLE) != 0,
+        "sequence_advance": (control >> SEQUENCE_ADVANCE_SHIFT) & 0xF,
+        "segment_advance": (control >> SEGMENT_ADVANCE_SHIFT) & 0xF,
+    }
+
+
+class AWG_sequence_table:
+    """
+    Sequence table backed by a structured NumPy array (see SEQUENCE_ENTRY_DTYPE).
+
+    Fields can be read and assigned as whole columns (table["segment_loops"] = 4),
+    tables slice and concatenate like arrays, and np.asarray(table) is the (N, 6)
+    uint32 word view that AWG_stable_system.write_sequence_table_block() uploads:
+
+        table = AWG_sequence_table.from_segments([1, 2, 3], segment_loops=[1, 10, 1])
+        errors = table.validate(awg.TraceSubsyatem.get_segment_catalog(1)["Segments"])
+        awg.Stable.write_sequence_table_block(0, table)
+    """
+
+    def __init__(self, entries=0):
+        if isinstance(entries, (int, np.integer)):
+            entries = np.zeros(entries, dtype=SEQUENCE_ENTRY_DTYPE)
+            entries["sequence_loops"] = 1
+            entries["segment_loops"] = 1
+            entries["end_offset"] = END_OFFSET_ALL
+        elif isinstance(entries, AWG_sequence_table):
+            entries = entries.entries
+        if not isinstance(entries, np.ndarray) or entries.dtype != SEQUENCE_ENTRY_DTYPE or entries.ndim != 1:
+            raise TypeError("entries must be a count or a 1-D array of SEQUENCE_ENTRY_DTYPE")
+        self.entries = entries
+
+    # --------------------- CONSTRUCTION ---------------------
+
+    @classmethod
+    def from_segments(cls, segment_ids, segment_loops=1, start_offsets=0, end_offsets=END_OFFSET_ALL,
+                      sequence_lengths=None, sequence_loops=1, marker_enable=False,
+                      segment_advance="AUTO", sequence_advance="AUTO"):
+        """
+        Build a table with one entry per segment, vectorized.
+
+        Args:
+            segment_ids (array-like): Segment ID of every entry
+            segment_loops, start_offsets, end_offsets, marker_enable, segment_advance: Per-entry
+                values (scalar or array)
+            sequence_lengths (array-like, optional): Entries per sequence, summing to the number of
+                entries; a single sequence if omitted
+            sequence_loops, sequence_advance: Per-sequence values (scalar or one per sequence), stored
+                in the first entry of each sequence
+
+        Returns:
+            AWG_sequence_table: Table whose last entry ends the scenario
+        """
+        segment_ids = np.asarray(segment_ids, dtype=np.int64).ravel()
+        count = len(segment_ids)
+        if sequence_lengths is None:
+            sequence_lengths = [count]
+        sequence_lengths = np.asarray(sequence_lengths, dtype=np.int64)
+        if sequence_lengths.sum() != count or (sequence_lengths <= 0).any():
+            raise ValueError("sequence_lengths must be positive and sum to the number of entries")
+
+        table = cls(count)
+        entries = table.entries
+        entries["segment_id"] = segment_ids
+        entries["segment_loops"] = segment_loops
+        entries["start_offset"] = start_offsets
+        entries["end_offset"] = end_offsets
+
+        first = np.concatenate(([0], np.cumsum(sequence_lengths)[:-1]))
+        last = first + sequence_lengths - 1
+        init = np.zeros(count, dtype=bool)
+        init[first] = True
+        end = np.zeros(count, dtype=bool)
+        end[last] = True
+        scenario_end = np.zeros(count, dtype=bool)
+        if count:
+            scenario_end[-1] = True
+
+        advance = np.zeros(count, dtype=np.uint32)
+        advance[first] = np.broadcast_to(_advance_code(sequence_advance), first.shape)
+        entries["control"] = pack_control_words(init, end, scenario_end, marker_enable, advance, segment_advance)
+        entries["sequence_loops"][first] = sequence_loops
+        return table
+
+    @classmethod
+    def from_words(cls, words):
+        """Wrap an (N, 6) array of entry words, e.g. read_sequence_table_block()["Entries"]."""
+        words = np.ascontiguousarray(words, dtype=np.uint32)
+        if words.ndim != 2 or words.shape[1] != 6:
+            raise ValueError("words must be an (N, 6) array")
+        return cls(words.view(SEQUENCE_ENTRY_DTYPE).reshape(-1))
+
+    @classmethod
+    def concatenate(cls, tables):
+        """Join tables (e.g. scenarios built separately) into one new table."""
+        return cls(np.concatenate([cls(table).entries for table in tables]))
+
+    # --------------------- ARRAY BEHAVIOUR ---------------------
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.entries[key]
+        result = self.entries[key]
+        return AWG_sequence_table(result) if isinstance(result, np.ndarray) else result
+
+    def __setitem__(self, key, value):
+        if isinstance(value, AWG_sequence_table):
+            value = value.entries
+        self.entries[key] = value
+
+    def __add__(self, other):
+        return AWG_sequence_table.concatenate([self, other])
+
+    def __eq__(self, other):
+        if not isinstance(other, AWG_sequence_table):
+            return NotImplemented
+        return np.array_equal(self.entries, other.entries)
+
+    def __array__(self, dtype=None, copy=None):
+        words = self.words()
+        return words if dtype is None else words.astype(dtype)
+
+    def __repr__(self):
+        return f"AWG_sequence_table({len(self)} entries)"
+
+    def copy(self):
+        return AWG_sequence_table(self.entries.copy())
+
+    def words(self) -> np.ndarray:
+        """(N, 6) uint32 view of the entries (no copy for contiguous tables)."""
+        return np.ascontiguousarray(self.entries).view(np.uint32).reshape(-1, 6)
+
+    def control_fields(self) -> dict:
+        """Decoded control word fields, see unpack_control_words()."""
+        return unpack_control_words(self.entries["control"])
+
+    # --------------------- VALIDATION AND SERIALIZATION ---------------------
+
+    def validate(self, catalog=None) -> list:
+        """
+        Check the table for entries the instrument would reject.
+
+        Args:
+            catalog (dict or list, optional): Segment catalog as {segment_id: length} or the
+                [(segment_id, length), ...] list of AWG_trace_system.get_segment_catalog()
+
+        Returns:
+            list: Error messages (empty if the table is valid)
+        """
+        errors = []
+        entries = self.entries
+        if not len(entries):
+            return ["Sequence table is empty"]
+        if len(entries) > MAX_SEQUENCE_ENTRIES:
+            errors.append(f"{len(entries)} entries exceed the table size of {MAX_SEQUENCE_ENTRIES}")
+
+        def report(mask, message):
+            indices = np.flatnonzero(mask)
+            if len(indices):
+                shown = ", ".join(map(str, indices[:10])) + (", ..." if len(indices) > 10 else "")
+                errors.append(f"{message} at entries {shown}")
+
+        data = (entries["control"] & CONTROL_COMMAND) == 0
+        ids = entries["segment_id"]
+        report(data & ((ids == 0) | (ids > MAX_SEGMENT_ID)), "Invalid segment ID")
+        report(data & (entries["segment_loops"] == 0), "Segment loop count of 0")
+        fields = self.control_fields()
+        report(fields["init_sequence"] & (entries["sequence_loops"] == 0), "Sequence loop count of 0")
+        bounded = entries["end_offset"] != END_OFFSET_ALL
+        report(data & bounded & (entries["start_offset"] > entries["end_offset"]), "Start offset after end offset")
+
+        # Every sequence must be opened by an init marker and closed by an end marker
+        depth = np.cumsum(fields["init_sequence"].astype(np.int64) - fields["end_sequence"].astype(np.int64))
+        if not fields["init_sequence"][0]:
+            errors.append("First entry does not start a sequence")
+        report((depth < 0) | (depth > 1), "Unbalanced sequence init/end markers")
+        if not fields["end_scenario"][-1]:
+            errors.append("Last entry does not end the scenario")
+
+        if catalog is not None:
+            if isinstance(catalog, dict):
+                catalog = list(catalog.items())
+            known = np.array([c for c in catalog if c[0] != 0], dtype=np.int64).reshape(-1, 2)
+            order = np.argsort(known[:, 0])
+            known_ids, lengths = known[order, 0], known[order, 1]
+            position = np.clip(np.searchsorted(known_ids, ids), 0, max(len(known_ids) - 1, 0))
+            found = (known_ids[position] == ids) if len(known_ids) else np.zeros(len(ids), dtype=bool)
+            report(data & ~found, "Segment not defined")
+            length = lengths[position] if len(known_ids) else np.zeros(len(ids), dtype=np.int64)
+            end = np.where(bounded, entries["end_offset"].astype(np.int64), length - 1)
+            report(data & found & ((end >= length) | (entries["start_offset"] >= length)),
+                   "Offset beyond segment length")
+        return errors
+
+    def to_block(self, byte_order: str = "NORMal") -> bytes:
+        """Serialize to the :STAB:DATA:BLOC payload (32-bit words, 'NORMal' big or 'SWAPped' little endian)."""
+        dtype = '>u4' if byte_order == "NORMal" else '<u4'
+        return self.words().astype(dtype, copy=False).tobytes()
+
+    @classmethod
+    def from_block(cls, payload, byte_order: str = "NORMal"):
+        """Decode a :STAB:DATA:BLOC? payload."""
+        dtype = '>u4' if byte_order == "NORMal" else '<u4'
+        return cls.from_words(np.frombuffer(payload, dtype=dtype).reshape(-1, 6))
+
+
+#Clean entries between two dirty ranges up to which the ranges are merged into one block write
+SEQUENCE_MERGE_GAP = 16
+
+
+def dirty_ranges(changed, merge_gap: int = SEQUENCE_MERGE_GAP) -> list:
+    """
+    Group a boolean per-entry mask into contiguous [start, stop) ranges.
+
+    Ranges separated by at most `merge_gap` clean entries are merged, since resending a
+    few unchanged entries is cheaper than another block transfer.
+    """
+    indices = np.flatnonzero(changed)
+    if not len(indices):
+        return []
+    breaks = np.flatnonzero(np.diff(indices) > merge_gap + 1)
+    starts = indices[np.concatenate(([0], breaks + 1))]
+    stops = indices[np.concatenate((breaks, [len(indices) - 1]))] + 1
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+class AWG_sequence_shadow:
+    """
+    Client-side copy of the instrument's sequence table, as far as it is known.
+
+    The shadow is only kept once activate() was called (by commit_sequence_table), so plain
+    entry writes cost nothing extra until then. Entries written through the session are
+    staged first and recorded once a sync (*OPC?/:SYST:ERR?) shows the instrument accepted
+    them; diff() then returns the entry ranges of a new table that differ from what the
+    instrument already holds. Rejected writes, :STAB:RES, *RST, setup recalls and
+    reconnects make entries unknown again.
+    """
+
+    def __init__(self):
+        self.words = np.zeros((0, 6), dtype=np.uint32)
+        self.known = np.zeros(0, dtype=bool)
+        self.owner = None
+        self.active = False
+        self._pending = []
+
+    def invalidate(self):
+        self.words = np.zeros((0, 6), dtype=np.uint32)
+        self.known = np.zeros(0, dtype=bool)
+        self.active = False
+        self._pending = []
+
+    def check_owner(self, resource):
+        # A new resource (reconnect) may talk to an instrument whose table changed meanwhile
+        if resource is not self.owner:
+            self.invalidate()
+            self.owner = resource
+
+    def activate(self, resource):
+        """Start tracking the entries written to `resource`."""
+        self.check_owner(resource)
+        self.active = True
+
+    @property
+    def pending(self) -> bool:
+        """True if staged writes wait for confirm() or discard()."""
+        return bool(self._pending)
+
+    def _grow(self, size: int):
+        if size > len(self.known):
+            capacity = max(size, 2 * len(self.known))
+            words = np.zeros((capacity, 6), dtype=np.uint32)
+            words[:len(self.words)] = self.words
+            known = np.zeros(capacity, dtype=bool)
+            known[:len(self.known)] = self.known
+            self.words, self.known = words, known
+
+    def update(self, index: int, words):
+        """Record entries the instrument holds starting at table index `index`."""
+        words = np.asarray(words, dtype=np.uint32).reshape(-1, 6)
+        self._grow(index + len(words))
+        self.words[index:index + len(words)] = words
+        self.known[index:index + len(words)] = True
+
+    def stage(self, index: int, words, resource):
+        """
+        Note entries sent to `resource`; they are recorded by confirm() after a clean sync.
+        Nothing is staged while the shadow is not active. The words are copied, so the
+        caller may reuse its buffer.
+        """
+        self.check_owner(resource)
+        if self.active:
+            self._pending.append((index, np.array(words, dtype=np.uint32).reshape(-1, 6)))
+
+    def confirm(self):
+        """The staged writes were accepted: record them."""
+        for index, words in self._pending:
+            self.update(index, words)
+        self._pending = []
+
+    def discard(self):
+        """The staged writes may have been rejected: their entries are unknown now."""
+        for index, words in self._pending:
+            self.known[index:index + len(words)] = False
+        self._pending = []
+
+    def diff(self, index: int, words, merge_gap: int = SEQUENCE_MERGE_GAP) -> list:
+        """
+        Ranges of `words` (relative to `index`) that must be uploaded to match the instrument.
+
+        Returns:
+            list: [(start, stop), ...] row ranges of `words`
+        """
+        words = np.asarray(words, dtype=np.uint32).reshape(-1, 6)
+        changed = np.ones(len(words), dtype=bool)
+        overlap = max(min(len(self.known) - index, len(words)), 0)
+        if overlap:
+            known = self.known[index:index + overlap]
+            same = (self.words[index:index + overlap] == words[:overlap]).all(axis=1)
+            changed[:overlap] = ~(known & same)
+        return dirty_ranges(changed, merge_gap)
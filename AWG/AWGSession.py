@@ -0,0 +1,282 @@
+#import awg modules
+from AWGConnection import AWG_connection
+from AWGTransport import SCPI_SOCKET_PORT
+from AWGBatch import AWG_batch, MAX_MESSAGE_BYTES, split_unquoted, group_commands, is_query
+from AWGStateCache import AWG_state_cache, INVALIDATING_COMMANDS
+from AWGSequenceTable import AWG_sequence_shadow
+from AWGTrace import AWG_trace, AWG_traced_resource
+
+#import other modules
+import time
+
+VERIFICATION_POLICIES = ("always", "never", "deferred")
+
+#Deferred read-backs collected outside a batch before they are flushed automatically
+MAX_DEFERRED_QUERIES = 256
+
+#Commands after which the sequence table content is unknown
+SEQUENCE_INVALIDATING_COMMANDS = INVALIDATING_COMMANDS + (":STAB:RES",)
+
+
+class AWG_session:
+    """
+    Shared VISA session for one AWG (e.g., M8195A).
+
+    A single session is created per instrument and handed to every subsystem, so all
+    subsystems share one AWG_connection, one pyvisa ResourceManager and one logger.
+    The live VISA resource is resolved on every call, so subsystems created before
+    connect() work as soon as the connection is opened.
+    """
+
+    def __init__(self, ip_address: str, connection: AWG_connection = None, transport: str = "vxi11",
+                 port: int = SCPI_SOCKET_PORT):
+        self.ip_address = ip_address
+
+        # One connection per instrument, over the chosen transport (see AWGTransport)
+        self.connection = connection if connection is not None else AWG_connection(ip_address, transport, port)
+
+        # Shared logger, initialized with a file path by connection.connect()
+        self.log = self.connection.log
+
+        # Binary transfer byte order as last set/queried via AWG_format (instrument default: NORMal)
+        self.byte_order = "NORMal"
+
+        # Open AWG_batch, if any; writes are queued on it instead of sent
+        self._batch = None
+
+        # Read-back policy for setters: "always", "never" or "deferred" (see verify())
+        self.verification_policy = "always"
+        self._deferred_queries = []
+        self.verified = {}
+
+        # Write-through settings cache (disabled by default, see AWG_state_cache)
+        self.cache = AWG_state_cache()
+        self._bypass_cache = False
+        self._cache_resource = None
+
+        # Copy of the uploaded sequence table, for diff-based updates (see AWG_stable_system)
+        self.sequence_shadow = AWG_sequence_shadow()
+
+        # Structured I/O trace with latency histograms (disabled by default, see enable_trace())
+        self.trace = None
+        self._traced_resource = None
+
+    # --------------------- RESOURCE RESOLUTION ---------------------
+
+    def get_resource(self):
+        """Return the live VISA resource (wrapped for tracing if enabled), or None when not connected."""
+        resource = self.connection.get_resource()
+        if self.trace is None or resource is None:
+            return resource
+        if self._traced_resource is None or self._traced_resource.resource is not resource:
+            self._traced_resource = AWG_traced_resource(resource, self.trace)
+        return self._traced_resource
+
+    def __bool__(self):
+        # Lets subsystems keep using `if self.resource:` as their connection check
+        return self.connection.get_resource() is not None
+
+    def __getattr__(self, name):
+        # Fallback for any other pyvisa resource attribute (timeout, chunk_size, ...)
+        if name.startswith("_") or name == "connection":
+            raise AttributeError(name)
+        resource = self.connection.get_resource()
+        if resource is None:
+            raise AttributeError(f"'{name}' is not available: device not connected")
+        return getattr(resource, name)
+
+    # --------------------- BATCHING ---------------------
+
+    def batch(self, max_message_bytes: int = MAX_MESSAGE_BYTES):
+        """Return a context manager that sends the enclosed writes as one SCPI message."""
+        return AWG_batch(self, max_message_bytes)
+
+    def _flush_batch(self):
+        if self._batch is not None:
+            self._batch.flush()
+
+    # --------------------- SETTER VERIFICATION ---------------------
+
+    def set_verification_policy(self, policy: str):
+        """
+        Choose how setters confirm their writes.
+
+        Args:
+            policy (str): "always" (query right after each write; inside a batch, with the
+                batch's closing sync), "never" (no read-back) or "deferred" (collect the queries
+                and send them as one multi-query at the end of the enclosing batch, or on
+                flush_verifications())
+        """
+        if policy not in VERIFICATION_POLICIES:
+            raise ValueError(f"Invalid verification policy '{policy}'. Must be one of {VERIFICATION_POLICIES}")
+        self.verification_policy = policy
+
+    def verify(self, command: str, getter=None, *args, query: str = None):
+        """
+        Confirm a setter's write according to the verification policy.
+
+        Args:
+            command (str): The SCPI command the setter wrote
+            getter (callable, optional): Subsystem getter to call in "always" mode
+            *args: Arguments for the getter
+            query (str, optional): Read-back query; defaults to the command header followed by '?'
+
+        Inside a batch, "always" read-backs are deferred as well: querying after each
+        setter would flush the queue every time and cost one round trip per command.
+
+        Returns:
+            The getter's result (or the raw query response when no getter is given) in
+            "always" mode; otherwise {"Verification": "Skipped" | "Deferred"} (or None without a getter).
+        """
+        if query is None:
+            query = command.strip().split(" ", 1)[0] + "?"
+
+        if self.verification_policy == "always" and self._batch is None:
+            # Read-backs must reach the instrument, not the settings cache
+            self._bypass_cache = True
+            try:
+                if getter is None:
+                    return self.query(query).strip()
+                return getter(*args)
+            finally:
+                self._bypass_cache = False
+
+        if self.verification_policy != "never":
+            self._deferred_queries.append(query)
+            if self._batch is None and len(self._deferred_queries) >= MAX_DEFERRED_QUERIES:
+                # Outside a batch nothing else bounds the queue
+                self.flush_verifications()
+            status = "Deferred"
+        else:
+            status = "Skipped"
+        return {"Verification": status} if getter is not None else None
+
+    def flush_verifications(self, max_message_bytes: int = MAX_MESSAGE_BYTES):
+        """
+        Send all deferred read-back queries as ';'-joined multi-queries of at most
+        `max_message_bytes` each (usually one). Outside a batch this also happens
+        automatically once MAX_DEFERRED_QUERIES are queued.
+
+        Returns:
+            dict: {query: response} for every deferred query (also merged into self.verified)
+        """
+        queries = self._deferred_queries
+        self._deferred_queries = []
+        if not queries:
+            return {}
+
+        self._flush_batch()
+        resource = self.get_resource()
+        results = {}
+        for group in group_commands(queries, max_message_bytes):
+            message = ";".join(group)
+            start_time = time.time()
+            responses = split_unquoted(resource.query(message).strip())
+            duration = (time.time() - start_time) * 1000
+            self.log._log_command(message, duration_ms=duration, response=";".join(responses))
+            results.update(self._store_verifications(group, responses))
+        return results
+
+    def _store_verifications(self, queries: list, responses: list):
+        if len(responses) != len(queries):
+            # A response contained an unquoted ';' itself; fall back to one query each
+            resource = self.get_resource()
+            responses = [resource.query(q) for q in queries]
+        results = {q: r.strip() for q, r in zip(queries, responses)}
+        for q, r in results.items():
+            self.cache.record_query(q, r)
+        self.verified.update(results)
+        return results
+
+    # --------------------- STATE CACHE ---------------------
+
+    def set_state_cache(self, enabled: bool):
+        """Enable or disable the settings cache; disabling also clears it."""
+        self.cache.enabled = enabled
+        self.cache.invalidate()
+
+    def _check_cache_owner(self, resource):
+        # A new VISA resource (reconnect) means the cached state may be stale
+        if resource is not self._cache_resource:
+            self.cache.invalidate()
+            self._cache_resource = resource
+
+    # --------------------- TRACING ---------------------
+
+    def enable_trace(self, path: str = None, format: str = "jsonl"):
+        """
+        Record every I/O operation of this session (see AWG_trace).
+
+        Args:
+            path (str, optional): Trace file; without a path only the latency histograms are kept
+            format (str): "jsonl" or "binary"
+
+        Returns:
+            AWG_trace: The active trace
+        """
+        self.disable_trace()
+        self.trace = AWG_trace(path, format)
+        return self.trace
+
+    def disable_trace(self):
+        """Stop tracing and close the trace file. Returns the closed trace (or None)."""
+        trace = self.trace
+        if trace is not None:
+            trace.close()
+        self.trace = None
+        self._traced_resource = None
+        return trace
+
+    # --------------------- I/O METHODS ---------------------
+
+    def write(self, command: str):
+        if command.lstrip().upper().startswith(SEQUENCE_INVALIDATING_COMMANDS):
+            self.sequence_shadow.invalidate()
+        if self.cache.enabled:
+            self._check_cache_owner(self.connection.get_resource())
+            if not self.cache.record_write(command):
+                return 0  # value unchanged, nothing to send
+        if self._batch is not None:
+            if is_query(command):
+                # A query sent with write(): send it with the queue so the caller can read the response
+                self._batch.flush(query=command)
+            else:
+                self._batch.add(command)
+            return len(command)
+        try:
+            return self.get_resource().write(command)
+        except Exception:
+            self.cache.discard(command)
+            raise
+
+    def query(self, command: str):
+        if self.cache.enabled:
+            self._check_cache_owner(self.connection.get_resource())
+            if not self._bypass_cache:
+                cached = self.cache.lookup(command)
+                if cached is not None:
+                    return cached
+        self._flush_batch()
+        response = self.get_resource().query(command)
+        self.cache.record_query(command, response)
+        return response
+
+    def read(self):
+        self._flush_batch()
+        return self.get_resource().read()
+
+    def read_raw(self, size: int = None):
+        self._flush_batch()
+        return self.get_resource().read_raw(size)
+
+    def write_raw(self, message: bytes):
+        self._flush_batch()
+        return self.get_resource().write_raw(message)
+
+    def write_binary_values(self, command: str, values, **kwargs):
+        self._flush_batch()
+        return self.get_resource().write_binary_values(command, values, **kwargs)
+
+    def query_binary_values(self, command: str, **kwargs):
+        self._flush_batch()
+        return self.get_resource().query_binary_values(command, **kwargs)
@@ -0,0 +1,846 @@
+#import awg modules
+from IEEEBlock import ieee_block_header
+from AWGTransport import SCPI_SOCKET_PORT
+
+#import other modules
+import re
+import socket
+import threading
+import time
+
+import numpy as np
+
+#Long-form SCPI mnemonics accepted by the simulator, mapped to their short form
+LONG_FORMS = {
+    "TRACE": "TRAC", "DEFINE": "DEF", "DELETE": "DEL", "CATALOG": "CAT", "SELECT": "SEL", "ADVANCE": "ADV",
+    "COUNT": "COUN", "MARKER": "MARK", "COMMENT": "COMM", "BLOCK": "BLOC", "IMPORT": "IMP", "SCALE": "SCAL",
+    "STATUS": "STAT", "QUESTIONABLE": "QUES", "OPERATION": "OPER", "EVENT": "EVEN", "CONDITION": "COND",
+    "ENABLE": "ENAB", "PRESET": "PRES", "VOLTAGE": "VOLT", "FREQUENCY": "FREQ", "SEQUENCE": "SEQ",
+    "CONNECTION": "CONN", "OUTPUT": "OUTP", "OFFSET": "OFFS", "TERMINATION": "TERM", "RASTER": "RAST",
+    "MMEMORY": "MMEM", "DIRECTORY": "DIR", "STORE": "STOR", "RESET": "RES", "SCENARIO": "SCEN",
+    "DYNAMIC": "DYN", "SYSTEM": "SYST", "ERROR": "ERR", "FORMAT": "FORM", "BORDER": "BORD",
+}
+
+#Query results for settings that were never written
+SETTING_DEFAULTS = {
+    "VOLT": "0.5", "VOLT:OFFS": "0", "VOLT:HIGH": "0.25", "VOLT:LOW": "-0.25", "VOLT:TERM": "0",
+    "OUTP": "0", "FREQ:RAST": "6.4E10", "FORM:BORD": "NORM", "TRAC:MMOD": "INT", "TRAC:SEL": "1",
+    "TRAC:ADV": "AUTO", "TRAC:COUN": "1", "TRAC:MARK": "0", "STAB:SEQ:SEL": "0", "STAB:DYN": "0",
+    "STAB:SCEN:SEL": "0", "STAB:SCEN:ADV": "AUTO", "STAB:SCEN:COUN": "1", "INST:DACM": "SING",
+}
+
+#Other subsystems whose settings are modelled as plain stored values
+SETTING_SUBSYSTEMS = ("ABOR", "ARM", "CARR", "CHAR", "FORM", "FREQ", "FUNC", "INIT", "INST", "OUTP", "ROSC",
+                      "SYST", "TEST", "TRIG", "VOLT")
+
+#(MIN, MAX, DEF) values resolved by the simulator for keyword arguments
+SETTING_LIMITS = {
+    "VOLT": ("0.075", "1.0", "0.5"),
+    "VOLT:OFFS": ("-1.0", "1.0", "0"),
+    "FREQ:RAST": ("5.3E10", "6.5E10", "6.4E10"),
+}
+
+#Status groups: summary bit of each child register in its parent's condition register.
+#The top-level QUES/OPER summaries are bits 3 and 7 of the status byte.
+STATUS_GROUPS = {
+    "QUES": ("STB", 3), "OPER": ("STB", 7),
+    "QUES:VOLT": ("QUES", 0), "QUES:FREQ": ("QUES", 5), "QUES:SEQ": ("QUES", 8),
+    "QUES:DUC": ("QUES", 9), "QUES:CONN": ("QUES", 10), "OPER:RUN": ("OPER", 8),
+}
+
+#Status byte bits
+STB_ERROR_QUEUE = 2
+STB_MAV = 4
+STB_ESB = 5
+STB_RQS = 6
+
+DEFAULT_MEMORY_SAMPLES = 16 * 1024 ** 3
+DEFAULT_SEQUENCE_ENTRIES = 16 * 1024 * 1024
+
+
+class _scpi_error(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(f'{code},"{message}"')
+
+
+class AWG_simulated_instrument:
+    """
+    In-memory model of the M8195A command tree used by this package.
+
+    Covers *IDN?/*OPC?/*RST/*CLS/*STB?/*ESR?/*SRE/*ESE, :SYST:ERR?, segment memory
+    (:TRAC:DEF/DATA/DATA?/DATA:BLOC?/DEL/CAT?/FREE?/NAME/COMM), the sequence table
+    (:STAB:RES/DATA/DATA?/DATA:BLOC?), status registers (:STAT:...), an in-memory file
+    system (:MMEM:...) and any other setting (:OUTP, :VOLT, :FREQ:RAST, ...) as a
+    stored value. Errors go to the error queue like on the instrument.
+
+    `latency` (seconds per command, or {header prefix: seconds}) and `bandwidth`
+    (bytes/s for data in both directions) slow responses down to model a real unit.
+    Segment data is stored as int8 DAC codes; :TRAC:DATA:BLOC? returns them as float32
+    in the :FORM:BORD byte order, which is what AWG_trace_system decodes.
+    """
+
+    def __init__(self, idn: str = "Keysight Technologies,M8195A,SIM0000001,4.0.0", latency=0.0,
+                 bandwidth: float = None, channels: int = 4, memory_samples: int = DEFAULT_MEMORY_SAMPLES,
+                 sequence_entries: int = DEFAULT_SEQUENCE_ENTRIES):
+        self.idn = idn
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.channels = channels
+        self.memory_samples = memory_samples
+        self.sequence_entries = sequence_entries
+        self.lock = threading.RLock()
+
+        # Called with the status byte whenever a service request is raised (see service_request)
+        self.srq_listeners = []
+
+        self.files = {}
+        self.current_directory = "C:\\"
+        self.reset()
+        self.error_queue = []
+        self._clear_status()
+
+    # --------------------- STATE ---------------------
+
+    def reset(self):
+        """*RST: default settings, empty segment memory and sequence table."""
+        self.settings = {}
+        self.segments = {channel: {} for channel in range(1, self.channels + 1)}
+        # Written part of the sequence table; words past its end read as 0 (grown on write)
+        self.sequence_table = np.zeros(0, dtype=np.uint32)
+        self.started_ns = None
+
+    def _clear_status(self):
+        self.status = {group: {"COND": 0, "EVEN": 0, "ENAB": 0, "PTR": 0xFFFF, "NTR": 0} for group in STATUS_GROUPS}
+        self.esr = 0
+        self.ese = 0
+        self.sre = 0
+        self._rqs = False
+
+    def setting(self, header: str) -> str:
+        """Current value of a stored setting, e.g. setting("VOLT1:OFFS")."""
+        key = header.strip(":").upper()
+        return self.settings.get(key, SETTING_DEFAULTS.get(re.sub(r"(?<=[A-Z])\d+", "", key), "0"))
+
+    def _push_error(self, error: str):
+        self.error_queue.append(error)
+        self.esr |= 1 << 4 if error.startswith("-2") else 1 << 5
+        self._update_status()
+
+    # --------------------- STATUS MODEL ---------------------
+
+    def set_condition(self, group: str, bits: int):
+        """
+        Drive a status group's condition register (e.g. to simulate a questionable voltage),
+        latching events through the PTR/NTR filters and propagating summary bits.
+        """
+        with self.lock:
+            self._set_condition(group.upper(), bits)
+            self._update_status()
+
+    def _set_condition(self, group: str, bits: int):
+        register = self.status[group]
+        rising = bits & ~register["COND"] & register["PTR"]
+        falling = ~bits & register["COND"] & register["NTR"]
+        register["COND"] = bits
+        register["EVEN"] |= rising | falling
+
+    def _update_status(self):
+        # Children first, so their summaries reach the top-level groups
+        for group in sorted(STATUS_GROUPS, key=lambda g: -g.count(":")):
+            parent, bit = STATUS_GROUPS[group]
+            if parent == "STB":
+                continue
+            register = self.status[group]
+            summary = bool(register["EVEN"] & register["ENAB"])
+            condition = self.status[parent]["COND"]
+            condition = condition | (1 << bit) if summary else condition & ~(1 << bit)
+            if condition != self.status[parent]["COND"]:
+                self._set_condition(parent, condition)
+
+        stb = self.status_byte()
+        rqs = bool(stb & self.sre & ~(1 << STB_RQS))
+        if rqs and not self._rqs:
+            for listener in list(self.srq_listeners):
+                listener(stb | (1 << STB_RQS))
+        self._rqs = rqs
+
+    def status_byte(self) -> int:
+        stb = 0
+        for group in ("QUES", "OPER"):
+            register = self.status[group]
+            if register["EVEN"] & register["ENAB"]:
+                stb |= 1 << STATUS_GROUPS[group][1]
+        if self.error_queue:
+            stb |= 1 << STB_ERROR_QUEUE
+        if self.esr & self.ese:
+            stb |= 1 << STB_ESB
+        if stb & self.sre:
+            stb |= 1 << STB_RQS
+        return stb
+
+    @property
+    def service_request(self) -> bool:
+        """True while the status byte requests service (SRQ line asserted)."""
+        return bool(self.status_byte() & (1 << STB_RQS))
+
+    # --------------------- MESSAGE HANDLING ---------------------
+
+    def handle(self, message) -> bytes:
+        """
+        Execute one program message (';'-joined commands, binary blocks allowed).
+
+        Returns:
+            bytes: The response message including the terminator, or b"" when it contains no query
+        """
+        if not isinstance(message, bytes):
+            message = bytes(message)
+        responses = []
+        with self.lock:
+            for header, args in self._parse(message):
+                self._delay(header, sum(len(a) for a in args if isinstance(a, memoryview)))
+                try:
+                    response = self._execute(header, args)
+                except _scpi_error as e:
+                    self._push_error(str(e))
+                    continue
+                except (ValueError, IndexError, KeyError) as e:
+                    self._push_error(f'-222,"Data out of range;{e}"')
+                    continue
+                if response is not None:
+                    responses.append(response if isinstance(response, bytes) else str(response).encode())
+        if not responses:
+            return b""
+        response = b";".join(responses) + b"\n"
+        self._delay("", len(response) if self.bandwidth else 0)
+        return response
+
+    def _delay(self, header: str, num_bytes: int):
+        latency = self.latency
+        if isinstance(latency, dict):
+            latency = max((v for k, v in latency.items() if header.startswith(k.strip(":").upper())), default=0.0)
+        if header and latency:
+            time.sleep(latency)
+        if num_bytes and self.bandwidth:
+            time.sleep(num_bytes / self.bandwidth)
+
+    @staticmethod
+    def _parse(data: bytes):
+        """Yield (header, args) per command; args are str, or memoryview for binary blocks."""
+        pos, end = 0, len(data)
+        while pos < end:
+            while pos < end and data[pos] in b" \t\r\n;":
+                pos += 1
+            if pos >= end:
+                return
+            stop = pos
+            while stop < end and data[stop] not in b" \t;\n":
+                stop += 1
+            header = data[pos:stop].decode("ascii")
+            pos = stop
+            while pos < end and data[pos] in b" \t":
+                pos += 1
+
+            args = []
+            # Fast path: plain (numeric) argument list without strings or blocks
+            next_end = min([i for i in (data.find(b";", pos), data.find(b"\n", pos)) if i >= 0], default=end)
+            segment = data[pos:next_end]
+            if b'"' not in segment and b"#" not in segment:
+                if segment.strip():
+                    args = [a.strip().decode("ascii") for a in segment.split(b",")]
+                pos = next_end
+                yield header, args
+                continue
+
+            while pos < end and data[pos] not in b";\n":
+                if data[pos:pos + 1] == b'"':
+                    close = pos + 1
+                    while True:
+                        close = data.index(b'"', close)
+                        if data[close + 1:close + 2] == b'"':
+                            close += 2
+                            continue
+                        break
+                    args.append(data[pos + 1:close].decode().replace('""', '"'))
+                    pos = close + 1
+                elif data[pos:pos + 1] == b"#":
+                    num_digits = int(data[pos + 1:pos + 2])
+                    length = int(data[pos + 2:pos + 2 + num_digits])
+                    start = pos + 2 + num_digits
+                    args.append(memoryview(data)[start:start + length])
+                    pos = start + length
+                else:
+                    stop = pos
+                    while stop < end and data[stop] not in b",;\n":
+                        stop += 1
+                    args.append(data[pos:stop].strip().decode("ascii"))
+                    pos = stop
+                while pos < end and data[pos] in b" \t":
+                    pos += 1
+                if data[pos:pos + 1] == b",":
+                    pos += 1
+                    while pos < end and data[pos] in b" \t":
+                        pos += 1
+            yield header, args
+
+    @staticmethod
+    def _split_header(header: str):
+        """Return (short-form route without suffixes, suffixed key, first numeric suffix)."""
+        query = header.endswith("?")
+        nodes = header.strip().lstrip(":").rstrip("?").upper().split(":")
+        route, key, suffix = [], [], None
+        for node in nodes:
+            if node.startswith("*"):
+                route.append(node)
+                key.append(node)
+                continue
+            match = re.fullmatch(r"([A-Z]+)(\d*)", node)
+            if match is None:
+                raise _scpi_error(-113, "Undefined header")
+            name, number = match.groups()
+            if name in ("RCD",):  # mnemonics ending in a digit
+                name, number = name + number, ""
+            name = LONG_FORMS.get(name, name)
+            route.append(name)
+            key.append(name + number)
+            if number and suffix is None:
+                suffix = int(number)
+        tail = "?" if query else ""
+        return ":".join(route) + tail, ":".join(key), suffix
+
+    def _execute(self, header: str, args: list):
+        route, key, suffix = self._split_header(header)
+        channel = suffix if suffix is not None else 1
+        handler = self._HANDLERS.get(route)
+        if handler is not None:
+            return handler(self, channel, args)
+        if route.startswith("STAT:"):
+            return self._status_register(route, args)
+        if not route.startswith(self._STORED_SETTINGS) and route.rstrip("?").split(":")[0] not in SETTING_SUBSYSTEMS:
+            raise _scpi_error(-113, "Undefined header")
+        return self._generic_setting(route, key, args)
+
+    def _generic_setting(self, route: str, key: str, args: list):
+        if route.endswith("?"):
+            return self.setting(key)
+        if not args:
+            return None  # event command such as :INIT:IMM or :ABOR
+        value = ",".join(args)
+        keyword = value.upper()
+        limits = SETTING_LIMITS.get(route)
+        if keyword in ("MIN", "MINIMUM", "MAX", "MAXIMUM", "DEF", "DEFAULT"):
+            value = limits[("MIN", "MAX", "DEF").index(keyword[:3])] if limits else SETTING_DEFAULTS.get(route, "0")
+        elif limits is not None:
+            number = float(value)
+            if not float(limits[0]) <= number <= float(limits[1]):
+                raise _scpi_error(-222, "Data out of range")
+        self.settings[key] = value
+        return None
+
+    # --------------------- COMMON COMMANDS ---------------------
+
+    def _idn(self, channel, args):
+        return self.idn
+
+    def _opc_query(self, channel, args):
+        return "1"
+
+    def _opc(self, channel, args):
+        self.esr |= 1
+        self._update_status()
+
+    def _no_op(self, channel, args):
+        return None
+
+    def _rst(self, channel, args):
+        self.reset()
+        self._abor(channel, args)
+
+    def _cls(self, channel, args):
+        self.error_queue = []
+        self.esr = 0
+        for register in self.status.values():
+            register["EVEN"] = 0
+        self._update_status()
+
+    def _esr_query(self, channel, args):
+        esr, self.esr = self.esr, 0
+        self._update_status()
+        return str(esr)
+
+    def _ese(self, channel, args):
+        self.ese = int(float(args[0]))
+        self._update_status()
+
+    def _ese_query(self, channel, args):
+        return str(self.ese)
+
+    def _sre(self, channel, args):
+        self.sre = int(float(args[0])) & ~(1 << STB_RQS)
+        self._update_status()
+
+    def _sre_query(self, channel, args):
+        return str(self.sre)
+
+    def _stb_query(self, channel, args):
+        return str(self.status_byte())
+
+    def _opt_query(self, channel, args):
+        return "001,002,004,16G,SEQ"
+
+    def _tst_query(self, channel, args):
+        return "0"
+
+    def _syst_err(self, channel, args):
+        if not self.error_queue:
+            return '0,"No error"'
+        error = self.error_queue.pop(0)
+        self._update_status()
+        return error
+
+    # --------------------- RUN STATE ---------------------
+
+    def _init_imm(self, channel, args):
+        # perf_counter_ns of the start, so tests can compare start times across instruments
+        self.started_ns = time.perf_counter_ns()
+        self._set_condition("OPER:RUN", self.status["OPER:RUN"]["COND"] | 1)
+        self._update_status()
+
+    def _abor(self, channel, args):
+        self._set_condition("OPER:RUN", self.status["OPER:RUN"]["COND"] & ~1)
+        self._update_status()
+
+    # --------------------- STATUS REGISTERS ---------------------
+
+    def _status_register(self, route: str, args: list):
+        query = route.endswith("?")
+        nodes = route.rstrip("?").split(":")[1:]
+        if nodes == ["PRES"]:
+            for register in self.status.values():
+                register.update({"ENAB": 0, "PTR": 0xFFFF, "NTR": 0})
+            self._update_status()
+            return None
+        group, register = ":".join(nodes[:-1]), nodes[-1]
+        if group not in self.status:
+            group, register = ":".join(nodes), "EVEN"  # :STAT:QUES? is the event register
+        if group not in self.status or register not in ("COND", "EVEN", "ENAB", "PTR", "NTR"):
+            raise _scpi_error(-113, "Undefined header")
+
+        registers = self.status[group]
+        if query:
+            value = registers[register]
+            if register == "EVEN":
+                registers["EVEN"] = 0
+                self._update_status()
+            return str(value)
+        if register in ("COND", "EVEN"):
+            raise _scpi_error(-113, "Undefined header")
+        registers[register] = int(float(args[0])) & 0xFFFF
+        self._update_status()
+        return None
+
+    # --------------------- SEGMENT MEMORY ---------------------
+
+    def _check_channel(self, channel: int):
+        if channel not in self.segments:
+            raise _scpi_error(-114, "Header suffix out of range")
+
+    def _segment(self, channel: int, segment_id) -> dict:
+        self._check_channel(channel)
+        segment = self.segments[channel].get(int(segment_id))
+        if segment is None:
+            raise _scpi_error(-222, "Data out of range;segment not defined")
+        return segment
+
+    def _allocate(self, channel: int, length: int) -> int:
+        """First-fit address of a free block of `length` samples (rounded to 256)."""
+        size = -(-length // 256) * 256
+        address = 0
+        for segment in sorted(self.segments[channel].values(), key=lambda s: s["start"]):
+            if segment["start"] - address >= size:
+                return address
+            address = segment["start"] + segment["size"]
+        if self.memory_samples - address < size:
+            raise _scpi_error(-225, "Out of memory")
+        return address
+
+    def _define(self, channel: int, segment_id: int, length: int, init_value: int = 0):
+        self._check_channel(channel)
+        if segment_id in self.segments[channel]:
+            raise _scpi_error(-222, "Data out of range;segment already defined")
+        if not 1 <= segment_id <= 16777215 or length <= 0:
+            raise _scpi_error(-222, "Data out of range")
+        start = self._allocate(channel, length)
+        data = np.zeros(length, dtype=np.int8)  # lazily backed pages, so large segments are cheap
+        if init_value:
+            data[:] = init_value
+        self.segments[channel][segment_id] = {
+            "data": data, "start": start, "size": -(-length // 256) * 256, "name": "", "comment": ""
+        }
+
+    def _trac_def(self, channel, args):
+        init_value = int(float(args[2])) if len(args) > 2 else 0
+        self._define(channel, int(args[0]), int(float(args[1])), init_value)
+
+    def _trac_def_new(self, channel, args):
+        self._check_channel(channel)
+        segment_id = max(self.segments[channel], default=0) + 1
+        init_value = int(float(args[1])) if len(args) > 1 else 0
+        self._define(channel, segment_id, int(float(args[0])), init_value)
+        return str(segment_id)
+
+    def _trac_data(self, channel, args):
+        segment = self._segment(channel, args[0])
+        offset = int(args[1])
+        if len(args) == 3 and isinstance(args[2], memoryview):
+            codes = np.frombuffer(args[2], dtype=np.int8)
+        else:
+            values = np.array(args[2:], dtype="S").astype(np.float64)
+            codes = np.clip(np.rint(values), -128, 127).astype(np.int8)
+        if offset < 0 or offset + len(codes) > len(segment["data"]):
+            raise _scpi_error(-222, "Data out of range")
+        segment["data"][offset:offset + len(codes)] = codes
+
+    def _segment_slice(self, channel, args) -> np.ndarray:
+        segment = self._segment(channel, args[0])
+        offset, length = int(args[1]), int(args[2])
+        if offset < 0 or length < 0 or offset + length > len(segment["data"]):
+            raise _scpi_error(-222, "Data out of range")
+        return segment["data"][offset:offset + length]
+
+    def _trac_data_query(self, channel, args):
+        return ",".join(map(str, self._segment_slice(channel, args).tolist()))
+
+    def _trac_data_block(self, channel, args):
+        dtype = ">f4" if self.setting("FORM:BORD").startswith("NORM") else "<f4"
+        payload = self._segment_slice(channel, args).astype(dtype).tobytes()
+        return ieee_block_header(len(payload)) + payload
+
+    def _trac_del(self, channel, args):
+        self._segment(channel, args[0])
+        del self.segments[channel][int(args[0])]
+
+    def _trac_del_all(self, channel, args):
+        self._check_channel(channel)
+        self.segments[channel] = {}
+
+    def _trac_cat(self, channel, args):
+        self._check_channel(channel)
+        if not self.segments[channel]:
+            return "0,0"
+        return ",".join(f"{segment_id},{len(s['data'])}" for segment_id, s in sorted(self.segments[channel].items()))
+
+    def _trac_free(self, channel, args):
+        self._check_channel(channel)
+        in_use = sum(s["size"] for s in self.segments[channel].values())
+        contiguous = 0
+        address = 0
+        for segment in sorted(self.segments[channel].values(), key=lambda s: s["start"]):
+            contiguous = max(contiguous, segment["start"] - address)
+            address = segment["start"] + segment["size"]
+        contiguous = max(contiguous, self.memory_samples - address)
+        return f"{self.memory_samples - in_use},{in_use},{contiguous}"
+
+    def _trac_name(self, channel, args):
+        self._segment(channel, args[0])["name"] = args[1] if len(args) > 1 else ""
+
+    def _trac_name_query(self, channel, args):
+        return f'"{self._segment(channel, args[0])["name"]}"'
+
+    def _trac_comm(self, channel, args):
+        self._segment(channel, args[0])["comment"] = args[1] if len(args) > 1 else ""
+
+    def _trac_comm_query(self, channel, args):
+        return f'"{self._segment(channel, args[0])["comment"]}"'
+
+    # --------------------- SEQUENCE TABLE ---------------------
+
+    def _stab_res(self, channel, args):
+        self.sequence_table = np.zeros(0, dtype=np.uint32)
+
+    def _stab_words(self, index, count: int) -> slice:
+        start = int(index) * 6
+        if start < 0 or count < 0 or start + count > self.sequence_entries * 6:
+            raise _scpi_error(-222, "Data out of range")
+        return slice(start, start + count)
+
+    def _stab_read(self, index, count: int) -> np.ndarray:
+        words = self._stab_words(index, count)
+        values = np.zeros(count, dtype=np.uint32)
+        stored = self.sequence_table[words]
+        values[:len(stored)] = stored
+        return values
+
+    def _stab_data(self, channel, args):
+        if len(args) == 2 and isinstance(args[1], memoryview):
+            dtype = ">u4" if self.setting("FORM:BORD").startswith("NORM") else "<u4"
+            values = np.frombuffer(args[1], dtype=dtype)
+        else:
+            values = np.array([int(float(v)) for v in args[1:]], dtype=np.int64).astype(np.uint32)
+        words = self._stab_words(args[0], len(values))
+        if words.stop > len(self.sequence_table):
+            table = np.zeros(min(max(words.stop, 2 * len(self.sequence_table)), self.sequence_entries * 6),
+                             dtype=np.uint32)
+            table[:len(self.sequence_table)] = self.sequence_table
+            self.sequence_table = table
+        self.sequence_table[words] = values
+
+    def _stab_data_query(self, channel, args):
+        count = int(args[1]) if len(args) > 1 else 6
+        return ",".join(map(str, self._stab_read(args[0], count).tolist()))
+
+    def _stab_data_block(self, channel, args):
+        count = int(args[1]) if len(args) > 1 else 6
+        dtype = ">u4" if self.setting("FORM:BORD").startswith("NORM") else "<u4"
+        payload = self._stab_read(args[0], count).astype(dtype).tobytes()
+        return ieee_block_header(len(payload)) + payload
+
+    # --------------------- MASS MEMORY ---------------------
+
+    def _path(self, name: str) -> str:
+        name = name.replace("/", "\\")
+        if re.match(r"^[A-Za-z]:\\", name):
+            return name
+        return self.current_directory.rstrip("\\") + "\\" + name
+
+    def _mmem_cat(self, channel, args):
+        directory = self._path(args[0]) if args else self.current_directory
+        prefix = directory.rstrip("\\") + "\\"
+        entries = []
+        for path, content in sorted(self.files.items()):
+            if path.startswith(prefix) and "\\" not in path[len(prefix):]:
+                if content is None:
+                    entries.append(f'"{path[len(prefix):]},DIR,0"')
+                else:
+                    entries.append(f'"{path[len(prefix):]},BIN,{len(content)}"')
+        used = sum(len(c) for c in self.files.values() if c is not None)
+        return ",".join([str(used), str(2 ** 40 - used)] + entries)
+
+    def _mmem_cdir(self, channel, args):
+        self.current_directory = self._path(args[0]) if args else "C:\\"
+
+    def _mmem_cdir_query(self, channel, args):
+        return f'"{self.current_directory}"'
+
+    def _mmem_mdir(self, channel, args):
+        self.files[self._path(args[0]).rstrip("\\")] = None
+
+    def _mmem_rdir(self, channel, args):
+        path = self._path(args[0]).rstrip("\\")
+        if self.files.get(path, b"") is not None:
+            raise _scpi_error(-256, "File name not found")
+        del self.files[path]
+
+    def _mmem_data(self, channel, args):
+        self.files[self._path(args[0])] = bytes(args[1]) if isinstance(args[1], memoryview) else args[1].encode()
+
+    def _file(self, name: str) -> bytes:
+        content = self.files.get(self._path(name))
+        if content is None:
+            raise _scpi_error(-256, "File name not found")
+        return content
+
+    def _mmem_data_query(self, channel, args):
+        content = self._file(args[0])
+        return ieee_block_header(len(content)) + content
+
+    def _mmem_del(self, channel, args):
+        self._file(args[0])
+        del self.files[self._path(args[0])]
+
+    def _mmem_copy(self, channel, args):
+        self.files[self._path(args[1])] = self._file(args[0])
+
+    def _mmem_move(self, channel, args):
+        self.files[self._path(args[1])] = self._file(args[0])
+        del self.files[self._path(args[0])]
+
+    def _mmem_stor_cst(self, channel, args):
+        state = ";".join(f":{key} {value}" for key, value in sorted(self.settings.items()))
+        self.files[self._path(args[0])] = state.encode()
+
+    def _mmem_load_cst(self, channel, args):
+        content = self._file(args[0]).decode()
+        self.settings = {}
+        for command in filter(None, content.split(";")):
+            header, value = command.split(" ", 1)
+            self.settings[header.lstrip(":")] = value
+
+    _HANDLERS = {
+        "*IDN?": _idn, "*OPC?": _opc_query, "*OPC": _opc, "*WAI": _no_op, "*RST": _rst, "*CLS": _cls,
+        "*ESR?": _esr_query, "*ESE": _ese, "*ESE?": _ese_query, "*SRE": _sre, "*SRE?": _sre_query,
+        "*STB?": _stb_query, "*OPT?": _opt_query, "*TST?": _tst_query, "SYST:ERR?": _syst_err,
+        "INIT:IMM": _init_imm, "ABOR": _abor,
+        "TRAC:DEF": _trac_def, "TRAC:DEF:NEW?": _trac_def_new, "TRAC:DEF:WONL": _trac_def,
+        "TRAC:DEF:WONL:NEW?": _trac_def_new, "TRAC:DATA": _trac_data, "TRAC:DATA?": _trac_data_query,
+        "TRAC:DATA:BLOC?": _trac_data_block, "TRAC:DEL": _trac_del, "TRAC:DEL:ALL": _trac_del_all,
+        "TRAC:CAT?": _trac_cat, "TRAC:FREE?": _trac_free, "TRAC:NAME": _trac_name,
+        "TRAC:NAME?": _trac_name_query, "TRAC:COMM": _trac_comm, "TRAC:COMM?": _trac_comm_query,
+        "STAB:RES": _stab_res, "STAB:DATA": _stab_data, "STAB:DATA?": _stab_data_query,
+        "STAB:DATA:BLOC": _stab_data, "STAB:DATA:BLOC?": _stab_data_block,
+        "MMEM:CAT?": _mmem_cat, "MMEM:CDIR": _mmem_cdir, "MMEM:CDIR?": _mmem_cdir_query,
+        "MMEM:MDIR": _mmem_mdir, "MMEM:RDIR": _mmem_rdir, "MMEM:DATA": _mmem_data,
+        "MMEM:DATA?": _mmem_data_query, "MMEM:DEL": _mmem_del, "MMEM:COPY": _mmem_copy,
+        "MMEM:MOVE": _mmem_move, "MMEM:STOR:CST": _mmem_stor_cst, "MMEM:LOAD:CST": _mmem_load_cst,
+    }
+
+    #Settings inside the :TRAC/:STAB subtrees that are plain stored values on the simulator
+    _STORED_SETTINGS = ("TRAC:SEL", "TRAC:MMOD", "TRAC:ADV", "TRAC:COUN", "TRAC:MARK", "TRAC:IMP:",
+                        "STAB:SEQ:", "STAB:DYN", "STAB:SCEN:")
+
+
+class AWG_simulated_resource:
+    """
+    In-process resource backed by an AWG_simulated_instrument (pyvisa-sim style).
+
+    Implements the pyvisa message-based resource API used by the package, so it can
+    replace a VISA resource without any network I/O: AWG_Controller(..., transport="sim").
+    """
+
+    def __init__(self, instrument: AWG_simulated_instrument, resource_name: str = "SIM::INSTR"):
+        self.instrument = instrument
+        self.resource_name = resource_name
+        self.write_termination = '\n'
+        self.read_termination = '\n'
+        self.timeout = 5000
+        self._output = bytearray()
+
+    def write(self, message: str):
+        self._output += self.instrument.handle(message.encode())
+        return len(message) + len(self.write_termination)
+
+    def write_raw(self, message: bytes):
+        self._output += self.instrument.handle(message)
+        return len(message)
+
+    def read_raw(self, size: int = None) -> bytes:
+        if not self._output:
+            raise TimeoutError("Query UNTERMINATED: no response available")
+        data = bytes(self._output)
+        self._output.clear()
+        return data
+
+    def read(self) -> str:
+        return self.read_raw().decode().rstrip(self.read_termination)
+
+    def query(self, message: str) -> str:
+        self.write(message)
+        return self.read()
+
+    def clear(self):
+        self._output.clear()
+
+    def close(self):
+        self._output.clear()
+
+
+class AWG_simulator_server:
+    """
+    Serves an AWG_simulated_instrument over a raw SCPI TCP socket (like port 5025 on the AWG).
+
+    Usage:
+        with AWG_simulator_server(port=0) as server:
+            awg = AWG_Controller(server.host, transport="socket", port=server.port)
+    """
+
+    def __init__(self, instrument: AWG_simulated_instrument = None, host: str = "127.0.0.1",
+                 port: int = SCPI_SOCKET_PORT):
+        self.instrument = instrument if instrument is not None else AWG_simulated_instrument()
+        self.host = host
+        self.port = port
+        self._socket = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Start listening in a background thread; port 0 picks a free port."""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._socket.listen()
+        self.port = self._socket.getsockname()[1]
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, name=f"awg-sim-{self.port}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve_client, args=(client,), daemon=True).start()
+
+    def _serve_client(self, client: socket.socket):
+        buffer = bytearray()
+        with client:
+            while self._running:
+                end = _message_end(buffer)
+                if end < 0:
+                    try:
+                        chunk = client.recv(4 * 1024 * 1024)
+                    except OSError:
+                        return
+                    if not chunk:
+                        return
+                    buffer += chunk
+                    continue
+                message = bytes(buffer[:end])
+                del buffer[:end + 1]
+                response = self.instrument.handle(message)
+                if response:
+                    client.sendall(response)
+
+
+def _message_end(buffer: bytearray, start: int = 0) -> int:
+    """Index of the newline that ends the first program message, skipping blocks and strings; -1 if incomplete."""
+    pos = start
+    end = len(buffer)
+    while pos < end:
+        newline = buffer.find(b"\n", pos)
+        block = buffer.find(b"#", pos, newline if newline >= 0 else end)
+        quote = buffer.find(b'"', pos, newline if newline >= 0 else end)
+        if quote >= 0 and (block < 0 or quote < block):
+            close = buffer.find(b'"', quote + 1)
+            if close < 0:
+                return -1
+            pos = close + 1
+            continue
+        if block >= 0:
+            if block + 2 > end:
+                return -1
+            num_digits = int(buffer[block + 1:block + 2])
+            if block + 2 + num_digits > end:
+                return -1
+            length = int(buffer[block + 2:block + 2 + num_digits])
+            pos = block + 2 + num_digits + length
+            if pos > end:
+                return -1
+            continue
+        return newline
+    return -1
+
+
+#Simulated instruments by address, so state survives reconnects within a process
+simulated_instruments = {}
+
+
+def get_simulated_instrument(address: str, **options) -> AWG_simulated_instrument:
+    """Return the simulated instrument for an address, creating it on first use."""
+    if address not in simulated_instruments:
+        simulated_instruments[address] = AWG_simulated_instrument(**options)
+    return simulated_instruments[address]
@@ -1,20 +1,30 @@
 #import awg modules
-from AWGConnection import AWG_connection
-from logger import awg_logger
+from AWGSession import AWG_session
+from IEEEBlock import ieee_block_message, parse_ieee_block
+from AWGSequenceTable import SEQUENCE_MERGE_GAP
+from AWGBatch import AWG_batch, MAX_ERROR_DRAIN
+import numpy as np
 
 #import other modules
 import time
 
+#32-bit words per sequence table entry
+SEQUENCE_ENTRY_WORDS = 6
+
+#Entries per :STAB:DATA:BLOC transfer (1.5 MB blocks)
+SEQUENCE_BLOCK_ENTRIES = 65536
+
 class AWG_stable_system:
-    def __init__(self, ip_address):
+    def __init__(self, ip_address, session: AWG_session = None):
         self.ip_address = ip_address
 
-        #create insatces for connection and logger classes
-        self.connection = AWG_connection(ip_address)
-        self.log = awg_logger()
+        #share one session (connection, resource manager and logger) per instrument
+        self.session = session if session is not None else AWG_session(ip_address)
+        self.connection = self.session.connection
+        self.log = self.session.log
 
-        #select the recourse from connection class
-        self.resource = self.connection.get_resource()
+        #the session resolves the live resource lazily on every call
+        self.resource = self.session
 
     def reset_sequence_table(self):
         """
@@ -46,7 +56,8 @@ class AWG_stable_system:
             data (list[int]): List of six 32-bit integers (one sequence entry).
 
         Returns:
-            dict: {"Status": ..., "Duration(ms)": ...} or {"Error": ...}
+            dict: {"Status": ..., "Duration(ms)": ...} or {"Error": ...}; "Errors" lists the
+                queued errors drained by the shadow sync, if any (see _confirm_shadow)
         """
         if self.resource:
             try:
@@ -57,9 +68,14 @@ class AWG_stable_system:
                 command = f":STAB:DATA {sequence_id},{data_str}"
                 start_time = time.time()
                 self.resource.write(command)
+                self.session.sequence_shadow.stage(sequence_id, data, self.connection.get_resource())
+                errors = self._confirm_shadow()
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response="OK")
-                return {"Status": f"Entry written to index {sequence_id}", "Duration(ms)": duration}
+                self.log._log_command(command, duration_ms=duration, response="; ".join(errors) or "OK")
+                result = {"Status": f"Entry written to index {sequence_id}", "Duration(ms)": duration}
+                if errors:
+                    result["Errors"] = errors  # the write or an earlier command was rejected
+                return result
             except Exception as e:
                 self.log._log_command(command, duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -99,19 +115,208 @@ class AWG_stable_system:
 
         Args:
             sequence_id (int): Starting index of the sequence table.
-            length (int): Number of entries to read.
+            length (int): Number of 32-bit values to read (6 per entry).
 
         Returns:
-            bytes: Binary block data returned by the instrument.
+            bytes: Binary block payload returned by the instrument (32-bit words in the
+                session byte order), or {"Error": ...}
         """
-        start_t = time.time()
-        command = f":STAB:DATA:BLOC? {sequence_id}, {length}"
-        stop_t = time.time()
-        duration = (stop_t - start_t) * 1000
-        self.log._log_command(command= ":STAB:DATA:BLOC? {sequence_id}, {length}", duration_ms= duration, response= "Done!")
-        response = self.interface.query_binary(command)
-        return response
-    
+        if self.resource:
+            command = f":STAB:DATA:BLOC? {sequence_id},{length}"
+            try:
+                start_time = time.time()
+                self.resource.write(command)
+                raw = self.resource.read_raw()
+                duration = (time.time() - start_time) * 1000
+                payload = parse_ieee_block(raw)
+                self.log._log_command(command, duration_ms=duration, response=f"<<{len(payload)} bytes>>")
+                return bytes(payload)
+            except Exception as e:
+                self.log._log_command(command, duration_ms=0, response=str(e))
+                return {"Error": str(e)}
+        return {"Error": "Device not connected"}
+
+    def _confirm_shadow(self) -> list:
+        """
+        Record the staged sequence shadow entries once the instrument has accepted them.
+
+        Nothing is sent while the shadow has no staged entries (it is only kept after
+        commit_sequence_table), and inside a batch the batch's closing sync does this.
+        Otherwise one *OPC?;:SYST:ERR? round trip checks the writes. Queued errors may
+        predate the writes, so they are not reported as a failure: the staged entries
+        become unknown (and are resent by the next commit) and the drained errors are
+        returned for the caller.
+        """
+        shadow = self.session.sequence_shadow
+        if self.session._batch is not None or not shadow.pending:
+            return []
+        try:
+            error = self.resource.query("*OPC?;:SYST:ERR?").strip().split(";", 1)[-1]
+            errors = []
+            for _ in range(MAX_ERROR_DRAIN):
+                if AWG_batch._error_code(error) == 0:
+                    break
+                errors.append(error)
+                error = self.resource.query(":SYST:ERR?").strip()
+        except Exception:
+            shadow.discard()
+            raise
+        if errors:
+            shadow.discard()
+        else:
+            shadow.confirm()
+        return errors
+
+    def _word_dtype(self) -> str:
+        # 32-bit words in the byte order set through AWG_format (NORMal = big endian)
+        return '>u4' if self.session.byte_order == "NORMal" else '<u4'
+
+    def _entry_words(self, entries):
+        # (N, 6) uint32-range entry words in the session byte order, or an error message
+        words = np.asarray(entries)
+        if words.ndim != 2 or words.shape[1] != SEQUENCE_ENTRY_WORDS:
+            return f"entries must be an (N, {SEQUENCE_ENTRY_WORDS}) array"
+        if words.dtype.kind not in "ui":
+            return "entries must be an integer array"
+        if words.dtype != np.uint32 and len(words) and (words.min() < 0 or words.max() > 0xFFFFFFFF):
+            return "entry words must fit in 32 bits"
+        return words.astype(self._word_dtype(), copy=False)
+
+    def _send_sequence_blocks(self, sequence_id: int, words, block_entries: int) -> int:
+        # One terminated :STAB:DATA:BLOC message per block; entries are staged in the shadow
+        blocks = 0
+        for start in range(0, len(words), block_entries):
+            payload = np.ascontiguousarray(words[start:start + block_entries])
+            command = f":STAB:DATA:BLOC {sequence_id + start},"
+            self.resource.write_raw(ieee_block_message(command, payload, self.resource.write_termination))
+            self.session.sequence_shadow.stage(sequence_id + start, payload, self.connection.get_resource())
+            blocks += 1
+        return blocks
+
+    def write_sequence_table_block(self, sequence_id: int, entries, block_entries: int = SEQUENCE_BLOCK_ENTRIES):
+        """
+        Write many sequence table entries with binary :STAB:DATA:BLOC transfers.
+
+        Args:
+            sequence_id (int): Sequence table index of the first entry.
+            entries (np.ndarray | AWG_sequence_table): (N, 6) array of 32-bit entry words (any integer
+                dtype in uint32 range), or an AWG_sequence_table.
+            block_entries (int): Entries per block transfer.
+
+        Returns:
+            dict: {"Status": ..., "Entries": ..., "Blocks": ..., "Duration(ms)": ...} or {"Error": ...};
+                "Errors" lists the queued errors drained by the shadow sync, if any
+        """
+        if self.resource:
+            command = f":STAB:DATA:BLOC {sequence_id},<block>"
+            try:
+                words = self._entry_words(entries)
+                if isinstance(words, str):
+                    return {"Error": words}
+                if block_entries <= 0:
+                    return {"Error": "block_entries must be positive"}
+
+                start_time = time.time()
+                blocks = self._send_sequence_blocks(sequence_id, words, block_entries)
+                errors = self._confirm_shadow()
+                duration = (time.time() - start_time) * 1000
+                self.log._log_command(command, duration_ms=duration, response=f"{len(words)} entries in {blocks} blocks")
+                result = {
+                    "Status": f"{len(words)} entries written from index {sequence_id}",
+                    "Entries": len(words),
+                    "Blocks": blocks,
+                    "Duration(ms)": duration
+                }
+                if errors:
+                    result["Errors"] = errors  # the write or an earlier command was rejected
+                return result
+            except Exception as e:
+                self.log._log_command(command, duration_ms=0, response=str(e))
+                return {"Error": str(e)}
+        return {"Error": "Device not connected"}
+
+    def commit_sequence_table(self, table, sequence_id: int = 0, merge_gap: int = SEQUENCE_MERGE_GAP):
+        """
+        Upload only the entries of a table that differ from what the instrument holds.
+
+        The first commit starts a shadow copy, kept by the session, of every entry written
+        through this subsystem. The new table is compared with it, and only the changed
+        entries are sent, as one :STAB:DATA:BLOC block write per contiguous dirty range
+        (ranges closer than `merge_gap` entries are merged), followed by a single sync.
+        Entries the shadow does not know yet (first upload, after :STAB:RES, *RST or a
+        reconnect) are always sent. Errors found by the sync are returned under "Errors"
+        and leave the sent entries unknown, so the next commit resends them.
+
+        Args:
+            table (AWG_sequence_table | np.ndarray): New table content, (N, 6) entry words
+            sequence_id (int): Sequence table index of the first entry
+            merge_gap (int): Largest run of unchanged entries sent to join two dirty ranges
+
+        Returns:
+            dict: {"Status": ..., "Ranges": [(start, stop), ...], "Entries": ..., "Duration(ms)": ...} or {"Error": ...}
+        """
+        if self.resource:
+            command = f":STAB:DATA:BLOC {sequence_id},<diff>"
+            try:
+                words = self._entry_words(table)
+                if isinstance(words, str):
+                    return {"Error": words}
+
+                start_time = time.time()
+                shadow = self.session.sequence_shadow
+                shadow.activate(self.connection.get_resource())
+                ranges = shadow.diff(sequence_id, words, merge_gap)
+                uploaded = 0
+                for start, stop in ranges:
+                    self._send_sequence_blocks(sequence_id + start, words[start:stop], SEQUENCE_BLOCK_ENTRIES)
+                    uploaded += stop - start
+                errors = self._confirm_shadow()
+                duration = (time.time() - start_time) * 1000
+                self.log._log_command(command, duration_ms=duration,
+                                      response=f"{uploaded} of {len(words)} entries in {len(ranges)} ranges")
+                result = {
+                    "Status": f"{uploaded} of {len(words)} entries uploaded",
+                    "Ranges": ranges,
+                    "Entries": uploaded,
+                    "Duration(ms)": duration
+                }
+                if errors:
+                    result["Errors"] = errors  # the upload or an earlier command was rejected
+                return result
+            except Exception as e:
+                self.log._log_command(command, duration_ms=0, response=str(e))
+                return {"Error": str(e)}
+        return {"Error": "Device not connected"}
+
+    def read_sequence_table_block(self, sequence_id: int, count: int, block_entries: int = SEQUENCE_BLOCK_ENTRIES):
+        """
+        Read many sequence table entries with binary block queries.
+
+        Args:
+            sequence_id (int): Sequence table index of the first entry.
+            count (int): Number of entries to read.
+            block_entries (int): Entries per block query.
+
+        Returns:
+            dict: {"Entries": np.ndarray of shape (count, 6), dtype uint32, "Duration(ms)": ...} or {"Error": ...}
+        """
+        if self.resource:
+            if block_entries <= 0:
+                return {"Error": "block_entries must be positive"}
+            start_time = time.time()
+            entries = np.empty((count, SEQUENCE_ENTRY_WORDS), dtype=np.uint32)
+            for start in range(0, count, block_entries):
+                length = min(block_entries, count - start)
+                payload = self.read_sequence_entry_block(sequence_id + start, length * SEQUENCE_ENTRY_WORDS)
+                if isinstance(payload, dict):
+                    return payload
+                if len(payload) != length * SEQUENCE_ENTRY_WORDS * 4:
+                    return {"Error": f"Expected {length * SEQUENCE_ENTRY_WORDS * 4} bytes, received {len(payload)}"}
+                entries[start:start + length] = np.frombuffer(payload, dtype=self._word_dtype()).reshape(length, -1)
+            duration = (time.time() - start_time) * 1000
+            return {"Entries": entries, "Duration(ms)": duration}
+        return {"Error": "Device not connected"}
+
     def set_sequence_start_index(self, index: int) -> int:
         """
         Set the sequence start index in STSequence mode.
@@ -120,7 +325,7 @@ class AWG_stable_system:
             index (int): Index in the sequence table to start from.
 
         Returns:
-            int: Actual index set, verified by query.
+            int: Actual index set, verified by query (the requested index if verification is skipped or deferred).
         """
         start_t = time.time()
         self.resource.write(f":STAB:SEQ:SEL {index}")
@@ -128,7 +333,8 @@ class AWG_stable_system:
         duration = (stop_t - start_t) * 1000
         self.log._log_command(command= "STAB:SEQ:SEL {index}", duration_ms= duration, response= "Done!")
 
-        return int(self.resource.query(":STAB:SEQ:SEL?"))
+        confirmed = self.session.verify(":STAB:SEQ:SEL")
+        return int(confirmed) if confirmed is not None else index
     
     def set_sequence_start_limit(self, limit: str) -> int:
         """
@@ -138,7 +344,7 @@ class AWG_stable_system:
             limit (str): Either 'MIN' or 'MAX'.
 
         Returns:
-            int: Actual index set, verified by query.
+            int: Actual index set, verified by query (None if verification is skipped or deferred).
         """
         limit = limit.upper()
         if limit not in ["MIN", "MAX"]:
@@ -150,7 +356,8 @@ class AWG_stable_system:
         duration = (stop_t - start_t) * 1000
         self.log._log_command(command= ":STAB:SEQ:SEL {limit}", duration_ms= duration, response= "Done!")
 
-        return int(self.interface.query(":STAB:SEQ:SEL?"))
+        confirmed = self.session.verify(":STAB:SEQ:SEL")
+        return int(confirmed) if confirmed is not None else None
     
     def get_sequence_start_index(self) -> int:
         """
@@ -179,7 +386,7 @@ class AWG_stable_system:
             state (bool): True to enable, False to disable.
 
         Returns:
-            str: Confirmed mode state as returned by the query after setting.
+            str: Confirmed mode state as returned by the query after setting (None if verification is skipped or deferred).
         """
         value = "ON" if state else "OFF"
         start_t = time.time()
@@ -188,7 +395,7 @@ class AWG_stable_system:
         duration = (stop_t - start_t) * 1000
         self.log._log_command(command= ":STAB:DYN {value}", duration_ms= duration, response= "Done!")
 
-        return self.resource.query(":STAB:DYN?")
+        return self.session.verify(f":STAB:DYN {value}")
     
     def get_dynamic_mode(self) -> str:
         """
@@ -354,7 +561,7 @@ class AWG_stable_system:
             try:
                 start_time = time.time()
                 self.resource.write(command)
-                response = self.resource.query(":STAB:SCEN:COUN?").strip()
+                response = self.session.verify(command)
                 duration = (time.time() - start_time) * 1000
                 self.log._log_command(command, duration_ms=duration, response=response)
                 return {
@@ -386,7 +593,7 @@ class AWG_stable_system:
             try:
                 start_time = time.time()
                 self.resource.write(command)
-                response = self.resource.query(":STAB:SCEN:COUN?").strip()
+                response = self.session.verify(command)
                 duration = (time.time() - start_time) * 1000
                 self.log._log_command(command, duration_ms=duration, response=response)
                 return {
@@ -0,0 +1,171 @@
+#import other modules
+import re
+
+#Setting headers (channel/range suffixes removed) whose value the cache may hold.
+#Actions, data transfers, catalogs and status registers are never cached.
+CACHEABLE_HEADERS = re.compile(
+    r"^:(VOLT|OUTP|CARR|ROSC|ARM:(MDEL|SDEL|TRIG|EVEN)|FREQ:RAST|FUNC:MODE|INST:DACM|INST:MEM:EXT:RDIV|FORM:BORD"
+    r"|INIT:(CONT|GATE)|TRIG:(SOUR|ENAB:HWD|BEG:HWD|ADV:HWD|BEG:GATE)"
+    r"|TRAC:(MMOD|SEL|ADV|COUN|MARK|IMP:RES|IMP:SCAL)|STAB:(DYN|SEQ:SEL|SCEN))(:|$)"
+)
+
+#Commands after which nothing cached can be trusted any more
+INVALIDATING_COMMANDS = ("*RST", "*RCL", ":MMEM:LOAD:CST", ":SYST:SET", ":SYST:PRES")
+
+#Argument keywords the instrument resolves itself; the resulting value is unknown until queried
+UNRESOLVED_VALUES = ("MIN", "MINIMUM", "MAX", "MAXIMUM", "DEF", "DEFAULT", "UP", "DOWN")
+
+
+class AWG_state_cache:
+    """
+    Client-side write-through cache of instrument settings.
+
+    Entries are keyed by SCPI header including the channel suffix (e.g. ':VOLT1:OFFS').
+    A written value is dirty (pending) until the instrument confirms it, either by a
+    read-back query or by a clean :SYST:ERR? after the write (see confirm()). Only
+    confirmed values are used to skip unchanged writes; a write the instrument may have
+    rejected never hides the real state. Argument-less queries are served the last
+    response the instrument itself gave for the header, so a getter returns the same
+    text (e.g. '6.4E10', 'ARB') whether it hits the cache or not; a value that was only
+    written, never queried, is compared in normalized form but not served.
+    Instrument-wide state changes (*RST, :MMEM:LOAD:CST, ...) clear the cache.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._values = {}       # header -> confirmed value, normalized for comparison
+        self._responses = {}    # header -> last instrument response, served to queries
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.skipped_writes = 0
+
+    # --------------------- KEY HANDLING ---------------------
+
+    @staticmethod
+    def _split(command: str):
+        """Return (header, argument) of a command, header upper-cased with a leading ':'."""
+        parts = command.strip().split(None, 1)
+        header = parts[0].upper()
+        if not header.startswith((":", "*")):
+            header = ":" + header
+        argument = parts[1].strip() if len(parts) > 1 else ""
+        return header, argument
+
+    @staticmethod
+    def _is_cacheable(header: str) -> bool:
+        return bool(CACHEABLE_HEADERS.match(re.sub(r"(?<=[A-Z])\d+", "", header)))
+
+    @staticmethod
+    def _normalize(value: str) -> str:
+        """Canonical form for comparing written and queried values."""
+        value = value.strip().strip('"').upper()
+        if value in ("ON", "1"):
+            return "1"
+        if value in ("OFF", "0"):
+            return "0"
+        try:
+            return repr(float(value))
+        except ValueError:
+            return value
+
+    # --------------------- CACHE OPERATIONS ---------------------
+
+    def record_write(self, command: str) -> bool:
+        """
+        Update the cache for a command about to be written.
+
+        The value is kept as pending until confirm() or a read-back confirms it.
+
+        Returns:
+            bool: False if the write can be skipped because the confirmed value is unchanged
+        """
+        if not self.enabled:
+            return True
+
+        header, argument = self._split(command)
+        if header.startswith(INVALIDATING_COMMANDS):
+            self.invalidate()
+            return True
+        if header.endswith("?") or not self._is_cacheable(header):
+            return True
+
+        if not argument or "," in argument or argument.upper() in UNRESOLVED_VALUES:
+            self.invalidate(header)
+            return True
+
+        value = self._normalize(argument)
+        if header not in self._pending and self._values.get(header) == value:
+            self.skipped_writes += 1
+            return False
+        # Until the instrument accepts the write, its value is unknown
+        self._values.pop(header, None)
+        self._responses.pop(header, None)
+        self._pending[header] = value
+        return True
+
+    def lookup(self, query: str):
+        """Return the instrument's last response to an argument-less query, or None."""
+        if not self.enabled:
+            return None
+        header, argument = self._split(query)
+        if argument or not header.endswith("?"):
+            return None
+        value = self._responses.get(header[:-1])
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def record_query(self, query: str, response: str):
+        """Store an instrument response; it replaces any pending value for the header."""
+        if not self.enabled:
+            return
+        header, argument = self._split(query)
+        if argument or not header.endswith("?") or ";" in header:
+            return
+        header = header[:-1]
+        if self._is_cacheable(header):
+            self._values[header] = self._normalize(response)
+            self._responses[header] = response
+            self._pending.pop(header, None)
+
+    def confirm(self):
+        """Accept all pending values; call after :SYST:ERR? reported no error for the writes."""
+        self._values.update(self._pending)
+        self._pending.clear()
+
+    def discard(self, command: str):
+        """Drop the pending value of a command that was not sent (write failed)."""
+        if not self.enabled:
+            return
+        header, _ = self._split(command)
+        if self._pending.pop(header, None) is not None:
+            self._values.pop(header, None)
+            self._responses.pop(header, None)
+
+    def invalidate(self, header: str = None):
+        """Drop one header (e.g. ':VOLT1'), or everything when no header is given."""
+        if header is None:
+            self._values.clear()
+            self._responses.clear()
+            self._pending.clear()
+        else:
+            header = header.upper()
+            self._values.pop(header, None)
+            self._responses.pop(header, None)
+            self._pending.pop(header, None)
+
+    def dirty_headers(self) -> list:
+        """Headers written by the client and not yet confirmed by the instrument."""
+        return sorted(self._pending)
+
+    def stats(self) -> dict:
+        return {
+            "Entries": len(self._values),
+            "Dirty": len(self._pending),
+            "Hits": self.hits,
+            "Misses": self.misses,
+            "SkippedWrites": self.skipped_writes
+        }
@@ -0,0 +1,435 @@
+#import awg modules
+from AWGStaus import AWG_system_status, STATUS_GROUPS, STB_ERROR_QUEUE, STB_RQS
+from AWGCommonCommands import AWG_common_commands
+from AWGSimulator import AWG_simulated_resource
+from AWGStatusRegisters import StatusByte, STATUS_REGISTERS, BIT_NAMES
+
+#import other modules
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from pyvisa import constants, errors
+
+#Bits used in the 16-bit SCPI status registers (bit 15 is always 0)
+STATUS_REGISTER_MASK = 0x7FFF
+
+#AWG_system_status setters per group: (enable, positive transition, negative transition)
+STATUS_SETTERS = {
+    "QUES": ("set_questionable_enable", "questionable_positive_transition", "set_questionable_ntransition"),
+    "OPER": ("set_operation_enable", "set_operation_positive_transition", "set_operation_negative_transition"),
+    "QUES:VOLT": ("set_voltage_enable", "set_voltage_ptransition", "set_voltage_ntransition"),
+    "QUES:FREQ": ("set_frequency_enable", "set_frequency_ptransition", "set_frequency_ntransition"),
+    "QUES:SEQ": ("set_sequence_enable", "set_sequence_ptransition", "set_sequence_ntransition"),
+    "QUES:DUC": ("set_duc_enable", "set_duc_ptransition", "set_duc_ntransition"),
+    "QUES:CONN": ("set_connection_enable", "set_connection_ptransition", "set_connection_ntransition"),
+    "OPER:RUN": ("set_run_enable", "set_run_ptransition", "set_run_ntransition"),
+}
+
+#Largest number of :SYST:ERR? reads per service request
+MAX_ERROR_DRAIN = 32
+
+
+def _failed(response) -> bool:
+    """True for an error result of an AWG_system_status method (dict or "Error: ..." string)."""
+    if isinstance(response, dict):
+        return "Error" in response
+    return isinstance(response, str) and response.startswith("Error")
+
+
+def _children(group: str) -> list:
+    return [child for child, (parent, _) in STATUS_GROUPS.items() if parent == group]
+
+
+class AWG_status_monitor:
+    """
+    Event-driven status monitoring through service requests instead of register polling.
+
+    configure() programs the enable and transition registers of the monitored groups and
+    *SRE once. After that the monitor waits for a service request and reads only the
+    groups whose summary bits fired: the status byte selects the top-level groups, their
+    event registers select the subgroups, and each level is read with one ';'-joined query.
+
+    How the SRQ is received depends on the resource:
+
+    - "visa": VISA service request events (enable_event/wait_on_event) and a serial poll
+    - "simulated": the local simulator's srq_listeners
+    - "poll": *STB? at `poll_interval`, for transports without SRQ (raw socket). This is
+      still one short query instead of a read of every register.
+
+    wait() blocks the calling thread. start() runs the monitor on a background thread and
+    calls `callback(result)` for every service request. That thread reads the registers
+    on the shared session, so pass an executor that serializes the instrument's I/O (e.g.
+    AsyncAWG_Controller.io_executor) when other threads talk to the instrument at the same time.
+
+    Reading an event register clears it. Anything else that reads them while the monitor
+    runs (get_*_event_status(), or AWG_system_status.snapshot() with its default
+    events=True) consumes the events the monitor would have reported; poll with
+    snapshot(events=False) or AWG_status_transitions instead.
+    """
+
+    def __init__(self, status: AWG_system_status, poll_interval: float = 0.1):
+        self.status = status
+        self.session = status.session
+        self.connection = status.connection
+        self.log = status.log
+        self.resource = status.resource
+        self.common = AWG_common_commands(status.ip_address, session=status.session)
+        self.poll_interval = poll_interval
+
+        self.groups = ()
+        self.mechanism = None
+        self._listening = None  # resource the SRQ mechanism was set up for
+        self._srq = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --------------------- CONFIGURATION ---------------------
+
+    def configure(self, groups=None, rising: bool = True, falling: bool = True, error_queue: bool = True):
+        """
+        Program the status registers and *SRE so the monitored groups raise a service request.
+
+        Args:
+            groups (list, optional): Groups to monitor, e.g. ["QUES:VOLT", "OPER:RUN"]; all subgroups by default
+            rising (bool): Report conditions that become true
+            falling (bool): Report conditions that become false
+            error_queue (bool): Also request service when the error queue is not empty
+
+        Returns:
+            dict: {"Groups": [...], "SRE": ..., "Mechanism": ..., "Duration(ms)": ...} or {"Error": ...}
+        """
+        groups = list(groups) if groups is not None else [g for g, (p, _) in STATUS_GROUPS.items() if p != "STB"]
+        unknown = [group for group in groups if group not in STATUS_GROUPS]
+        if unknown:
+            return {"Error": f"Unknown status group(s) {unknown}. Must be among {list(STATUS_GROUPS)}"}
+        if not self.resource:
+            return {"Error": "Device not connected"}
+
+        # Monitored groups report their own bits; their ancestors only pass the summary bits on
+        registers = {}
+        edges = (STATUS_REGISTER_MASK if rising else 0, STATUS_REGISTER_MASK if falling else 0)
+        for group in groups:
+            registers[group] = [STATUS_REGISTER_MASK, *edges]
+        sre = 1 << STB_ERROR_QUEUE if error_queue else 0
+        for group in groups:
+            child = group
+            while STATUS_GROUPS[child][0] != "STB":
+                parent, bit = STATUS_GROUPS[child]
+                # Parents latch only rising summary bits, so reading a subgroup does not re-raise them
+                enable, positive, negative = registers.setdefault(parent, [0, 0, 0])
+                registers[parent] = [enable | 1 << bit, positive | 1 << bit, negative]
+                child = parent
+            sre |= 1 << STATUS_GROUPS[child][1]
+
+        start_time = time.time()
+        try:
+            with self.session.batch() as batch:
+                self.common.clear_status()
+                for group, values in registers.items():
+                    for setter, value in zip(STATUS_SETTERS[group], values):
+                        response = getattr(self.status, setter)(value)
+                        if _failed(response):
+                            raise RuntimeError(f"{setter}({value}): {response}")
+            if batch.result["Errors"]:
+                return {"Error": f"Status configuration failed: {batch.result['Errors']}"}
+            response = self.common.set_service_request_enable_register(sre)
+            if _failed(response):
+                return response
+            self._setup_srq()
+        except Exception as e:
+            self.log._log_command("*SRE <status monitor>", duration_ms=0, response=str(e))
+            return {"Error": str(e)}
+
+        self.groups = tuple(groups)
+        duration = (time.time() - start_time) * 1000
+        self.log._log_command(f"*SRE {sre}", duration_ms=duration,
+                              response=f"monitoring {', '.join(groups)} via {self.mechanism}")
+        return {"Groups": list(groups), "SRE": sre, "Mechanism": self.mechanism, "Duration(ms)": duration}
+
+    def _setup_srq(self):
+        resource = self.connection.get_resource()
+        self.mechanism = "poll"
+        if isinstance(resource, AWG_simulated_resource):
+            if self._on_simulated_srq not in resource.instrument.srq_listeners:
+                resource.instrument.srq_listeners.append(self._on_simulated_srq)
+            self.mechanism = "simulated"
+        elif hasattr(resource, "enable_event"):
+            try:
+                resource.enable_event(constants.EventType.service_request, constants.EventMechanism.queue)
+                self.mechanism = "visa"
+            except (errors.Error, NotImplementedError):
+                pass  # e.g. a backend without SRQ support; fall back to *STB? polling
+        self._listening = resource
+
+    def _on_simulated_srq(self, status_byte: int):
+        self._srq.set()
+
+    # --------------------- WAITING ---------------------
+
+    def _wait_for_srq(self, timeout: float, io):
+        """Block until a service request; returns the status byte, or None on timeout."""
+        resource = self.connection.get_resource()
+        if resource is not self._listening:
+            self._setup_srq()  # reconnected since configure()
+
+        if self.mechanism == "simulated":
+            if not resource.instrument.service_request and not self._srq.wait(timeout):
+                return None
+            self._srq.clear()
+            return io(lambda: int(self.session.query("*STB?")))
+
+        if self.mechanism == "visa":
+            wait_ms = constants.VI_TMO_INFINITE if timeout is None else int(timeout * 1000)
+            try:
+                resource.wait_on_event(constants.EventType.service_request, wait_ms)
+            except errors.VisaIOError as e:
+                if e.error_code == constants.StatusCode.error_timeout:
+                    return None
+                raise
+            # The serial poll clears RQS
+            return io(resource.read_stb)
+
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._stop.is_set():
+            status_byte = io(lambda: int(self.session.query("*STB?")))
+            if status_byte & (1 << STB_RQS):
+                return status_byte
+            if deadline is not None and time.time() >= deadline:
+                return None
+            time.sleep(self.poll_interval if deadline is None else min(self.poll_interval, max(deadline - time.time(), 0)))
+        return None
+
+    def read_fired(self, status_byte: int) -> dict:
+        """
+        Read the event (and condition) registers of the groups whose summary bits are set in `status_byte`.
+
+        Returns:
+            dict: {"StatusByte": ..., "Groups": {group: {"Event": ..., "Condition": ...}}, "Errors": [...],
+                   "Duration(ms)": ...}
+        """
+        start_time = time.time()
+        groups = {}
+        fired = [group for group in _children("STB") if status_byte & (1 << STATUS_GROUPS[group][1])]
+        while fired:
+            queries = []
+            for group in fired:
+                queries += [f":STAT:{group}:EVEN?", f":STAT:{group}:COND?"]
+            values = [int(value) for value in self.session.query(";".join(queries)).strip().split(";")]
+            next_level = []
+            for index, group in enumerate(fired):
+                event, condition = values[2 * index], values[2 * index + 1]
+                register = STATUS_REGISTERS[group]
+                groups[group] = {"Event": register(event), "Condition": register(condition)}
+                next_level += [child for child in _children(group) if event & (1 << STATUS_GROUPS[child][1])]
+            fired = next_level
+
+        drained = []
+        if status_byte & (1 << STB_ERROR_QUEUE):
+            for _ in range(MAX_ERROR_DRAIN):
+                error = self.session.query(":SYST:ERR?").strip()
+                if error.startswith(("0,", "+0,")):
+                    break
+                drained.append(error)
+
+        duration = (time.time() - start_time) * 1000
+        self.log._log_command(f"*STB {status_byte}", duration_ms=duration,
+                              response=f"fired: {', '.join(groups) or 'none'}; {len(drained)} errors")
+        return {"StatusByte": StatusByte(status_byte), "Groups": groups, "Errors": drained, "Duration(ms)": duration}
+
+    def wait(self, timeout: float = None):
+        """
+        Wait for the next service request and read the groups that raised it.
+
+        Returns:
+            dict: read_fired() result, None on timeout, or {"Error": ...}
+        """
+        if self.mechanism is None:
+            return {"Error": "Monitor not configured; call configure() first"}
+        try:
+            status_byte = self._wait_for_srq(timeout, lambda function: function())
+            return None if status_byte is None else self.read_fired(status_byte)
+        except Exception as e:
+            self.log._log_command("<status monitor>", duration_ms=0, response=str(e))
+            return {"Error": str(e)}
+
+    # --------------------- BACKGROUND MONITOR ---------------------
+
+    def start(self, callback, executor=None):
+        """
+        Run the monitor on a background thread, calling callback(result) for every service request.
+
+        Args:
+            callback (callable): Receives each read_fired() result (or {"Error": ...})
+            executor (Executor, optional): Runs the monitor's instrument I/O, e.g. the io_executor
+                of an AsyncAWG_Controller, so it is serialized with the other users of the session
+        """
+        if self.mechanism is None:
+            return {"Error": "Monitor not configured; call configure() first"}
+        if self._thread is not None and self._thread.is_alive():
+            return {"Error": "Monitor already running"}
+        io = (lambda function: executor.submit(function).result()) if executor is not None else (lambda function: function())
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    status_byte = self._wait_for_srq(0.5, io)
+                    if status_byte is not None and not self._stop.is_set():
+                        callback(io(lambda: self.read_fired(status_byte)))
+                except Exception as e:
+                    self.log._log_command("<status monitor>", duration_ms=0, response=str(e))
+                    callback({"Error": str(e)})
+                    self._stop.wait(self.poll_interval)
+
+        self._thread = threading.Thread(target=run, name=f"awg-status-{self.status.ip_address}", daemon=True)
+        self._thread.start()
+        return {"Status": f"Monitoring via {self.mechanism}"}
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the background monitor."""
+        self._stop.set()
+        self._srq.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        return {"Status": "Monitor stopped"}
+
+
+class AWG_status_transitions:
+    """
+    Bit-level change stream of the status registers: yields edges, not register values.
+
+    Every poll reads the status byte and all condition registers in one ';'-joined query
+    into a ring buffer of samples (one uint16 column per register). The new samples are
+    XOR-ed with their predecessors for all registers at once, and only the flipped bits
+    are decoded into edges with the register model names of AWGStatusRegisters.
+
+    Only condition registers are read, so polling never consumes the event registers an
+    AWG_status_monitor relies on. A condition that rises and falls between two polls is
+    not seen; use the monitor (event registers) for those.
+
+        for edge in awg.status_transitions.stream(interval=0.2):
+            print(edge["Group"], edge["Bit"], "rose" if edge["Rising"] else "fell")
+    """
+
+    def __init__(self, status: AWG_system_status, depth: int = 256):
+        self.status = status
+        self.session = status.session
+        self.log = status.log
+        self.resource = status.resource
+        self.groups = ("STB", *STATUS_GROUPS)
+        self.command = ";".join(["*STB?"] + [f":STAT:{group}:COND?" for group in STATUS_GROUPS])
+
+        self.depth = depth
+        self.samples = np.zeros((depth, len(self.groups)), dtype=np.uint16)
+        self.times = np.zeros(depth)
+        self.count = 0  # samples taken; sample n lives in row n % depth
+        self._bits = np.arange(16, dtype=np.uint16)
+
+    def sample(self) -> dict:
+        """
+        Read all condition registers once and append them to the ring buffer.
+
+        Returns:
+            dict: {"Sample": index, "Duration(ms)": ...} or {"Error": ...}
+        """
+        if not self.resource:
+            return {"Error": "Device not connected"}
+        try:
+            start_time = time.time()
+            response = self.resource.query(self.command)
+            duration = (time.time() - start_time) * 1000
+            values = [int(value) for value in response.strip().split(";")]
+            if len(values) != len(self.groups):
+                raise ValueError(f"expected {len(self.groups)} values, got {len(values)}: {response.strip()}")
+            self.log._log_command(self.command, duration_ms=duration, response=response.strip())
+        except Exception as e:
+            self.log._log_command(self.command, duration_ms=0, response=str(e))
+            return {"Error": str(e)}
+
+        row = self.count % self.depth
+        self.samples[row] = values
+        self.times[row] = start_time
+        self.count += 1
+        return {"Sample": self.count - 1, "Duration(ms)": duration}
+
+    def transitions(self, start: int, stop: int = None) -> list:
+        """
+        Bit transitions into samples start..stop-1 (sample indices), oldest first.
+
+        Samples already overwritten in the ring buffer are skipped; the first sample ever
+        taken is the baseline and has no transitions.
+
+        Returns:
+            list: [{"Time": ..., "Group": ..., "Bit": ..., "Rising": bool, "Register": ...}]
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        start = max(start, self.count - self.depth + 1, 1)
+        if start >= stop:
+            return []
+        index = np.arange(start, stop)
+        rows = index % self.depth
+        current = self.samples[rows]
+        flipped = current ^ self.samples[(index - 1) % self.depth]
+        if not flipped.any():
+            return []
+        sample, register, bit = np.nonzero(flipped[:, :, None] >> self._bits & 1)
+        rising = current[sample, register] >> bit.astype(np.uint16) & 1
+
+        edges = []
+        for k, r, b, up in zip(sample.tolist(), register.tolist(), bit.tolist(), rising.tolist()):
+            group = self.groups[r]
+            edges.append({
+                "Time": float(self.times[rows[k]]),
+                "Group": group,
+                "Bit": BIT_NAMES[group][b],
+                "Rising": bool(up),
+                "Register": STATUS_REGISTERS[group](int(current[k, r]))
+            })
+        return edges
+
+    def stream(self, interval: float = 0.1, batch: int = 1, polls: int = None):
+        """
+        Poll the registers and yield only the bit transitions.
+
+        Args:
+            interval (float): Seconds between polls
+            batch (int): Polls per XOR pass; larger batches decode more samples per pass
+            polls (int, optional): Stop after this many polls (endless by default)
+
+        Yields:
+            dict: One transition() edge per flipped bit, or {"Error": ...} for a failed poll
+        """
+        taken = 0
+        consumed = self.count
+        while polls is None or taken < polls:
+            for _ in range(batch if polls is None else min(batch, polls - taken)):
+                result = self.sample()
+                taken += 1
+                if "Error" in result:
+                    yield result
+                time.sleep(interval)
+            yield from self.transitions(consumed)
+            consumed = self.count
+
+    async def astream(self, interval: float = 0.1, batch: int = 1, polls: int = None, executor=None):
+        """
+        Async version of stream(); the polls run in `executor` (e.g. the io_executor of an
+        AsyncAWG_Controller) so the event loop is never blocked.
+        """
+        loop = asyncio.get_running_loop()
+        taken = 0
+        consumed = self.count
+        while polls is None or taken < polls:
+            for _ in range(batch if polls is None else min(batch, polls - taken)):
+                result = await loop.run_in_executor(executor, self.sample)
+                taken += 1
+                if "Error" in result:
+                    yield result
+                await asyncio.sleep(interval)
+            for edge in self.transitions(consumed):
+                yield edge
+            consumed = self.count
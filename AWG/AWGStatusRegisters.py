@@ -0,0 +1,95 @@
+#import other modules
+from enum import IntFlag
+
+
+#Register models of the M8195A status system (SCPI status model, see the user's guide chapter
+#"Status Model"). Bits the manual leaves unused have no member and decode as BIT<n>.
+
+class StatusByte(IntFlag):
+    """Status Byte (*STB?)."""
+    ERROR_QUEUE = 1 << 2        # error/event queue not empty
+    QUESTIONABLE = 1 << 3       # Questionable Status summary
+    MAV = 1 << 4                # message available
+    ESB = 1 << 5                # Standard Event Status summary
+    RQS = 1 << 6                # request service (MSS)
+    OPERATION = 1 << 7          # Operation Status summary
+
+
+class QuestionableStatus(IntFlag):
+    """Questionable Data/Signal Status register (:STAT:QUES)."""
+    VOLTAGE = 1 << 0
+    FREQUENCY = 1 << 5
+    SEQUENCE = 1 << 8
+    DUC = 1 << 9
+    CONNECTION = 1 << 10
+
+
+class OperationStatus(IntFlag):
+    """Operation Status register (:STAT:OPER)."""
+    RUN = 1 << 8
+
+
+class VoltageStatus(IntFlag):
+    """Voltage Status register (:STAT:QUES:VOLT): output protection tripped, per channel."""
+    CHANNEL1 = 1 << 0
+    CHANNEL2 = 1 << 1
+    CHANNEL3 = 1 << 2
+    CHANNEL4 = 1 << 3
+
+
+class FrequencyStatus(IntFlag):
+    """Frequency Status register (:STAT:QUES:FREQ)."""
+    PLL_UNLOCKED = 1 << 0       # sample clock PLL not locked
+
+
+class SequenceStatus(IntFlag):
+    """Sequence Status register (:STAT:QUES:SEQ): sequencer error, per channel."""
+    CHANNEL1 = 1 << 0
+    CHANNEL2 = 1 << 1
+    CHANNEL3 = 1 << 2
+    CHANNEL4 = 1 << 3
+
+
+class DUCStatus(IntFlag):
+    """DUC Status register (:STAT:QUES:DUC): digital up-conversion error, per channel."""
+    CHANNEL1 = 1 << 0
+    CHANNEL2 = 1 << 1
+    CHANNEL3 = 1 << 2
+    CHANNEL4 = 1 << 3
+
+
+class ConnectionStatus(IntFlag):
+    """Connection Status register (:STAT:QUES:CONN)."""
+    MODULE_LOST = 1 << 0        # connection to the module lost
+
+
+class RunStatus(IntFlag):
+    """Run Status register (:STAT:OPER:RUN)."""
+    RUNNING = 1 << 0
+
+
+#Register model per status group (keys as in AWGStaus.STATUS_GROUPS, plus "STB")
+STATUS_REGISTERS = {
+    "STB": StatusByte,
+    "QUES": QuestionableStatus,
+    "OPER": OperationStatus,
+    "QUES:VOLT": VoltageStatus,
+    "QUES:FREQ": FrequencyStatus,
+    "QUES:SEQ": SequenceStatus,
+    "QUES:DUC": DUCStatus,
+    "QUES:CONN": ConnectionStatus,
+    "OPER:RUN": RunStatus,
+}
+
+
+#Name of every bit position per group, for decoding without walking the enum
+BIT_NAMES = {
+    group: [next((m.name for m in register if m.value == 1 << bit), f"BIT{bit}") for bit in range(16)]
+    for group, register in STATUS_REGISTERS.items()
+}
+
+
+def decode_register(group: str, value: int) -> list:
+    """Names of the bits set in a register value, lowest bit first."""
+    names = BIT_NAMES[group]
+    return [names[bit] for bit in range(16) if value >> bit & 1]
@@ -1,29 +1,46 @@
 #import the required AWG modules
-from VISAInterface import pyvisa_interface
-from AWGConnection import AWG_connection
-from logger import awg_logger
+from AWGSession import AWG_session
+from AWGStatusRegisters import (STATUS_REGISTERS, StatusByte, QuestionableStatus, OperationStatus, VoltageStatus,
+                                FrequencyStatus, SequenceStatus, DUCStatus, ConnectionStatus, RunStatus,
+                                decode_register)
 
 import time
 
+#Status register groups: SCPI node -> (parent group, summary bit in the parent); "STB" is the status byte
+STATUS_GROUPS = {
+    "QUES": ("STB", 3), "OPER": ("STB", 7),
+    "QUES:VOLT": ("QUES", 0), "QUES:FREQ": ("QUES", 5), "QUES:SEQ": ("QUES", 8),
+    "QUES:DUC": ("QUES", 9), "QUES:CONN": ("QUES", 10), "OPER:RUN": ("OPER", 8),
+}
+
+#Status byte bits outside the register groups
+STB_ERROR_QUEUE = 2
+STB_MAV = 4
+STB_ESB = 5
+STB_RQS = 6
 
 
 class AWG_system_status:
-    def __init__(self, ip_address: str):
+    def __init__(self, ip_address: str, session: AWG_session = None):
         self.ip_address = ip_address
 
-        #create insatces for connection and logger classes
-        self.connection = AWG_connection(ip_address)
-        self.log = awg_logger()
+        #share one session (connection, resource manager and logger) per instrument
+        self.session = session if session is not None else AWG_session(ip_address)
+        self.connection = self.session.connection
+        self.log = self.session.log
+
+        #the session resolves the live resource lazily on every call
+        self.resource = self.session
 
-        #select the recourse from connection class
-        self.resource = self.connection.get_resource()
+        #registers of the previous snapshot(), for its diff
+        self._last_snapshot = None
 
     def preset_status_registers(self):
         """
         Clears all status group event registers and presets the PTR and NTR registers.
         Sets: ENABle = 0x0000, PTR = 0xffff, NTR = 0x0000
         """
-        if self.resource is not None:
+        if self.resource:
             try:
                 start_time = time.time()
                 self.resource.write(":STAT:PRESet")
@@ -42,13 +59,13 @@ class AWG_system_status:
         Query the Status Byte Register using *STB? and log the response.
         Returns a decimal integer representing the current status.
         """
-        if self.resource is not None:
+        if self.resource:
             try:
                 start_time = time.time()
                 status_value = self.resource.query("*STB?")
                 duration = (time.time() - start_time) * 1000
                 self.log._log_command("*STB?", duration_ms=duration, response=status_value.strip())
-                return {"StatusByte": int(status_value.strip()), "Duration(ms)": duration}
+                return {"StatusByte": StatusByte(int(status_value.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command("*STB?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -61,13 +78,13 @@ class AWG_system_status:
         Query the questionable status event register using :STAT:QUES:EVENt?
         Returns a dictionary with the status code and duration.
         """
-        if self.resource is not None:
+        if self.resource:
             try:
                 start_time = time.time()
                 response = self.resource.query(":STAT:QUES:EVENt?")
                 duration = (time.time() - start_time) * 1000
                 self.log._log_command(":STAT:QUES:EVENt?", duration_ms=duration, response=response.strip())
-                return {"QuestionableEventStatus": int(response.strip()), "Duration(ms)": duration}
+                return {"QuestionableEventStatus": QuestionableStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:EVENt?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -91,7 +108,7 @@ class AWG_system_status:
                     duration_ms=duration,
                     response=response.strip()
                 )
-                return int(response.strip())
+                return QuestionableStatus(int(response.strip()))
             except Exception as e:
                 self.log._log_command(
                     command=":STAT:QUES:COND?",
@@ -105,10 +122,10 @@ class AWG_system_status:
     def set_questionable_enable(self, value: int):
         """
         Set the enable register in the Questionable Status group.
-        Accepts a decimal value (0–255) representing which bits to enable.
+        Accepts a decimal value (0–65535) representing which bits to enable.
         """
-        if not (0 <= value <= 255):
-            return "Error: Value must be between 0 and 255."
+        if not (0 <= value <= 65535):
+            return "Error: Value must be between 0 and 65535."
 
         if self.resource:
             try:
@@ -225,10 +242,10 @@ class AWG_system_status:
         A positive transition filter allows events to be reported when a condition changes
         from False to True. Value should be in the range 0–65535.
         """
+        if not self.resource:
+            self.log._log_command(":STAT:QUES:PTR", duration_ms=0, response="Device not connected")
+            return {"Error": "Device not connected"}
         try:
-            if self.resource is None:
-                raise ConnectionError("Device not connected.")
-
             if value is not None:
                 if not (0 <= value <= 65535):
                     raise ValueError("Value must be between 0 and 65535.")
@@ -258,7 +275,7 @@ class AWG_system_status:
         The register is cleared after reading or by *CLS.
 
         """
-        if self.resource is not None:
+        if self.resource:
             try:
                 start_time = time.time()
                 response = self.resource.query(":STAT:OPER:EVEN?")
@@ -269,7 +286,7 @@ class AWG_system_status:
                     duration_ms=duration,
                     response=response.strip()
                 )
-                return {"OperationEventStatus": int(response.strip()), "Duration(ms)": duration}
+                return {"OperationEventStatus": OperationStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(
                     command=":STAT:OPER:EVEN?",
@@ -304,7 +321,7 @@ class AWG_system_status:
                     duration_ms=duration,
                     response=response.strip()
                 )
-                return {"OperationCondition": int(response.strip()), "Duration(ms)": duration}
+                return {"OperationCondition": OperationStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(
                     command=":STAT:OPER:COND?",
@@ -520,7 +537,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:VOLT:EVEN?", duration_ms=duration, response=response.strip())
-                return {"VoltageEventStatus": int(response.strip()), "Duration(ms)": duration}
+                return {"VoltageEventStatus": VoltageStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:VOLT:EVEN?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -542,7 +559,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:VOLT:COND?", duration_ms=duration, response=response.strip())
-                return {"VoltageCondition": int(response.strip()), "Duration(ms)": duration}
+                return {"VoltageCondition": VoltageStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:VOLT:COND?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -711,7 +728,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:FREQ:EVEN?", duration_ms=duration, response=response.strip())
-                return {"FrequencyEventStatus": int(response.strip()), "Duration(ms)": duration}
+                return {"FrequencyEventStatus": FrequencyStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:FREQ:EVEN?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -733,7 +750,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:FREQ:COND?", duration_ms=duration, response=response.strip())
-                return {"FrequencyCondition": int(response.strip()), "Duration(ms)": duration}
+                return {"FrequencyCondition": FrequencyStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:FREQ:COND?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -901,7 +918,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:SEQ:EVEN?", duration_ms=duration, response=response.strip())
-                return {"SequenceEventStatus": int(response.strip()), "Duration(ms)": duration}
+                return {"SequenceEventStatus": SequenceStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:SEQ:EVEN?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -924,7 +941,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:SEQ:COND?", duration_ms=duration, response=response.strip())
-                return {"SequenceCondition": int(response.strip()), "Duration(ms)": duration}
+                return {"SequenceCondition": SequenceStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:SEQ:COND?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -1092,7 +1109,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:DUC:EVEN?", duration_ms=duration, response=response.strip())
-                return {"DUCEventStatus": int(response.strip()), "Duration(ms)": duration}
+                return {"DUCEventStatus": DUCStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:DUC:EVEN?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -1112,7 +1129,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:DUC:COND?", duration_ms=duration, response=response.strip())
-                return {"DUCCondition": int(response.strip()), "Duration(ms)": duration}
+                return {"DUCCondition": DUCStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:DUC:COND?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -1272,7 +1289,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:CONN:EVEN?", duration_ms=duration, response=response.strip())
-                return {"ConnectionEventStatus": int(response.strip()), "Duration(ms)": duration}
+                return {"ConnectionEventStatus": ConnectionStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:CONN:EVEN?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -1292,7 +1309,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:QUES:CONN:COND?", duration_ms=duration, response=response.strip())
-                return {"ConnectionCondition": int(response.strip()), "Duration(ms)": duration}
+                return {"ConnectionCondition": ConnectionStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:QUES:CONN:COND?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -1446,7 +1463,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:OPER:RUN:EVEN?", duration_ms=duration, response=response.strip())
-                return {"RunEventStatus": int(response.strip()), "Duration(ms)": duration}
+                return {"RunEventStatus": RunStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:OPER:RUN:EVEN?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -1466,7 +1483,7 @@ class AWG_system_status:
                 duration = (time.time() - start_time) * 1000
 
                 self.log._log_command(":STAT:OPER:RUN:COND?", duration_ms=duration, response=response.strip())
-                return {"RunCondition": int(response.strip()), "Duration(ms)": duration}
+                return {"RunCondition": RunStatus(int(response.strip())), "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(":STAT:OPER:RUN:COND?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
@@ -1603,36 +1620,78 @@ class AWG_system_status:
                 self.log._log_command(":STAT:OPER:RUN:PTR?", duration_ms=0, response=str(e))
                 return {"Error": str(e)}
         return {"Error": "Device not connected"}
-    
-    
-    
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
 
+    # --------------------- SNAPSHOT ---------------------
 
+    def snapshot(self, events: bool = True):
+        """
+        Read the status byte and every group's condition (and event) register in one message.
 
+        All queries are ';'-joined into a single round trip instead of one query per register.
+        Reading the event registers clears them, exactly as get_*_event_status() does; pass
+        events=False for a non-destructive snapshot of the condition registers only. Use
+        events=False while an AWG_status_monitor is configured: it finds the groups that
+        raised a service request from their event registers, and a snapshot that cleared
+        them first would hide those events from it.
 
+        Each register is returned as its register model (AWGStatusRegisters) plus the names of
+        its set bits. "Changes" diffs the status byte and condition registers against the
+        previous snapshot (None for the first).
 
+        Returns:
+            dict: {"StatusByte": {"Value": ..., "Bits": [...]},
+                   "Groups": {group: {"Condition": ..., "ConditionBits": [...], "Event": ..., "EventBits": [...]}},
+                   "Changes": {group: {"Set": [...], "Cleared": [...]}} or None,
+                   "Duration(ms)": ...} or {"Error": ...}
+        """
+        queries = ["*STB?"]
+        for group in STATUS_GROUPS:
+            queries.append(f":STAT:{group}:COND?")
+            if events:
+                queries.append(f":STAT:{group}:EVEN?")
+        command = ";".join(queries)
 
+        if self.resource:
+            try:
+                start_time = time.time()
+                response = self.resource.query(command)
+                duration = (time.time() - start_time) * 1000
+                values = [int(value) for value in response.strip().split(";")]
+                if len(values) != len(queries):
+                    raise ValueError(f"expected {len(queries)} values, got {len(values)}: {response.strip()}")
+                self.log._log_command(command, duration_ms=duration, response=response.strip())
+            except Exception as e:
+                self.log._log_command(command, duration_ms=0, response=str(e))
+                return {"Error": str(e)}
+        else:
+            self.log._log_command(command, duration_ms=0, response="Device not connected")
+            return {"Error": "Device not connected"}
 
+        registers = {"STB": values[0]}
+        groups = {}
+        step = 2 if events else 1
+        for index, group in enumerate(STATUS_GROUPS):
+            registers[group] = values[1 + index * step]
+            condition = STATUS_REGISTERS[group](registers[group])
+            groups[group] = {"Condition": condition, "ConditionBits": decode_register(group, condition)}
+            if events:
+                event = STATUS_REGISTERS[group](values[2 + index * step])
+                groups[group].update({"Event": event, "EventBits": decode_register(group, event)})
+
+        changes = None
+        previous = self._last_snapshot
+        if previous is not None:
+            changes = {}
+            for group, value in registers.items():
+                flipped = value ^ previous[group]
+                if flipped:
+                    changes[group] = {"Set": decode_register(group, flipped & value),
+                                      "Cleared": decode_register(group, flipped & previous[group])}
+        self._last_snapshot = registers
+
+        return {
+            "StatusByte": {"Value": StatusByte(values[0]), "Bits": decode_register("STB", values[0])},
+            "Groups": groups,
+            "Changes": changes,
+            "Duration(ms)": duration
+        }
@@ -0,0 +1,234 @@
+#import awg modules
+from AWGTraceSubsystem import AWG_trace_system, quantize_to_dac, BINARY_CHUNK_SAMPLES, SEGMENT_GRANULARITY
+
+#import other modules
+import os
+import socket
+import time
+
+import numpy as np
+from pyvisa import constants, errors
+
+
+def _is_timeout(error: Exception) -> bool:
+    """True if the exception is a VISA or socket I/O timeout."""
+    if isinstance(error, errors.VisaIOError):
+        return error.error_code == constants.StatusCode.error_timeout
+    return isinstance(error, (TimeoutError, socket.timeout))
+
+
+class AWG_stream_uploader:
+    """
+    Streaming uploader for segments larger than one VISA transfer (e.g., extended memory).
+
+    Consumes an iterator of NumPy chunks of any size, re-blocks them into aligned binary
+    :TRAC:DATA blocks and writes each block at its segment offset. Every `ack_interval`
+    blocks a *OPC? query acknowledges the data written so far; only unacknowledged blocks
+    are kept in memory. After a timeout the device is cleared and the upload resumes from
+    the last acknowledged offset instead of restarting the segment.
+    """
+
+    def __init__(self, trace_system: AWG_trace_system, block_size: int = BINARY_CHUNK_SAMPLES,
+                 ack_interval: int = 4, max_retries: int = 3, progress_callback=None):
+        if block_size <= 0 or block_size % SEGMENT_GRANULARITY:
+            raise ValueError(f"block_size must be a positive multiple of {SEGMENT_GRANULARITY}")
+        if ack_interval < 1:
+            raise ValueError("ack_interval must be at least 1")
+
+        self.trace = trace_system
+        self.resource = trace_system.resource
+        self.log = trace_system.log
+
+        self.block_size = block_size
+        self.ack_interval = ack_interval
+        self.max_retries = max_retries
+        self.progress_callback = progress_callback
+
+        # Segment offset up to which the instrument has confirmed the data
+        self.acknowledged_offset = None
+
+    def upload(self, channel: int, segment_id: int, chunks, offset: int = 0, total_samples: int = None):
+        """
+        Stream chunks into a segment.
+
+        Args:
+            channel (int): Channel number (1–4)
+            segment_id (int): Segment ID (must already be defined)
+            chunks (iterable): Iterator or generator of int8 DAC code or float sample arrays
+            offset (int): Segment offset of the first sample, e.g. a previous AcknowledgedOffset
+            total_samples (int, optional): Expected total, only used for progress reports
+
+        Returns:
+            dict: {"Status": ..., "Samples": ..., "Blocks": ..., "Retries": ..., "AcknowledgedOffset": ...,
+                   "Duration(ms)": ..., "Throughput(MSa/s)": ...} or {"Error": ..., "AcknowledgedOffset": ...}
+        """
+        if not self.resource:
+            return {"Error": "Device not connected"}
+        if channel not in [1, 2, 3, 4]:
+            return {"Error": "Invalid channel number. Must be 1–4"}
+
+        command = f":TRAC{channel}:DATA {segment_id},{offset},<stream>"
+        self.acknowledged_offset = offset
+        self._start_offset = offset
+        self._pending = []  # (offset, block) written but not yet acknowledged
+        self._next_offset = offset
+        self._blocks = 0
+        self._retries = 0
+        self._total = total_samples
+        self._start_time = time.time()
+
+        buffer = np.empty(self.block_size, dtype=np.int8)
+        filled = 0
+
+        try:
+            for chunk in chunks:
+                codes = quantize_to_dac(chunk)
+                pos = 0
+                while pos < len(codes):
+                    take = min(self.block_size - filled, len(codes) - pos)
+                    buffer[filled:filled + take] = codes[pos:pos + take]
+                    filled += take
+                    pos += take
+                    if filled == self.block_size:
+                        self._send(channel, segment_id, buffer.copy())
+                        filled = 0
+
+            if filled:
+                self._send(channel, segment_id, buffer[:filled].copy())
+            if self._pending:
+                self._acknowledge(channel, segment_id)
+
+        except Exception as e:
+            self.log._log_command(command, duration_ms=0, response=str(e))
+            return {"Error": str(e), "AcknowledgedOffset": self.acknowledged_offset}
+
+        duration = (time.time() - self._start_time) * 1000
+        written = self.acknowledged_offset - offset
+        throughput = written / (duration * 1e3) if duration > 0 else None
+        self.log._log_command(command, duration_ms=duration,
+                              response=f"{written} samples in {self._blocks} blocks, {self._retries} retries")
+        return {
+            "Status": f"{written} samples streamed to segment {segment_id}",
+            "Samples": written,
+            "Blocks": self._blocks,
+            "Retries": self._retries,
+            "AcknowledgedOffset": self.acknowledged_offset,
+            "Duration(ms)": duration,
+            "Throughput(MSa/s)": throughput
+        }
+
+    def upload_file(self, channel: int, segment_id: int, file_path: str, dtype: str = "int8",
+                    define_segment: bool = None, offset: int = 0):
+        """
+        Stream a raw waveform file from disk into a segment without loading it into RAM.
+
+        The file is memory-mapped one window of `block_size` samples at a time, and each
+        window is unmapped once sent, so resident memory stays at a few blocks regardless
+        of the file size.
+
+        Args:
+            channel (int): Channel number (1–4)
+            segment_id (int): Target segment ID
+            file_path (str): Path to a headerless file of int8 DAC codes or float32 samples (-1.0..1.0)
+            dtype (str): "int8" or "float32"
+            define_segment (bool, optional): Define the segment first, with its length taken from the file
+                size. Defaults to True for a new upload and False when resuming (offset > 0), since
+                redefining would clear the samples already written
+            offset (int): Sample offset in the file (and the segment) to start from, e.g. to resume
+
+        Returns:
+            dict: Same as upload(), plus "SegmentLength", or {"Error": ...}
+        """
+        if dtype not in ["int8", "float32"]:
+            return {"Error": "dtype must be 'int8' or 'float32'"}
+
+        itemsize = np.dtype(dtype).itemsize
+        file_size = os.path.getsize(file_path)
+        if file_size % itemsize:
+            return {"Error": f"File size {file_size} is not a multiple of the {dtype} sample size"}
+        length = file_size // itemsize
+
+        if define_segment is None:
+            define_segment = offset == 0
+        if define_segment:
+            response = self.trace.define_waveform_segment(channel, segment_id, length)
+            if "Error" in response:
+                return response
+
+        def windows():
+            for start in range(offset, length, self.block_size):
+                count = min(self.block_size, length - start)
+                window = np.memmap(file_path, dtype=dtype, mode="r", offset=start * itemsize, shape=(count,))
+                yield window
+                del window  # unmap before the next window is opened
+
+        result = self.upload(channel, segment_id, windows(), offset=offset, total_samples=length - offset)
+        result["SegmentLength"] = length
+        return result
+
+    # --------------------- INTERNAL HELPERS ---------------------
+
+    def _send(self, channel: int, segment_id: int, block: np.ndarray):
+        """Write one block and acknowledge every `ack_interval` blocks."""
+        self._pending.append((self._next_offset, block))
+        self._next_offset += len(block)
+        self._write_with_retry(channel, segment_id, [self._pending[-1]])
+        self._blocks += 1
+
+        if len(self._pending) >= self.ack_interval:
+            self._acknowledge(channel, segment_id)
+
+    def _acknowledge(self, channel: int, segment_id: int):
+        """Confirm all pending blocks with *OPC?, re-sending them after a timeout."""
+        while True:
+            try:
+                self.resource.query("*OPC?")
+                break
+            except Exception as e:
+                if not _is_timeout(e):
+                    raise
+                self._recover(e)
+                self._write_with_retry(channel, segment_id, self._pending)
+
+        self.acknowledged_offset = self._next_offset
+        self._pending = []
+        self._report_progress()
+
+    def _write_with_retry(self, channel: int, segment_id: int, blocks: list):
+        """Write blocks; after a timeout, resume from the last acknowledged offset."""
+        while True:
+            try:
+                for block_offset, block in blocks:
+                    self.trace._write_dac_block(channel, segment_id, block_offset, block)
+                return
+            except Exception as e:
+                if not _is_timeout(e):
+                    raise
+                self._recover(e)
+                blocks = self._pending
+
+    def _recover(self, error: Exception):
+        """Count a retry and clear the device so the next write starts clean."""
+        self._retries += 1
+        self.log._log_command(f"Resume from offset {self.acknowledged_offset}", duration_ms=0, response=str(error))
+        if self._retries > self.max_retries:
+            raise error
+        try:
+            self.resource.clear()
+        except Exception:
+            pass
+
+    def _report_progress(self):
+        if self.progress_callback is None:
+            return
+        duration = (time.time() - self._start_time) * 1000
+        written = self.acknowledged_offset - self._start_offset
+        self.progress_callback({
+            "Samples": written,
+            "TotalSamples": self._total,
+            "AcknowledgedOffset": self.acknowledged_offset,
+            "Blocks": self._blocks,
+            "Retries": self._retries,
+            "Duration(ms)": duration,
+            "Throughput(MSa/s)": written / (duration * 1e3) if duration > 0 else None
+        })
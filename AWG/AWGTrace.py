@@ -0,0 +1,226 @@
+#import other modules
+import json
+import struct
+import time
+
+TRACE_FORMATS = ("jsonl", "binary")
+
+#Binary trace layout: file magic, then one fixed-size record header followed by the SCPI header bytes.
+#Record: timestamp_ns, latency_ns, bytes_sent, bytes_received, error flag, header length
+TRACE_MAGIC = b"AWGTRC1\n"
+TRACE_RECORD = struct.Struct("<qqIIBH")
+
+#Histogram resolution: 2**HISTOGRAM_SUB_BUCKET_BITS linear buckets per power of two (~1.6 % error)
+HISTOGRAM_SUB_BUCKET_BITS = 6
+
+
+def command_header(command) -> str:
+    """Return the SCPI header of the first command in a message (str or raw bytes)."""
+    if isinstance(command, (bytes, bytearray, memoryview)):
+        command = bytes(command[:64]).decode("ascii", errors="replace")
+    header = command.strip().split(None, 1)[0] if command.strip() else ""
+    return header.split(";", 1)[0].upper()
+
+
+class AWG_latency_histogram:
+    """
+    HDR-style latency histogram with log-linear buckets.
+
+    Values (nanoseconds) are counted in buckets whose width is 1/64 of their power of two,
+    so percentiles keep ~2 significant digits across ns to seconds at constant memory.
+    """
+
+    def __init__(self, sub_bucket_bits: int = HISTOGRAM_SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _bucket(self, value: int) -> int:
+        shift = max(value.bit_length() - self.sub_bucket_bits - 1, 0)
+        return (shift << (self.sub_bucket_bits + 1)) | (value >> shift)
+
+    def _bucket_value(self, bucket: int) -> int:
+        shift = bucket >> (self.sub_bucket_bits + 1)
+        sub_bucket = bucket & ((1 << (self.sub_bucket_bits + 1)) - 1)
+        # Report the upper edge of the bucket, as HDR histograms do
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, value_ns: int):
+        bucket = self._bucket(max(int(value_ns), 0))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value_ns
+        if value_ns > self.max:
+            self.max = value_ns
+
+    def percentile(self, percent: float) -> int:
+        """Return the latency (ns) at or below which `percent` % of the values fall."""
+        if not self.count:
+            return 0
+        target = max(self.count * percent / 100, 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(self._bucket_value(bucket), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "Count": self.count,
+            "Mean(ms)": self.total / self.count / 1e6 if self.count else None,
+            "p50(ms)": self.percentile(50) / 1e6,
+            "p99(ms)": self.percentile(99) / 1e6,
+            "Max(ms)": self.max / 1e6
+        }
+
+
+class AWG_trace:
+    """
+    Structured trace of every I/O operation on a session, with per-header latency histograms.
+
+    Each record carries a perf_counter_ns timestamp, the SCPI header, the bytes sent and
+    received, the latency and an error flag. Records are written to a JSONL file or a
+    compact binary file (see TRACE_RECORD), or only aggregated when no path is given.
+    """
+
+    def __init__(self, path: str = None, format: str = "jsonl", buffer_size: int = 1024 * 1024):
+        if format not in TRACE_FORMATS:
+            raise ValueError(f"Invalid trace format '{format}'. Must be one of {TRACE_FORMATS}")
+        self.path = path
+        self.format = format
+        self.histograms = {}
+        self.records = 0
+        self.errors = 0
+
+        self._file = None
+        if path is not None:
+            if format == "binary":
+                self._file = open(path, "wb", buffering=buffer_size)
+                self._file.write(TRACE_MAGIC)
+            else:
+                self._file = open(path, "w", buffering=buffer_size)
+
+    def record(self, header: str, start_ns: int, end_ns: int, bytes_sent: int = 0, bytes_received: int = 0,
+               error: bool = False):
+        latency = end_ns - start_ns
+        histogram = self.histograms.get(header)
+        if histogram is None:
+            histogram = self.histograms[header] = AWG_latency_histogram()
+        histogram.record(latency)
+        self.records += 1
+        self.errors += bool(error)
+
+        if self._file is None:
+            return
+        if self.format == "binary":
+            encoded = header.encode("ascii", errors="replace")[:0xFFFF]
+            self._file.write(TRACE_RECORD.pack(start_ns, latency, bytes_sent, bytes_received, bool(error), len(encoded)))
+            self._file.write(encoded)
+        else:
+            self._file.write(json.dumps({
+                "t_ns": start_ns, "header": header, "sent": bytes_sent, "received": bytes_received,
+                "latency_ns": latency, "error": bool(error)
+            }) + "\n")
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: {header: {"Count", "Mean(ms)", "p50(ms)", "p99(ms)", "Max(ms)"}}, slowest p99 first
+        """
+        summaries = {header: histogram.summary() for header, histogram in self.histograms.items()}
+        return dict(sorted(summaries.items(), key=lambda item: item[1]["p99(ms)"], reverse=True))
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_trace(path: str):
+    """Yield the records of a JSONL or binary trace file as dicts."""
+    with open(path, "rb") as f:
+        if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            f.seek(0)
+            for line in f:
+                yield json.loads(line)
+            return
+        while True:
+            fixed = f.read(TRACE_RECORD.size)
+            if len(fixed) < TRACE_RECORD.size:
+                return
+            start_ns, latency, sent, received, error, length = TRACE_RECORD.unpack(fixed)
+            yield {
+                "t_ns": start_ns, "header": f.read(length).decode("ascii"), "sent": sent, "received": received,
+                "latency_ns": latency, "error": bool(error)
+            }
+
+
+class AWG_traced_resource:
+    """
+    Wraps a VISA (or socket) resource and records every I/O call into an AWG_trace.
+    Reads are attributed to the header of the preceding write.
+    """
+
+    def __init__(self, resource, trace: AWG_trace):
+        object.__setattr__(self, "resource", resource)
+        object.__setattr__(self, "trace", trace)
+        object.__setattr__(self, "_last_header", "")
+
+    def __getattr__(self, name):
+        return getattr(self.resource, name)
+
+    def __setattr__(self, name, value):
+        # timeout, chunk_size, terminations, ... belong to the wrapped resource
+        setattr(self.resource, name, value)
+
+    def _call(self, header: str, function, args, sent: int, received=None):
+        start = time.perf_counter_ns()
+        try:
+            result = function(*args)
+        except Exception:
+            self.trace.record(header, start, time.perf_counter_ns(), sent, 0, error=True)
+            raise
+        end = time.perf_counter_ns()
+        size = received(result) if received is not None else 0
+        self.trace.record(header, start, end, sent, size)
+        return result
+
+    def write(self, message: str):
+        header = command_header(message)
+        object.__setattr__(self, "_last_header", header)
+        return self._call(header, self.resource.write, (message,), len(message) + 1)
+
+    def write_raw(self, message: bytes):
+        header = command_header(message)
+        object.__setattr__(self, "_last_header", header)
+        return self._call(header, self.resource.write_raw, (message,), len(message))
+
+    def query(self, message: str):
+        header = command_header(message)
+        object.__setattr__(self, "_last_header", header)
+        return self._call(header, self.resource.query, (message,), len(message) + 1, len)
+
+    def read(self):
+        return self._call(self._last_header, self.resource.read, (), 0, len)
+
+    def read_raw(self, size: int = None):
+        return self._call(self._last_header, self.resource.read_raw, (size,), 0, len)
+
+    def write_binary_values(self, command: str, values, **kwargs):
+        header = command_header(command)
+        object.__setattr__(self, "_last_header", header)
+        function = lambda: self.resource.write_binary_values(command, values, **kwargs)
+        return self._call(header, function, (), len(command) + len(values) * 4)
+
+    def query_binary_values(self, command: str, **kwargs):
+        header = command_header(command)
+        object.__setattr__(self, "_last_header", header)
+        function = lambda: self.resource.query_binary_values(command, **kwargs)
+        return self._call(header, function, (), len(command) + 1, lambda values: len(values) * 4)
@@ -1,21 +1,56 @@
 #import awg modules
-from AWGConnection import AWG_connection
-from logger import awg_logger
+from AWGSession import AWG_session
+from IEEEBlock import ieee_block_message, parse_ieee_block
 import numpy as np
 
 #import other modules
 import time
 
+#M8195A waveform memory granularity in samples; binary chunks are kept aligned to it
+SEGMENT_GRANULARITY = 256
+
+#Default number of samples sent per binary :TRAC:DATA block (1 MSa)
+BINARY_CHUNK_SAMPLES = 4096 * SEGMENT_GRANULARITY
+
+
+def quantize_to_dac(samples) -> np.ndarray:
+    """
+    Convert samples to M8195A int8 DAC codes.
+
+    int8 input is returned as-is (no copy). Other integer input is range-checked and
+    cast. Float input is treated as normalized full scale (-1.0 to 1.0) and scaled to
+    -127..127 with rounding.
+
+    Args:
+        samples (array-like): DAC codes or normalized float samples
+
+    Returns:
+        np.ndarray: 1-D int8 array of DAC codes
+    """
+    data = np.asarray(samples)
+    if data.dtype == np.int8:
+        return data.ravel()
+    if np.issubdtype(data.dtype, np.integer):
+        if data.size and (data.min() < -128 or data.max() > 127):
+            raise ValueError("Integer DAC codes must be in range -128 to 127")
+        return data.astype(np.int8).ravel()
+    if np.issubdtype(data.dtype, np.floating):
+        codes = np.rint(data * 127.0)
+        np.clip(codes, -128, 127, out=codes)
+        return codes.astype(np.int8).ravel()
+    raise TypeError(f"Unsupported sample dtype '{data.dtype}'")
+
 class AWG_trace_system:
-    def __init__(self, ip_address):
+    def __init__(self, ip_address, session: AWG_session = None):
         self.ip_address = ip_address
 
-        #create insatces for connection and logger classes
-        self.connection = AWG_connection(ip_address)
-        self.log = awg_logger()
+        #share one session (connection, resource manager and logger) per instrument
+        self.session = session if session is not None else AWG_session(ip_address)
+        self.connection = self.session.connection
+        self.log = self.session.log
 
-        #select the recourse from connection class
-        self.resource = self.connection.get_resource()
+        #the session resolves the live resource lazily on every call
+        self.resource = self.session
 
     def set_trace_memory_mode(self, channel: int, mode: str):
         """
@@ -45,7 +80,7 @@ class AWG_trace_system:
             try:
                 start_time = time.time()
                 self.resource.write(command)
-                response = self.resource.query(query_command).strip()
+                response = self.session.verify(command, query=query_command)
                 duration = (time.time() - start_time) * 1000
                 self.log._log_command(command, duration_ms=duration, response=response)
                 return {
@@ -235,18 +270,79 @@ class AWG_trace_system:
             try:
                 if channel not in [1, 2, 3, 4]:
                     return {"Error": "Invalid channel number. Must be 1–4"}
+                start_time = time.time()  # includes ASCII encoding so MSa/s compares with the binary path
                 sample_str = ",".join(str(s) for s in samples)
                 command = f":TRAC{channel}:DATA {segment_id},{offset},{sample_str}"
-                start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
                 self.log._log_command(command, duration_ms=duration, response="OK")
-                return {"Status": f"{len(samples)} samples written to segment {segment_id}", "Duration(ms)": duration}
+                throughput = len(samples) / (duration * 1e3) if duration > 0 else None
+                return {
+                    "Status": f"{len(samples)} samples written to segment {segment_id}",
+                    "Duration(ms)": duration,
+                    "Throughput(MSa/s)": throughput
+                }
+            except Exception as e:
+                self.log._log_command(command, duration_ms=0, response=str(e))
+                return {"Error": str(e)}
+        return {"Error": "Device not connected"}
+    
+    def write_waveform_data_binary(self, channel: int, segment_id: int, offset: int, samples,
+                                   chunk_size: int = BINARY_CHUNK_SAMPLES):
+        """
+        Write waveform data to a segment as IEEE 488.2 binary blocks of int8 DAC codes.
+
+        Large arrays are split into chunks of `chunk_size` samples; each chunk is sent as
+        its own :TRAC:DATA block at the matching segment offset.
+
+        Args:
+            channel (int): Channel number (1–4)
+            segment_id (int): Segment ID
+            offset (int): Offset in samples from segment start
+            samples (np.ndarray): int8 DAC codes, or float samples in -1.0..1.0 to be quantized
+            chunk_size (int): Samples per block, a multiple of SEGMENT_GRANULARITY
+
+        Returns:
+            dict: {"Status": ..., "Blocks": ..., "Duration(ms)": ..., "Throughput(MSa/s)": ...} or {"Error": ...}
+        """
+        if self.resource:
+            command = f":TRAC{channel}:DATA {segment_id},{offset},<block>"
+            try:
+                if channel not in [1, 2, 3, 4]:
+                    return {"Error": "Invalid channel number. Must be 1–4"}
+                if chunk_size <= 0 or chunk_size % SEGMENT_GRANULARITY:
+                    return {"Error": f"chunk_size must be a positive multiple of {SEGMENT_GRANULARITY}"}
+
+                start_time = time.time()
+                codes = quantize_to_dac(samples)
+                total = len(codes)
+                blocks = 0
+
+                for start in range(0, total, chunk_size):
+                    command = f":TRAC{channel}:DATA {segment_id},{offset + start},<block>"
+                    self._write_dac_block(channel, segment_id, offset + start, codes[start:start + chunk_size])
+                    blocks += 1
+                duration = (time.time() - start_time) * 1000
+
+                throughput = total / (duration * 1e3) if duration > 0 else None
+                self.log._log_command(f":TRAC{channel}:DATA {segment_id},{offset},<block>", duration_ms=duration,
+                                      response=f"{total} samples in {blocks} binary blocks")
+                return {
+                    "Status": f"{total} samples written to segment {segment_id}",
+                    "Blocks": blocks,
+                    "Duration(ms)": duration,
+                    "Throughput(MSa/s)": throughput
+                }
             except Exception as e:
                 self.log._log_command(command, duration_ms=0, response=str(e))
                 return {"Error": str(e)}
         return {"Error": "Device not connected"}
     
+    def _write_dac_block(self, channel: int, segment_id: int, offset: int, codes: np.ndarray):
+        """Send one int8 DAC code array as a binary :TRAC:DATA block. Raises on I/O errors."""
+        command = f":TRAC{channel}:DATA {segment_id},{offset},"
+        self.resource.write_raw(ieee_block_message(command, np.ascontiguousarray(codes), self.resource.write_termination))
+    
     def read_waveform_data(self, channel: int, segment_id: int, offset: int, length: int):
         """
         Query waveform data from a segment.
@@ -276,41 +372,59 @@ class AWG_trace_system:
                 return {"Error": str(e)}
         return {"Error": "Device not connected"}
     
-    def read_waveform_data_binary(self, channel: int, segment_id: int, offset: int, length: int):
+    def read_waveform_data_binary(self, channel: int, segment_id: int, offset: int, length: int,
+                                  output: str = "list", byte_order: str = None):
         """
         Query waveform data from a segment using IEEE binary block format.
 
+        With output "array" or "memoryview" the samples are returned as a view over the
+        received bytes without copying them (the array is read-only). With byte order
+        'SWAPped' (little endian, see AWG_format.set_byte_order) the array is native on
+        x86 hosts and needs no byteswap.
+
         Args:
             channel (int): Channel number (1–4)
             segment_id (int): Segment ID to read from
             offset (int): Offset from the start of the segment in samples
             length (int): Number of samples to read
+            output (str): "list" (Python floats), "array" (np.ndarray) or "memoryview" (raw payload bytes)
+            byte_order (str, optional): 'NORMal' or 'SWAPped'. Defaults to the byte order last
+                set or queried through AWG_format on this session.
 
         Returns:
-            dict: {"Samples": [...], "Duration(ms)": ...} or {"Error": ...}
+            dict: {"Samples": [...] | np.ndarray | memoryview, "Duration(ms)": ...} or {"Error": ...}
         """
         if self.resource:
             try:
                 if channel not in [1, 2, 3, 4]:
                     return {"Error": "Invalid channel number. Must be 1–4"}
+                if output not in ["list", "array", "memoryview"]:
+                    return {"Error": "output must be 'list', 'array' or 'memoryview'"}
+
+                order = byte_order if byte_order is not None else self.session.byte_order
+                if order not in ["NORMal", "SWAPped"]:
+                    return {"Error": "byte_order must be 'NORMal' or 'SWAPped'"}
+
                 command = f":TRAC{channel}:DATA:BLOC? {segment_id},{offset},{length}"
                 start_time = time.time()
                 self.resource.write(command)
                 raw = self.resource.read_raw()
                 duration = (time.time() - start_time) * 1000
 
-                # Parse IEEE binary block format
-                if raw[0:1] != b'#':
-                    raise ValueError("Unexpected response format (missing IEEE block header)")
+                # Parse IEEE binary block format without copying the payload
+                data_bytes = parse_ieee_block(raw)
 
-                header_len = int(raw[1:2])
-                num_digits = int(raw[2:2 + header_len])
-                data_start = 2 + header_len
-                data_bytes = raw[data_start:data_start + num_digits]
-
-                samples = np.frombuffer(data_bytes, dtype='>f4').tolist()  # '>f4' for big-endian float32
+                if output == "memoryview":
+                    samples = data_bytes
+                    count = len(data_bytes) // 4
+                else:
+                    dtype = '>f4' if order == "NORMal" else '<f4'  # float32, big or little endian
+                    samples = np.frombuffer(data_bytes, dtype=dtype)
+                    count = len(samples)
+                    if output == "list":
+                        samples = samples.tolist()
 
-                self.log._log_command(command, duration_ms=duration, response=f"<<{len(samples)} binary samples>>")
+                self.log._log_command(command, duration_ms=duration, response=f"<<{count} binary samples>>")
                 return {"Samples": samples, "Duration(ms)": duration}
 
             except Exception as e:
@@ -397,7 +511,7 @@ class AWG_trace_system:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_import_resample_mode(channel)))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_import_resample_mode, channel)))
                 return {"Status": f"Set resampling mode to {mode} on channel {channel}", "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(command, duration_ms=0, response=str(e))
@@ -444,7 +558,7 @@ class AWG_trace_system:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_import_resample_waveform_length(channel)))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_import_resample_waveform_length, channel)))
                 return {
                     "Status": f"Waveform length {length} set for channel {channel}",
                     "Duration(ms)": duration
@@ -495,7 +609,7 @@ class AWG_trace_system:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_import_scaling(self, channel)))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_import_scaling, channel)))
                 return {"Status": f"Scaling set to {state_str} for channel {channel}", "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(command, duration_ms=0, response=str(e))
@@ -660,7 +774,7 @@ class AWG_trace_system:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_segment_name(channel, segment_id)))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_segment_name, channel, segment_id, query=f":TRAC{channel}:NAME? {segment_id}")))
                 return {
                     "Status": f"Name '{name}' set for segment {segment_id} on channel {channel}",
                     "Duration(ms)": duration
@@ -718,7 +832,7 @@ class AWG_trace_system:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_segment_comment(channel,segment_id)))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_segment_comment, channel, segment_id, query=f":TRAC{channel}:COMM? {segment_id}")))
                 return {
                     "Status": f"Comment set for segment {segment_id} on channel {channel}",
                     "Duration(ms)": duration
@@ -773,7 +887,7 @@ class AWG_trace_system:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_segment_selection(channel)))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_segment_selection, channel)))
                 return {
                     "Status": f"Segment {segment_id} selected for channel {channel}",
                     "Duration(ms)": duration
@@ -830,7 +944,7 @@ class AWG_trace_system:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_segment_advancement_mode(channel)))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_segment_advancement_mode, channel)))
                 return {
                     "Status": f"Advancement mode set to {mode.upper()} on channel {channel}",
                     "Duration(ms)": duration
@@ -886,7 +1000,7 @@ class AWG_trace_system:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_segment_loop_count(channel)))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_segment_loop_count, channel)))
                 return {
                     "Status": f"Loop count set to {count} on channel {channel}",
                     "Duration(ms)": duration
@@ -974,7 +1088,7 @@ class AWG_trace_system:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                self.log._log_command(command, duration_ms=duration, response=str(self.get_marker_state(channel)))
+                self.log._log_command(command, duration_ms=duration, response=str(self.session.verify(command, self.get_marker_state, channel)))
                 return {"Status": f"Marker set to {state} on channel {channel}", "Duration(ms)": duration}
             except Exception as e:
                 self.log._log_command(command, duration_ms=0, response=str(e))
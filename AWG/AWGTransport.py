@@ -0,0 +1,143 @@
+#import other modules
+import socket
+
+#Transports accepted by AWG_connection
+TRANSPORTS = ("vxi11", "hislip", "visa-socket", "socket", "sim")
+
+#Default SCPI raw socket port of Keysight instruments
+SCPI_SOCKET_PORT = 5025
+
+
+def visa_resource_string(ip_address: str, transport: str = "vxi11", port: int = SCPI_SOCKET_PORT) -> str:
+    """
+    Return the VISA resource string for a pyvisa-based transport.
+
+    Args:
+        ip_address (str): Instrument IP address
+        transport (str): "vxi11", "hislip" or "visa-socket"
+        port (int): Raw socket port, used by "visa-socket"
+    """
+    if transport == "vxi11":
+        return f"TCPIP0::{ip_address}::inst0::INSTR"
+    if transport == "hislip":
+        return f"TCPIP0::{ip_address}::hislip0::INSTR"
+    if transport == "visa-socket":
+        return f"TCPIP0::{ip_address}::{port}::SOCKET"
+    raise ValueError(f"Transport '{transport}' is not a VISA transport")
+
+
+class socket_transport:
+    """
+    Lean pure-Python SCPI transport over a raw TCP socket (port 5025).
+
+    Implements the subset of the pyvisa message-based resource API used by the
+    subsystems (write, query, read, read_raw, write_raw, timeout, clear, close), so it
+    can be used anywhere a pyvisa resource is expected. Nagle's algorithm is disabled
+    for low small-command latency and large socket buffers are used for bulk blocks.
+    """
+
+    def __init__(self, ip_address: str, port: int = SCPI_SOCKET_PORT, timeout: int = 5000,
+                 buffer_size: int = 4 * 1024 * 1024):
+        self.resource_name = f"TCPIP0::{ip_address}::{port}::SOCKET"
+        self.write_termination = '\n'
+        self.read_termination = '\n'
+        self._buffer = bytearray()
+
+        self._socket = socket.create_connection((ip_address, port), timeout=timeout / 1000)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, buffer_size)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size)
+        self._timeout = timeout
+
+    # --------------------- SETTINGS ---------------------
+
+    @property
+    def timeout(self):
+        """I/O timeout in milliseconds (same unit as pyvisa)."""
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self._timeout = value
+        self._socket.settimeout(None if value is None else value / 1000)
+
+    # --------------------- WRITE ---------------------
+
+    def write(self, message: str):
+        data = (message + self.write_termination).encode()
+        self._socket.sendall(data)
+        return len(data)
+
+    def write_raw(self, message: bytes):
+        # Sent as is, like pyvisa; a raw socket has no END signal, so the caller
+        # includes the terminator (see IEEEBlock.ieee_block_message)
+        self._socket.sendall(message)
+        return len(message)
+
+    # --------------------- READ ---------------------
+
+    def _fill(self, size: int):
+        while len(self._buffer) < size:
+            chunk = self._socket.recv(max(size - len(self._buffer), 65536))
+            if not chunk:
+                raise ConnectionError("Connection closed by instrument")
+            self._buffer += chunk
+
+    def _take(self, size: int) -> bytes:
+        self._fill(size)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def _read_line(self) -> bytes:
+        terminator = self.read_termination.encode()
+        while True:
+            index = self._buffer.find(terminator)
+            if index >= 0:
+                return self._take(index + len(terminator))
+            self._fill(len(self._buffer) + 1)
+
+    def read_raw(self, size: int = None) -> bytes:
+        """
+        Read one response message. Definite-length blocks ('#<n><len>...') are read by
+        length, so binary payloads may contain the termination character.
+        """
+        self._fill(1)
+        if self._buffer[0:1] != b"#":
+            return self._read_line()
+
+        self._fill(2)
+        num_digits = int(self._buffer[1:2])
+        self._fill(2 + num_digits)
+        length = int(self._buffer[2:2 + num_digits])
+        block = self._take(2 + num_digits + length)
+        # Consume the message terminator that follows the block
+        terminator = self.read_termination.encode()
+        self._fill(len(terminator))
+        if self._buffer[:len(terminator)] == terminator:
+            del self._buffer[:len(terminator)]
+        return block
+
+    def read(self) -> str:
+        return self.read_raw().decode().rstrip(self.read_termination)
+
+    def query(self, message: str) -> str:
+        self.write(message)
+        return self.read()
+
+    # --------------------- CONTROL ---------------------
+
+    def clear(self):
+        """Discard any unread response data (a raw socket has no device clear)."""
+        self._buffer.clear()
+        self._socket.setblocking(False)
+        try:
+            while self._socket.recv(65536):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        finally:
+            self.timeout = self._timeout
+
+    def close(self):
+        self._socket.close()
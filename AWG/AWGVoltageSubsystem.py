@@ -1,20 +1,20 @@
 #import awg modules
-from AWGConnection import AWG_connection
-from logger import awg_logger
+from AWGSession import AWG_session
 
 #import other modules
 import time
 
 class AWG_Voltage_Subsystem:
-    def __init__(self, ip_address):
+    def __init__(self, ip_address, session: AWG_session = None):
         self.ip_address = ip_address
 
-        #create insatces for connection and logger classes
-        self.connection = AWG_connection(ip_address)
-        self.log = awg_logger()
+        #share one session (connection, resource manager and logger) per instrument
+        self.session = session if session is not None else AWG_session(ip_address)
+        self.connection = self.session.connection
+        self.log = self.session.log
 
-        #select the recourse from connection class
-        self.resource = self.connection.get_resource()
+        #the session resolves the live resource lazily on every call
+        self.resource = self.session
 
     def set_output_voltage(self, channel: int, amplitude: float):
         """
@@ -114,7 +114,7 @@ class AWG_Voltage_Subsystem:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                response = self.get_output_offset(channel)
+                response = self.session.verify(command, self.get_output_offset, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {"Status": f"Offset set to {offset_value} V on channel {channel}", "Duration(ms)": duration}
             except Exception as e:
@@ -143,7 +143,7 @@ class AWG_Voltage_Subsystem:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                response = self.get_output_offset(channel)
+                response = self.session.verify(command, self.get_output_offset, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {
                     "Status": f"Offset set to {mode} for channel {channel}",
@@ -197,7 +197,7 @@ class AWG_Voltage_Subsystem:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                response = self.get_output_high_level(channel)
+                response = self.session.verify(command, self.get_output_high_level, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {**response, "Duration(ms)": duration}
             except Exception as e:
@@ -226,7 +226,7 @@ class AWG_Voltage_Subsystem:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                response = self.get_output_high_level(channel)
+                response = self.session.verify(command, self.get_output_high_level, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {**response, "Duration(ms)": duration}
             except Exception as e:
@@ -276,7 +276,7 @@ class AWG_Voltage_Subsystem:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                response = self.get_output_low_level(channel)
+                response = self.session.verify(command, self.get_output_low_level, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {**response, "Duration(ms)": duration}
             except Exception as e:
@@ -305,7 +305,7 @@ class AWG_Voltage_Subsystem:
                 start_time = time.time()
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
-                response = self.get_output_low_level(channel)
+                response = self.session.verify(command, self.get_output_low_level, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {**response, "Duration(ms)": duration}
             except Exception as e:
@@ -355,7 +355,7 @@ class AWG_Voltage_Subsystem:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_output_termination_voltage(channel)
+                response = self.session.verify(command, self.get_output_termination_voltage, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {**response, "Duration(ms)": duration}
             except Exception as e:
@@ -385,7 +385,7 @@ class AWG_Voltage_Subsystem:
                 self.resource.write(command)
                 duration = (time.time() - start_time) * 1000
 
-                response = self.get_output_termination_voltage(channel)
+                response = self.session.verify(command, self.get_output_termination_voltage, channel)
                 self.log._log_command(command, duration_ms=duration, response=str(response))
                 return {**response, "Duration(ms)": duration}
             except Exception as e:
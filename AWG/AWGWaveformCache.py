@@ -0,0 +1,243 @@
+#import awg modules
+from AWGTraceSubsystem import AWG_trace_system, quantize_to_dac
+from AWGSegmentAllocator import AWG_segment_allocator
+
+#import other modules
+from collections import OrderedDict
+import hashlib
+import time
+
+#Segment comment tag: prefix, BLAKE2b digest of the int8 codes and the length in samples
+CACHE_TAG_PREFIX = "awgcache:b2:"
+CACHE_DIGEST_BYTES = 16
+
+
+def waveform_digest(codes) -> str:
+    """BLAKE2b digest (hex) of a buffer of int8 DAC codes."""
+    return hashlib.blake2b(memoryview(codes).cast("B"), digest_size=CACHE_DIGEST_BYTES).hexdigest()
+
+
+def cache_tag(digest: str, length: int) -> str:
+    return f"{CACHE_TAG_PREFIX}{digest}:{length}"
+
+
+def parse_cache_tag(comment: str):
+    """Return (digest, length) from a segment comment, or None if it is not a cache tag."""
+    if not comment.startswith(CACHE_TAG_PREFIX):
+        return None
+    try:
+        digest, length = comment[len(CACHE_TAG_PREFIX):].split(":")
+        return digest, int(length)
+    except ValueError:
+        return None
+
+
+class AWG_waveform_cache:
+    """
+    Content-addressed cache of the waveforms held in segment memory.
+
+    Uploads are keyed by a BLAKE2b digest of their int8 DAC codes. A waveform that is
+    already stored in a segment of the channel is selected with :TRAC:SEL instead of
+    being transferred again. Every cached segment carries its digest in the segment
+    comment (and a short name), so after a reconnect the cache is rebuilt from the
+    instrument with rebuild() instead of starting empty.
+
+    Segments are allocated through the segment allocator; when a waveform does not fit,
+    the least recently used cached segments of that channel are deleted until it does.
+    Segment memory is per channel, so the same content on another channel still has to
+    be uploaded once there.
+    """
+
+    def __init__(self, trace_system: AWG_trace_system, allocator: AWG_segment_allocator = None,
+                 max_samples: int = None):
+        self.trace = trace_system
+        self.allocator = allocator if allocator is not None else AWG_segment_allocator(trace_system)
+        self.resource = trace_system.resource
+        self.connection = trace_system.connection
+        self.log = trace_system.log
+        self.max_samples = max_samples
+
+        # (channel, digest) -> {"SegmentID": ..., "Length": ...}, least recently used first
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.owner = None
+        self.rebuilt = set()
+
+    # --------------------- BOOKKEEPING ---------------------
+
+    def _check_owner(self, channel: int):
+        # A new resource (reconnect) may talk to an instrument whose segments changed meanwhile
+        resource = self.connection.get_resource()
+        if resource is not self.owner:
+            self.entries.clear()
+            self.rebuilt.clear()
+            self.owner = resource
+        if channel not in self.rebuilt:
+            response = self.rebuild(channel)
+            if "Error" in response:
+                raise RuntimeError(response["Error"])
+
+    def _channel_samples(self, channel: int) -> int:
+        return sum(entry["Length"] for (ch, _), entry in self.entries.items() if ch == channel)
+
+    def _evict_one(self, channel: int):
+        """Delete the least recently used cached segment of the channel. Returns False if there is none."""
+        for key, entry in self.entries.items():
+            if key[0] == channel:
+                response = self.allocator.delete(channel, entry["SegmentID"])
+                if "Error" in response:
+                    raise RuntimeError(response["Error"])
+                del self.entries[key]
+                return True
+        return False
+
+    def _make_room(self, channel: int, length: int):
+        if self.max_samples is not None:
+            while self._channel_samples(channel) + length > self.max_samples:
+                if not self._evict_one(channel):
+                    break
+        while True:
+            check = self.allocator.check_define(channel, length)
+            if "Error" in check:
+                raise RuntimeError(check["Error"])
+            if check["Fits"] or not self._evict_one(channel):
+                break
+
+    def rebuild(self, channel: int):
+        """
+        Re-read the cache entries of a channel from the segment comments on the instrument.
+
+        Returns:
+            dict: {"Entries": ..., "Duration(ms)": ...} or {"Error": ...}
+        """
+        start_time = time.time()
+        response = self.allocator.sync(channel)
+        if "Error" in response:
+            return response
+        for key in [key for key in self.entries if key[0] == channel]:
+            del self.entries[key]
+
+        # Recency is unknown after a reconnect; segments are ordered by ID
+        for segment_id, length in sorted(self.allocator.channels[channel]["Lengths"].items()):
+            comment = self.trace.get_segment_comment(channel, segment_id)
+            if "Error" in comment:
+                return comment
+            tag = parse_cache_tag(comment["Comment"])
+            if tag is not None and tag[1] == length:
+                self.entries[(channel, tag[0])] = {"SegmentID": segment_id, "Length": length}
+        self.rebuilt.add(channel)
+
+        duration = (time.time() - start_time) * 1000
+        entries = sum(1 for ch, _ in self.entries if ch == channel)
+        self.log._log_command(f":TRAC{channel}:COMM? <cache rebuild>", duration_ms=duration,
+                              response=f"{entries} cached segments")
+        return {"Entries": entries, "Duration(ms)": duration}
+
+    def invalidate(self, channel: int = None):
+        """Forget the cache entries of a channel (all channels if omitted); they are re-read on next use."""
+        for key in [key for key in self.entries if channel is None or key[0] == channel]:
+            del self.entries[key]
+        if channel is None:
+            self.rebuilt.clear()
+        else:
+            self.rebuilt.discard(channel)
+
+    # --------------------- UPLOAD ---------------------
+
+    def upload(self, channel: int, samples, select: bool = True, verify: bool = True):
+        """
+        Store a waveform in segment memory unless the channel already holds the same content.
+
+        Args:
+            channel (int): Channel number (1–4)
+            samples (np.ndarray): int8 DAC codes, or float samples in -1.0..1.0 to be quantized
+            select (bool): Select the segment for output (:TRAC:SEL) afterwards
+            verify (bool): On a hit, read the segment comment back to confirm the segment was
+                not deleted or overwritten outside the cache (one short query)
+
+        Returns:
+            dict: {"SegmentID": ..., "Hit": bool, "Digest": ..., "Duration(ms)": ...} or {"Error": ...}
+        """
+        if self.resource:
+            try:
+                if channel not in [1, 2, 3, 4]:
+                    return {"Error": "Invalid channel number. Must be 1–4"}
+                start_time = time.time()
+                codes = quantize_to_dac(samples)
+                digest = waveform_digest(codes)
+                self._check_owner(channel)
+
+                key = (channel, digest)
+                entry = self.entries.get(key)
+                if entry is not None and verify:
+                    comment = self.trace.get_segment_comment(channel, entry["SegmentID"])
+                    if comment.get("Comment") != cache_tag(digest, entry["Length"]):
+                        del self.entries[key]
+                        self.allocator.sync(channel)
+                        entry = None
+
+                hit = entry is not None
+                if hit:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    self._make_room(channel, len(codes))
+                    response = self.allocator.define(channel, len(codes))
+                    if "Error" in response:
+                        return response
+                    entry = {"SegmentID": response["SegmentID"], "Length": len(codes)}
+                    response = self._fill(channel, entry["SegmentID"], codes, digest)
+                    if "Error" in response:
+                        # Don't leave an untagged segment behind in memory
+                        self.allocator.delete(channel, entry["SegmentID"])
+                        return response
+                    self.entries[key] = entry
+
+                if select:
+                    response = self.trace.set_segment_selection(channel, entry["SegmentID"])
+                    if "Error" in response:
+                        return response
+                duration = (time.time() - start_time) * 1000
+                return {
+                    "SegmentID": entry["SegmentID"],
+                    "Hit": hit,
+                    "Digest": digest,
+                    "Duration(ms)": duration
+                }
+            except Exception as e:
+                self.log._log_command(f":TRAC{channel}:DATA <cached upload>", duration_ms=0, response=str(e))
+                return {"Error": str(e)}
+        return {"Error": "Device not connected"}
+
+    def _fill(self, channel: int, segment_id: int, codes, digest: str) -> dict:
+        """Write the codes of a newly defined segment and tag it; the first error is returned."""
+        try:
+            response = self.trace.write_waveform_data_binary(channel, segment_id, 0, codes)
+            if "Error" not in response:
+                response = self.trace.set_segment_name(channel, segment_id, f"cache {digest[:16]}")
+            if "Error" not in response:
+                response = self.trace.set_segment_comment(channel, segment_id, cache_tag(digest, len(codes)))
+            return response
+        except Exception as e:
+            return {"Error": str(e)}
+
+    def lookup(self, channel: int, samples):
+        """Return the segment ID holding `samples` on the channel, or None (no instrument I/O)."""
+        entry = self.entries.get((channel, waveform_digest(quantize_to_dac(samples))))
+        return entry["SegmentID"] if entry is not None else None
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: {"Entries": ..., "Samples": ..., "Hits": ..., "Misses": ..., "HitRate": ...}
+        """
+        lookups = self.hits + self.misses
+        return {
+            "Entries": len(self.entries),
+            "Samples": sum(entry["Length"] for entry in self.entries.values()),
+            "Hits": self.hits,
+            "Misses": self.misses,
+            "HitRate": self.hits / lookups if lookups else None
+        }
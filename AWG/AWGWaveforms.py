@@ -0,0 +1,422 @@
+#import awg modules
+from AWGTraceSubsystem import SEGMENT_GRANULARITY
+
+#import other modules
+import numpy as np
+
+#Samples generated per pass; the work buffers hold this many samples each
+SYNTH_CHUNK_SAMPLES = 1024 * 1024
+
+#PRBS generator polynomials x^degree + x^tap + 1 (ITU-T O.150 patterns)
+PRBS_TAPS = {7: (7, 6), 9: (9, 5), 11: (11, 9), 15: (15, 14), 20: (20, 3), 23: (23, 18), 31: (31, 28)}
+
+QAM_ORDERS = (4, 16, 64, 256)
+
+TWO_PI = 2 * np.pi
+
+
+class AWG_waveform_synthesizer:
+    """
+    Renders waveform generators into M8195A int8 DAC codes.
+
+    A generator is a callable generate(synth, start, out) that fills the float32 array
+    `out` with the samples from index `start` on, normalized to -1.0..1.0. The factory
+    functions of this module (sine, multitone, chirp, prbs, pulse_train, iq_upconvert,
+    iq_component) return such generators.
+
+    Waveforms are produced a chunk at a time into preallocated work buffers and quantized
+    in place, so memory use stays at a few chunk sizes no matter how long the waveform is.
+    Phases are accumulated in float64 and reduced to one cycle before the float32 trig,
+    which keeps them exact over multi-GSa waveforms while the output stays well below
+    one DAC code of error. Lengths are padded to the segment granularity.
+    """
+
+    def __init__(self, sample_rate: float, chunk_samples: int = SYNTH_CHUNK_SAMPLES,
+                 granularity: int = SEGMENT_GRANULARITY):
+        if chunk_samples <= 0:
+            raise ValueError("chunk_samples must be positive")
+        self.sample_rate = float(sample_rate)
+        self.chunk_samples = chunk_samples
+        self.granularity = granularity
+
+        # Work buffers shared by all generators; generators only use slices of them
+        self.ramp = np.arange(chunk_samples, dtype=np.float64)
+        self.index = np.arange(chunk_samples, dtype=np.int64)
+        self.index_scratch = np.empty(chunk_samples, dtype=np.int64)
+        self.scratch = np.empty(chunk_samples, dtype=np.float64)
+        self.scratch2 = np.empty(chunk_samples, dtype=np.float64)
+        self.scratch32 = np.empty(chunk_samples, dtype=np.float32)
+        self._quotient = np.empty(chunk_samples, dtype=np.float64)
+        self.work = np.empty(chunk_samples, dtype=np.float32)
+
+    def padded_length(self, length: int) -> int:
+        """Smallest multiple of the segment granularity that holds `length` samples."""
+        return -(-length // self.granularity) * self.granularity
+
+    def coherent_frequency(self, frequency: float, length: int) -> float:
+        """Nearest frequency with a whole number of cycles in `length` samples, so a looped segment has no phase jump."""
+        cycles = max(round(frequency * length / self.sample_rate), 1)
+        return cycles * self.sample_rate / length
+
+    def _quantize(self, work: np.ndarray, out: np.ndarray, amplitude: float):
+        np.multiply(work, 127.0 * amplitude, out=work)
+        np.rint(work, out=work)
+        np.clip(work, -128, 127, out=work)
+        np.copyto(out, work, casting="unsafe")
+
+    def render(self, generator, length: int, out: np.ndarray = None, amplitude: float = 1.0,
+               pad_value: int = 0) -> np.ndarray:
+        """
+        Generate `length` samples as int8 DAC codes.
+
+        Args:
+            generator (callable): generate(synth, start, out), e.g. sine(1e9)
+            length (int): Number of samples to generate
+            out (np.ndarray, optional): Preallocated int8 buffer of at least the padded length;
+                it is filled in place and a view of it is returned
+            amplitude (float): Scale applied before quantization (1.0 = full scale)
+            pad_value (int): DAC code for the granularity padding after the waveform
+
+        Returns:
+            np.ndarray: int8 DAC codes, padded to a multiple of the segment granularity
+        """
+        if length <= 0:
+            raise ValueError("length must be positive")
+        padded = self.padded_length(length)
+        if out is None:
+            out = np.empty(padded, dtype=np.int8)
+        elif out.dtype != np.int8 or len(out) < padded:
+            raise ValueError(f"out must be an int8 array of at least {padded} samples")
+        out = out[:padded]
+
+        for start in range(0, length, self.chunk_samples):
+            count = min(self.chunk_samples, length - start)
+            work = self.work[:count]
+            generator(self, start, work)
+            self._quantize(work, out[start:start + count], amplitude)
+        out[length:] = pad_value
+        return out
+
+    def chunks(self, generator, length: int, amplitude: float = 1.0, pad_value: int = 0):
+        """
+        Yield the DAC codes of a waveform chunk by chunk, e.g. for AWG_stream_uploader.upload().
+
+        The chunks are views of one reused buffer: consume (or copy) each chunk before
+        requesting the next one. The last chunk includes the granularity padding.
+        """
+        if length <= 0:
+            raise ValueError("length must be positive")
+        padded = self.padded_length(length)
+        buffer = np.empty(self.chunk_samples + self.granularity, dtype=np.int8)
+
+        for start in range(0, length, self.chunk_samples):
+            count = min(self.chunk_samples, length - start)
+            work = self.work[:count]
+            generator(self, start, work)
+            self._quantize(work, buffer[:count], amplitude)
+            if start + count == length:
+                buffer[count:count + padded - length] = pad_value
+                count += padded - length
+            yield buffer[:count]
+
+    def _phase(self, start: int, count: int, frequency: float, phase: float, out: np.ndarray):
+        """Fill the float64 array `out` with the phase of a tone in cycles, reduced to 0..1."""
+        cycles = frequency / self.sample_rate
+        np.multiply(self.ramp[:count], cycles, out=out)
+        out += (start * cycles + phase / TWO_PI) % 1.0
+        self._mod(out, 1.0)
+
+    def _mod(self, values: np.ndarray, period: float):
+        """values %= period in place (floor and subtract; several times faster than np.mod on floats)."""
+        quotient = self._quotient[:len(values)]
+        np.multiply(values, 1.0 / period, out=quotient)
+        np.floor(quotient, out=quotient)
+        quotient *= period
+        values -= quotient
+
+    @staticmethod
+    def _sin(cycles: np.ndarray, out: np.ndarray, function=np.sin):
+        """out = sin(2 pi cycles), evaluated in the precision of `out`."""
+        np.multiply(cycles, TWO_PI, out=out)
+        function(out, out=out)
+
+
+# --------------------- GENERATORS ---------------------
+
+def sine(frequency: float, phase: float = 0.0, amplitude: float = 1.0):
+    """Sine wave of `frequency` Hz, starting at `phase` radians."""
+    def generate(synth, start, out):
+        scratch = synth.scratch[:len(out)]
+        synth._phase(start, len(out), frequency, phase, scratch)
+        synth._sin(scratch, out)
+        if amplitude != 1.0:
+            out *= amplitude
+    return generate
+
+
+def multitone(frequencies, amplitudes=None, phases=None):
+    """
+    Sum of sine tones.
+
+    Args:
+        frequencies (list[float]): Tone frequencies in Hz
+        amplitudes (list[float], optional): Tone amplitudes; 1/N each by default, which can never clip
+        phases (list[float], optional): Tone phases in radians; Newman phases (pi * k^2 / N) by default,
+            which keep the crest factor low when larger amplitudes are used
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    count = len(frequencies)
+    amplitudes = np.full(count, 1.0 / count) if amplitudes is None else np.asarray(amplitudes, dtype=np.float64)
+    phases = np.pi * np.arange(count) ** 2 / count if phases is None else np.asarray(phases, dtype=np.float64)
+
+    def generate(synth, start, out):
+        out[:] = 0.0
+        scratch = synth.scratch[:len(out)]
+        tone = synth.scratch32[:len(out)]
+        for frequency, amplitude, phase in zip(frequencies, amplitudes, phases):
+            synth._phase(start, len(out), frequency, phase, scratch)
+            synth._sin(scratch, tone)
+            tone *= amplitude
+            out += tone
+    return generate
+
+
+def chirp(start_frequency: float, stop_frequency: float, duration: float, phase: float = 0.0):
+    """
+    Linear frequency sweep from `start_frequency` to `stop_frequency` over `duration` seconds, repeated.
+
+    The sweep restarts every duration * sample_rate samples; choose the frequencies so the
+    sweep ends on a whole cycle if the repetitions must be phase-continuous.
+    """
+    def generate(synth, start, out):
+        period = round(duration * synth.sample_rate)
+        if period <= 0:
+            raise ValueError("duration is shorter than one sample")
+        linear = start_frequency / synth.sample_rate
+        quadratic = (stop_frequency - start_frequency) / synth.sample_rate / (2 * period)
+        scratch = synth.scratch[:len(out)]
+        position = synth.scratch2[:len(out)]
+
+        # Sample index within the sweep, then phase in cycles: linear * n + quadratic * n^2
+        np.add(synth.ramp[:len(out)], start, out=position)
+        synth._mod(position, period)
+        np.multiply(position, quadratic, out=scratch)
+        scratch += linear
+        scratch *= position
+        scratch += phase / TWO_PI
+        synth._mod(scratch, 1.0)
+        synth._sin(scratch, out)
+    return generate
+
+
+def prbs_bits(order: int, length: int) -> np.ndarray:
+    """
+    The first `length` bits of a PRBS pattern (all-ones seed) as a uint8 array.
+
+    Uses the recurrence b[n] = b[n - degree] ^ b[n - tap] and, since p(x)^2 = p(x^2) over
+    GF(2), its decimated forms b[n] = b[n - degree * 2^k] ^ b[n - tap * 2^k]; each pass
+    therefore computes a block that grows with the part already generated, so a pattern
+    of N bits takes O(log N) vectorized XORs instead of N register shifts.
+    """
+    if order not in PRBS_TAPS:
+        raise ValueError(f"Invalid PRBS order {order}. Must be one of {tuple(PRBS_TAPS)}")
+    degree, tap = PRBS_TAPS[order]
+    bits = np.empty(max(length, degree), dtype=np.uint8)
+    bits[:degree] = 1
+
+    position = degree
+    scale = 1
+    while position < length:
+        while 2 * scale * degree <= position:
+            scale *= 2
+        count = min(tap * scale, length - position)
+        first = position - degree * scale
+        second = position - tap * scale
+        np.bitwise_xor(bits[first:first + count], bits[second:second + count], out=bits[position:position + count])
+        position += count
+    return bits[:length]
+
+
+def prbs(order: int, symbol_rate: float, low: float = -1.0, high: float = 1.0):
+    """
+    NRZ PRBS pattern at `symbol_rate` symbols/s (need not divide the sample rate).
+
+    The pattern repeats with its period of 2^order - 1 bits; bits are generated on demand,
+    so only the part of a long pattern that the waveform uses is held in memory.
+    """
+    if order not in PRBS_TAPS:
+        raise ValueError(f"Invalid PRBS order {order}. Must be one of {tuple(PRBS_TAPS)}")
+    period = 2 ** order - 1
+    cache = {"levels": np.empty(0)}
+
+    def levels(count):
+        if len(cache["levels"]) < count:
+            size = min(max(count, 2 * len(cache["levels"])), period)
+            cache["levels"] = (low + (high - low) * prbs_bits(order, size)).astype(np.float32)
+        return cache["levels"]
+
+    def generate(synth, start, out):
+        count = len(out)
+        index = synth.index_scratch[:count]
+        symbol = synth.scratch[:count]
+        np.add(synth.ramp[:count], start, out=symbol)
+        symbol *= symbol_rate / synth.sample_rate
+        np.floor(symbol, out=symbol)
+        np.copyto(index, symbol, casting="unsafe")
+        np.mod(index, period, out=index)
+        np.take(levels(int(index.max()) + 1), index, out=out)
+    return generate
+
+
+def pulse_train(period: float, width: float, transition: float = 0.0, delay: float = 0.0,
+                low: float = -1.0, high: float = 1.0):
+    """
+    Periodic pulses with linear edges.
+
+    Args:
+        period (float): Pulse repetition period in seconds
+        width (float): Time at the high level (from the end of the rising edge) in seconds
+        transition (float): Rise and fall time in seconds (0 for ideal edges)
+        delay (float): Start of the first rising edge in seconds
+        low (float): Low level (-1.0..1.0)
+        high (float): High level (-1.0..1.0)
+    """
+    def generate(synth, start, out):
+        count = len(out)
+        period_samples = period * synth.sample_rate
+        width_samples = width * synth.sample_rate
+        transition_samples = transition * synth.sample_rate
+
+        # Position within the period (float64), then the level 0..1
+        position = synth.scratch[:count]
+        np.add(synth.ramp[:count], start - delay * synth.sample_rate, out=position)
+        synth._mod(position, period_samples)
+        if transition_samples > 0:
+            falling = synth.scratch2[:count]
+            np.subtract(width_samples + 2 * transition_samples, position, out=falling)
+            np.minimum(position, falling, out=position)
+            position /= transition_samples
+            np.clip(position, 0.0, 1.0, out=out)
+        else:
+            np.less(position, width_samples, out=out)
+        out *= high - low
+        out += low
+    return generate
+
+
+# --------------------- IQ ---------------------
+
+def qam_symbols(order: int, count: int, seed=None) -> np.ndarray:
+    """Random square M-QAM symbols with unit average power."""
+    if order not in QAM_ORDERS:
+        raise ValueError(f"Invalid QAM order {order}. Must be one of {QAM_ORDERS}")
+    side = int(np.sqrt(order))
+    rng = np.random.default_rng(seed)
+    levels = 2 * np.arange(side) - (side - 1)
+    symbols = levels[rng.integers(0, side, count)] + 1j * levels[rng.integers(0, side, count)]
+    return symbols / np.sqrt(2 * (order - 1) / 3)
+
+
+def _normalize_peak(baseband: np.ndarray) -> np.ndarray:
+    peak = np.abs(baseband).max()
+    if peak > 0:
+        baseband /= peak
+    return baseband
+
+
+def qam_baseband(order: int, symbols: int, samples_per_symbol: int, rolloff: float = 0.35,
+                 seed=None) -> np.ndarray:
+    """
+    Root-raised-cosine shaped M-QAM baseband, scaled to a peak magnitude of 1.
+
+    The pulse shaping is applied as a circular (FFT) filter, so the waveform repeats
+    seamlessly when the segment loops.
+
+    Returns:
+        np.ndarray: complex128 baseband of symbols * samples_per_symbol samples
+    """
+    length = symbols * samples_per_symbol
+    impulses = np.zeros(length, dtype=np.complex128)
+    impulses[::samples_per_symbol] = qam_symbols(order, symbols, seed)
+
+    # Root raised cosine response; frequencies in units of the symbol rate
+    frequency = np.abs(np.fft.fftfreq(length, d=1.0 / samples_per_symbol))
+    response = np.zeros(length)
+    response[frequency <= (1 - rolloff) / 2] = 1.0
+    edge = (frequency > (1 - rolloff) / 2) & (frequency <= (1 + rolloff) / 2)
+    if rolloff > 0:
+        response[edge] = np.sqrt(0.5 * (1 + np.cos(np.pi / rolloff * (frequency[edge] - (1 - rolloff) / 2))))
+    return _normalize_peak(np.fft.ifft(np.fft.fft(impulses) * response))
+
+
+def ofdm_baseband(subcarriers: int = 64, symbols: int = 16, order: int = 16, cyclic_prefix: int = 16,
+                  oversampling: int = 4, used: int = None, seed=None) -> np.ndarray:
+    """
+    OFDM baseband with QAM-modulated subcarriers, scaled to a peak magnitude of 1.
+
+    Args:
+        subcarriers (int): FFT size
+        symbols (int): Number of OFDM symbols
+        order (int): QAM order of every used subcarrier
+        cyclic_prefix (int): Cyclic prefix length in FFT samples
+        oversampling (int): Samples per FFT sample (zero padding in frequency)
+        used (int, optional): Number of used subcarriers, centered around an unused DC bin;
+            3/4 of the FFT size by default
+        seed (optional): Seed of the random symbol data
+
+    Returns:
+        np.ndarray: complex128 baseband of symbols * (subcarriers + cyclic_prefix) * oversampling samples
+    """
+    used = used if used is not None else (3 * subcarriers // 4) // 2 * 2
+    if used > subcarriers - 1:
+        raise ValueError("used must leave the DC subcarrier free")
+    size = subcarriers * oversampling
+    bins = np.r_[np.arange(1, used // 2 + 1), np.arange(size - used // 2, size)]
+
+    spectrum = np.zeros((symbols, size), dtype=np.complex128)
+    spectrum[:, bins] = qam_symbols(order, symbols * len(bins), seed).reshape(symbols, len(bins))
+    time_domain = np.fft.ifft(spectrum, axis=1)
+    prefix = cyclic_prefix * oversampling
+    frames = np.concatenate([time_domain[:, size - prefix:], time_domain], axis=1) if prefix else time_domain
+    return _normalize_peak(frames.ravel())
+
+
+def iq_upconvert(baseband: np.ndarray, carrier_frequency: float, phase: float = 0.0):
+    """
+    Real signal I*cos(wt) - Q*sin(wt) carrying a complex baseband (at the DAC sample rate) on a carrier.
+
+    The baseband repeats with its own length; it is assumed to have a peak magnitude of at most 1.
+    """
+    in_phase = np.ascontiguousarray(baseband.real, dtype=np.float32)
+    quadrature = np.ascontiguousarray(baseband.imag, dtype=np.float32)
+
+    def generate(synth, start, out):
+        count = len(out)
+        index = synth.index_scratch[:count]
+        carrier = synth.scratch[:count]
+        oscillator = synth.scratch32[:count]
+        np.add(synth.index[:count], start, out=index)
+        np.mod(index, len(in_phase), out=index)
+        synth._phase(start, count, carrier_frequency, phase, carrier)
+
+        synth._sin(carrier, oscillator, np.cos)
+        np.take(in_phase, index, out=out)
+        out *= oscillator
+        synth._sin(carrier, oscillator)
+        oscillator *= quadrature.take(index)
+        out -= oscillator
+    return generate
+
+
+def iq_component(baseband: np.ndarray, component: str = "I"):
+    """The I or Q part of a complex baseband, e.g. to drive an external IQ modulator from two channels."""
+    if component.upper() not in ("I", "Q"):
+        raise ValueError("component must be 'I' or 'Q'")
+    values = np.ascontiguousarray(baseband.real if component.upper() == "I" else baseband.imag, dtype=np.float32)
+
+    def generate(synth, start, out):
+        index = synth.index_scratch[:len(out)]
+        np.add(synth.index[:len(out)], start, out=index)
+        np.mod(index, len(values), out=index)
+        np.take(values, index, out=out)
+    return generate
@@ -0,0 +1,61 @@
+#IEEE 488.2 definite-length block helpers shared by the bulk data paths
+
+
+def ieee_block_header(num_bytes: int) -> bytes:
+    """
+    Build the '#<n><len>' header of a definite-length block.
+
+    Args:
+        num_bytes (int): Number of payload bytes that follow the header
+
+    Returns:
+        bytes: Block header, e.g. b'#41024' for 1024 bytes
+    """
+    len_str = str(num_bytes)
+    return f"#{len(len_str)}{len_str}".encode()
+
+
+def parse_ieee_block(raw) -> memoryview:
+    """
+    Return the payload of a definite-length block without copying it.
+
+    Args:
+        raw (bytes | bytearray | memoryview): Raw response starting with '#'
+
+    Returns:
+        memoryview: View over the payload bytes of `raw`
+    """
+    view = memoryview(raw)
+    if view[0:1] != b"#":
+        raise ValueError("Unexpected response format (missing IEEE block header)")
+
+    header_len = int(bytes(view[1:2]))
+    num_bytes = int(bytes(view[2:2 + header_len]))
+    data_start = 2 + header_len
+    return view[data_start:data_start + num_bytes]
+
+
+def ieee_block_message(command: str, payload, termination: str = "\n") -> bytearray:
+    """
+    Build a complete program message '<command>#<n><len><payload><termination>' for write_raw().
+
+    The message is assembled in one preallocated buffer, so the payload is copied once.
+    The terminator is always appended: raw socket transports have no END signal, so
+    without it the instrument would not execute the block until the next message.
+
+    Args:
+        command (str): Command header and leading arguments, e.g. ':TRAC1:DATA 1,0,'
+        payload (bytes-like): Block payload (bytes, memoryview or contiguous numpy array)
+        termination (str): Program message terminator (the resource's write_termination)
+
+    Returns:
+        bytearray: The message
+    """
+    data = memoryview(payload).cast("B")
+    prefix = command.encode() + ieee_block_header(data.nbytes)
+    suffix = termination.encode()
+    message = bytearray(len(prefix) + data.nbytes + len(suffix))
+    message[:len(prefix)] = prefix
+    message[len(prefix):len(prefix) + data.nbytes] = data
+    message[len(prefix) + data.nbytes:] = suffix
+    return message
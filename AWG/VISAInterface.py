@@ -1,6 +1,15 @@
 import pyvisa
 
 class pyvisa_interface:
+    # One ResourceManager per process, shared by every instrument session
+    _shared_rm = None
+
     def __init__(self):
-        self.rm = pyvisa.ResourceManager()
-        self.resource = None
\ No newline at end of file
+        self.resource = None
+
+    @property
+    def rm(self):
+        # Created on first use, so the pure-socket transport works without a VISA library
+        if pyvisa_interface._shared_rm is None:
+            pyvisa_interface._shared_rm = pyvisa.ResourceManager()
+        return pyvisa_interface._shared_rm
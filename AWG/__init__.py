@@ -2,11 +2,18 @@
 
 # Main interface
 from .AWGController import AWG_Controller
+from .AWGAsyncController import AsyncAWG_Controller
+from .AWGFleet import AWG_Fleet
+from .AWGMultiModule import AWG_multi_module_sequencer
 
 # Internal subsystem modules (optional to expose individually)
 from .AWGConnection import AWG_connection
+from .AWGSession import AWG_session
 from .AWGCommonCommands import AWG_common_commands
 from .AWGStaus import AWG_system_status
+from .AWGStatusMonitor import AWG_status_monitor, AWG_status_transitions
+from .AWGStatusRegisters import (StatusByte, QuestionableStatus, OperationStatus, VoltageStatus, FrequencyStatus,
+                                 SequenceStatus, DUCStatus, ConnectionStatus, RunStatus)
 from .AWGARMTRIGger import AWG_ARM_TRIGger_Controller
 from .AWGTriggerInput import AWG_Trigger_input
 from .AWGInstrument import AWG_instrument
@@ -22,6 +29,13 @@ from .AWGCarrier import AWG_carrier
 from .AWGStableSubsyatem import AWG_stable_system
 from .AWGTestSubsystem import AWG_test
 from .AWGTraceSubsystem import AWG_trace_system
+from .AWGStreamUploader import AWG_stream_uploader
+from .AWGTrace import AWG_trace, read_trace
+from .AWGSimulator import AWG_simulated_instrument, AWG_simulator_server
+from .AWGSequenceTable import AWG_sequence_table, AWG_sequence_shadow
+from .AWGSegmentAllocator import AWG_segment_allocator
+from .AWGWaveformCache import AWG_waveform_cache
+from .AWGWaveforms import AWG_waveform_synthesizer
 
-# Limit public API to just the controller
-__all__ = ["AWG_Controller"]
+# Limit the star-import API to the controllers; subsystems are imported by name
+__all__ = ["AWG_Controller", "AsyncAWG_Controller", "AWG_Fleet", "AWG_multi_module_sequencer"]
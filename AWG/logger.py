@@ -1,29 +1,75 @@
 import os
 import time
 import datetime
+import atexit
+import queue
+import threading
+from collections import deque
+
+#Default rotation and buffering settings
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_FLUSH_INTERVAL = 0.5  # seconds
+LOG_RING_SIZE = 1000
+
+#Queue marker that stops the writer thread
+_STOP = object()
+
 
 class awg_logger:
-    def __init__(self, device_name = 'AWG'):
+    """
+    SCPI command logger shared by all subsystems of one session.
+
+    _log_command() only formats the line, keeps it in a ring buffer of recent lines (for
+    the GUI) and hands it to a queue. A background writer thread keeps the log file open,
+    writes queued lines in batches and flushes at most every `flush_interval` seconds.
+    The file is rotated when it exceeds `max_bytes` or, if `rotate_interval` is set, when
+    it is older than `rotate_interval` seconds; `backup_count` old files are kept.
+    """
+
+    def __init__(self, device_name = 'AWG', max_bytes: int = LOG_MAX_BYTES, rotate_interval: float = None,
+                 backup_count: int = LOG_BACKUP_COUNT, flush_interval: float = LOG_FLUSH_INTERVAL,
+                 ring_size: int = LOG_RING_SIZE):
         self._log_file_path = None
-    
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+
+        self.recent_lines = deque(maxlen=ring_size)  # most recent log lines, for GUI display
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+
+        # Formatted timestamp of the current second, so datetime formatting runs once per second
+        self._timestamp_second = None
+        self._timestamp = None
+
     #---------------------- INITIALIZE LOG FILE ---------------------
 
     def _initialize_log_file(self, device_name = str):
         #Initialize the log file with time stamp
+        # A running writer holds the previous file open; finish it before switching files
+        self.close()
         now = datetime.datetime.now().strftime("%d%m%Y%H%M")
         file_name = f"{device_name}_{now}.txt" # set the log file name as device IP with date and tiem of file creation.
         self._log_file_path = file_name # set log file path
+        self._device_name = device_name
 
         with open(self._log_file_path, 'w') as f:
             f.write(f"Log file created for {device_name.upper()} at {datetime.datetime.now()} \n")
 
+        self._start_writer()
+
     # Append all log commands
 
     def _log_command(self, command: str, duration_ms: float = None, response: str = None):
 
         """Log SCPI  command with duration and response"""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_line = f"[{timestamp}] SCPI: {command} "
+        second = int(time.time())
+        if second != self._timestamp_second:
+            self._timestamp_second = second
+            self._timestamp = datetime.datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+        log_line = f"[{self._timestamp}] SCPI: {command} "
 
         if duration_ms is not None:
             log_line += f"| Duration : {duration_ms:.2f} ms"
@@ -31,8 +77,100 @@ class awg_logger:
             log_line += f" | Response: {response}"
         log_line += "\n"
 
-        if hasattr(self, '_log_file_path') and self._log_file_path:
-            with open(self._log_file_path, 'a') as f:
-                f.write(log_line)
+        self.recent_lines.append(log_line)
+        if self._log_file_path:
+            self._queue.put(log_line)
+
+        return log_line #For current command display in GUI.
+
+    #---------------------- BUFFER CONTROL ---------------------
+
+    def recent(self, count: int = None) -> list:
+        """Return the last `count` log lines (all buffered lines if count is None)."""
+        lines = list(self.recent_lines)
+        return lines if count is None else lines[-count:]
+
+    def flush(self, timeout: float = 5.0):
+        """Block until every line logged so far is written to the log file."""
+        if self._writer is None or not self._writer.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        """Write all pending lines, close the log file and stop the writer thread."""
+        if self._writer is None:
+            return
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._writer = None
+        atexit.unregister(self.close)
+
+    #---------------------- BACKGROUND WRITER ---------------------
+
+    def _start_writer(self):
+        # The exit hook is registered once per running writer and removed by close()
+        if self._writer is not None and self._writer.is_alive():
+            return
+        self._writer = threading.Thread(target=self._write_loop, name=f"awg-log-{self._device_name}", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _write_loop(self):
+        file = open(self._log_file_path, 'a')
+        opened_at = time.monotonic()
+        last_flush = opened_at
+        running = True
+
+        while running:
+            try:
+                items = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                items = []
+            # Drain everything already queued into the same batch
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            events = []
+            for item in items:
+                if item is _STOP:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    file.write(item)
+
+            now = time.monotonic()
+            if events or not running or now - last_flush >= self.flush_interval:
+                file.flush()
+                last_flush = now
+            for event in events:
+                event.set()
+
+            if running and self._rotation_due(file, opened_at, now):
+                file.close()
+                self._rotate()
+                file = open(self._log_file_path, 'a')
+                opened_at = now
+
+        file.close()
+
+    def _rotation_due(self, file, opened_at: float, now: float) -> bool:
+        if self.max_bytes and file.tell() >= self.max_bytes:
+            return True
+        return bool(self.rotate_interval) and now - opened_at >= self.rotate_interval
 
-        return log_line #For current command display in GUI
\ No newline at end of file
+    def _rotate(self):
+        """Shift log.txt -> log.txt.1 -> ... -> log.txt.<backup_count>, dropping the oldest."""
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self._log_file_path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self._log_file_path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self._log_file_path, f"{self._log_file_path}.1")
+        else:
+            os.remove(self._log_file_path)
@@ -0,0 +1,259 @@
+"""
+Throughput benchmarks for the bulk data paths.
+
+Usage:
+    python benchmarks/bulk_benchmark.py --target sim --output results.json
+    python benchmarks/bulk_benchmark.py --target socket-sim --max-size 1e8
+    python benchmarks/bulk_benchmark.py --target 192.168.1.100 --transport hislip --cases write_waveform_data_binary
+
+Targets: "sim" (in-process simulator; its CPU time and memory count towards the results),
+"socket-sim" (simulator served over a raw socket from a separate process) or the IP
+address of a real unit. Every case runs in a fresh worker process, so "PeakRSS(MB)" is the
+peak resident memory of that case alone; "SetupRSS(MB)" is the peak before the timed call
+(test data, simulator memory) and "RunRSS(MB)" what the timed call added on top. Results are written as JSON with MSa/s (or
+million entries/s for the sequence table), wall time and CPU time per case and size.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AWG"))
+
+from AWGController import AWG_Controller  # noqa: E402
+from AWGSimulator import AWG_simulated_instrument, AWG_simulator_server, get_simulated_instrument  # noqa: E402
+
+DEFAULT_SIZES = [10 ** exponent for exponent in range(3, 10)]  # 1 kSa .. 1 GSa
+
+#Largest transfer per read query; bigger reads are split into several queries
+READ_CHUNK_SAMPLES = 16 * 1024 * 1024
+ASCII_READ_CHUNK_SAMPLES = 1024 * 1024
+
+SEGMENT_ID = 1
+FILE_PATH = "C:\\bulk_benchmark.bin"
+
+
+def _codes(size: int) -> np.ndarray:
+    # Built as int8 directly: an int64 arange would need 8x the memory at GSa sizes
+    return np.resize(np.arange(-128, 128, dtype=np.int8), size)
+
+
+def _prepare_segment(awg: AWG_Controller, size: int, fill: bool = False):
+    awg.TraceSubsyatem.delete_waveform_segment(1, SEGMENT_ID)
+    awg.session.query(":SYST:ERR?")  # the segment may not have existed
+    result = awg.TraceSubsyatem.define_waveform_segment(1, SEGMENT_ID, size)
+    if "Error" in result:
+        raise RuntimeError(result["Error"])
+    if fill:
+        awg.TraceSubsyatem.write_waveform_data_binary(1, SEGMENT_ID, 0, _codes(size))
+
+
+def _check(result: dict):
+    if "Error" in result:
+        raise RuntimeError(result["Error"])
+
+
+# --------------------- CASES ---------------------
+# Each case gets (controller, size), does its untimed setup, and returns a callable to time.
+
+def write_waveform_data_ascii(awg, size):
+    _prepare_segment(awg, size)
+    samples = _codes(size).tolist()
+    return lambda: _check(awg.TraceSubsyatem.write_waveform_data(1, SEGMENT_ID, 0, samples))
+
+
+def write_waveform_data_binary(awg, size):
+    _prepare_segment(awg, size)
+    codes = _codes(size)
+    return lambda: _check(awg.TraceSubsyatem.write_waveform_data_binary(1, SEGMENT_ID, 0, codes))
+
+
+def read_waveform_data_ascii(awg, size):
+    _prepare_segment(awg, size, fill=True)
+
+    def run():
+        for offset in range(0, size, ASCII_READ_CHUNK_SAMPLES):
+            length = min(ASCII_READ_CHUNK_SAMPLES, size - offset)
+            _check(awg.TraceSubsyatem.read_waveform_data(1, SEGMENT_ID, offset, length))
+    return run
+
+
+def read_waveform_data_binary(awg, size):
+    _prepare_segment(awg, size, fill=True)
+
+    def run():
+        for offset in range(0, size, READ_CHUNK_SAMPLES):
+            length = min(READ_CHUNK_SAMPLES, size - offset)
+            _check(awg.TraceSubsyatem.read_waveform_data_binary(1, SEGMENT_ID, offset, length, output="array"))
+    return run
+
+
+def write_file_data(awg, size):
+    data = _codes(size).tobytes()
+    return lambda: _check(awg.memmory.write_file_data(FILE_PATH, data))
+
+
+def read_file_data(awg, size):
+    _check(awg.memmory.write_file_data(FILE_PATH, _codes(size).tobytes()))
+    return lambda: _check(awg.memmory.read_file_data(FILE_PATH))
+
+
+def write_sequence_table_entry(awg, size):
+    entries = [[0x80000000 if i == 0 else 0, 1, 1, SEGMENT_ID, 0, 0xFFFFFFFF] for i in range(size)]
+
+    def run():
+        for index, entry in enumerate(entries):
+            _check(awg.Stable.write_sequence_table_entry(index, entry))
+    return run
+
+
+def write_sequence_table_block(awg, size):
+    entries = np.zeros((size, 6), dtype=np.uint32)
+    entries[:, 1:3] = 1
+    entries[:, 3] = SEGMENT_ID
+    entries[:, 5] = 0xFFFFFFFF
+    entries[0, 0] = 0x80000000
+    return lambda: _check(awg.Stable.write_sequence_table_block(0, entries))
+
+
+#case name -> (function, unit of "size", name of the size limit option)
+CASES = {
+    "write_waveform_data_ascii": (write_waveform_data_ascii, "samples", "ascii_max"),
+    "write_waveform_data_binary": (write_waveform_data_binary, "samples", None),
+    "read_waveform_data_ascii": (read_waveform_data_ascii, "samples", "ascii_max"),
+    "read_waveform_data_binary": (read_waveform_data_binary, "samples", None),
+    "write_file_data": (write_file_data, "bytes", None),
+    "read_file_data": (read_file_data, "bytes", None),
+    "write_sequence_table_entry": (write_sequence_table_entry, "entries", "sequence_max"),
+    "write_sequence_table_block": (write_sequence_table_block, "entries", "sequence_table_max"),
+}
+
+
+# --------------------- RUNNER ---------------------
+
+def _controller(options: dict) -> AWG_Controller:
+    if options["target"] == "sim":
+        get_simulated_instrument("sim", latency=options["latency"], bandwidth=options["bandwidth"])
+        awg = AWG_Controller("sim", transport="sim", verification_policy="never")
+    elif options["target"] == "socket-sim":
+        awg = AWG_Controller("127.0.0.1", transport="socket", port=options["port"], verification_policy="never")
+    else:
+        awg = AWG_Controller(options["target"], transport=options["transport"], verification_policy="never")
+    result = awg.connection.connect()
+    if "Error" in result:
+        raise RuntimeError(result["Error"])
+    return awg
+
+
+def run_case(name: str, size: int, options: dict) -> dict:
+    """Run one case at one size (in a worker process) and return its measurements."""
+    function, unit, _ = CASES[name]
+    record = {"Case": name, "Size": size, "Unit": unit}
+    try:
+        awg = _controller(options)
+        run = function(awg, size)
+        # ru_maxrss is a high-water mark, so the setup (test data, simulator memory) is measured first
+        setup_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        record["SetupRSS(MB)"] = setup_rss
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        run()
+        awg.session.query("*OPC?")
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        errors = awg.session.query(":SYST:ERR?").strip()
+        awg.connection.disconnect()
+        record.update({
+            "Wall(s)": wall,
+            "CPU(s)": cpu,
+            "Throughput(MSa/s)": size / wall / 1e6,
+            "InstrumentError": None if errors.startswith("0") else errors,
+        })
+    except Exception as e:
+        record["Error"] = str(e)
+    record["PeakRSS(MB)"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if "SetupRSS(MB)" in record:
+        record["RunRSS(MB)"] = record["PeakRSS(MB)"] - record["SetupRSS(MB)"]
+    return record
+
+
+def _serve_simulator(port_queue, latency: float, bandwidth: float):
+    server = AWG_simulator_server(AWG_simulated_instrument(latency=latency, bandwidth=bandwidth), port=0).start()
+    port_queue.put(server.port)
+    while True:
+        time.sleep(3600)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="sim", help='"sim", "socket-sim" or the IP address of an AWG')
+    parser.add_argument("--transport", default="vxi11", help="Transport for a real unit")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=float, default=DEFAULT_SIZES)
+    parser.add_argument("--max-size", type=float, default=1e9)
+    parser.add_argument("--ascii-max", type=float, default=1e7, help="Largest size for the ASCII cases")
+    parser.add_argument("--sequence-max", type=float, default=1e5, help="Largest number of sequence table entries")
+    parser.add_argument("--sequence-table-max", type=float, default=16777215,
+                        help="Largest block upload to the sequence table (its size by default)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulator latency per command (s)")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Simulator bandwidth (bytes/s)")
+    parser.add_argument("--output", help="JSON file for the results (printed if omitted)")
+    args = parser.parse_args(argv)
+
+    options = {"target": args.target, "transport": args.transport, "latency": args.latency,
+               "bandwidth": args.bandwidth, "port": None}
+    limits = {"ascii_max": args.ascii_max, "sequence_max": args.sequence_max,
+              "sequence_table_max": args.sequence_table_max}
+
+    server = None
+    if args.target == "socket-sim":
+        port_queue = multiprocessing.Queue()
+        server = multiprocessing.Process(target=_serve_simulator, args=(port_queue, args.latency, args.bandwidth),
+                                         daemon=True)
+        server.start()
+        options["port"] = port_queue.get(timeout=30)
+
+    results = []
+    sizes = sorted(int(size) for size in args.sizes if size <= args.max_size)
+    try:
+        for name in args.cases:
+            limit = CASES[name][2]
+            for size in sizes:
+                if limit is not None and size > limits[limit]:
+                    results.append({"Case": name, "Size": size, "Skipped": f"above --{limit.replace('_', '-')}"})
+                    continue
+                # A fresh process per measurement keeps peak RSS and caches independent
+                with multiprocessing.Pool(processes=1, maxtasksperchild=1) as pool:
+                    record = pool.apply(run_case, (name, size, options))
+                print(f"{name:28s} {size:>12d} {record.get('Throughput(MSa/s)', 0) or 0:10.2f} MSa/s "
+                      f"{record.get('Error', '')}", file=sys.stderr)
+                results.append(record)
+    finally:
+        if server is not None:
+            server.terminate()
+
+    report = {
+        "Target": args.target,
+        "Transport": "sim" if args.target == "sim" else ("socket" if args.target == "socket-sim" else args.transport),
+        "Timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "Python": platform.python_version(),
+        "NumPy": np.__version__,
+        "Host": platform.node(),
+        "Results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
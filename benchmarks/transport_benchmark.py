@@ -0,0 +1,83 @@
+"""
+Compare SCPI transports on a live AWG: per-command latency and bulk throughput.
+
+Usage:
+    python benchmarks/transport_benchmark.py 192.168.1.100 --transports vxi11 visa-socket socket
+
+For each transport the script connects, times `--queries` round trips of *OPC?
+(median, p99 and max latency) and uploads `--samples` int8 samples to a scratch
+segment with binary :TRAC:DATA blocks. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AWG"))
+
+from AWGTransport import TRANSPORTS  # noqa: E402
+from AWGTraceSubsystem import AWG_trace_system  # noqa: E402
+from AWGSession import AWG_session  # noqa: E402
+
+
+def benchmark_transport(ip_address: str, transport: str, queries: int, samples: int,
+                        channel: int, segment_id: int) -> dict:
+    session = AWG_session(ip_address, transport=transport)
+    connect = session.connection.connect()
+    if "Error" in connect:
+        return {"Transport": transport, "Error": connect["Error"]}
+
+    try:
+        # Per-command latency
+        latencies = []
+        for _ in range(queries):
+            start = time.perf_counter()
+            session.query("*OPC?")
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies = np.array(latencies)
+
+        # Bulk throughput through the binary block path
+        trace = AWG_trace_system(ip_address, session=session)
+        trace.define_waveform_segment(channel, segment_id, samples)
+        data = np.zeros(samples, dtype=np.int8)
+        start = time.perf_counter()
+        upload = trace.write_waveform_data_binary(channel, segment_id, 0, data)
+        session.query("*OPC?")
+        bulk_s = time.perf_counter() - start
+        trace.delete_waveform_segment(channel, segment_id)
+
+        return {
+            "Transport": transport,
+            "Resource": session.connection._resource_string(),
+            "Latency_p50(ms)": float(np.percentile(latencies, 50)),
+            "Latency_p99(ms)": float(np.percentile(latencies, 99)),
+            "Latency_max(ms)": float(latencies.max()),
+            "Bulk_Samples": samples,
+            "Bulk_Throughput(MSa/s)": samples / bulk_s / 1e6,
+            "Bulk_Error": upload.get("Error"),
+        }
+    finally:
+        session.connection.disconnect()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ip_address")
+    parser.add_argument("--transports", nargs="+", default=["vxi11", "socket"], choices=TRANSPORTS)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--samples", type=int, default=16 * 1024 * 1024)
+    parser.add_argument("--channel", type=int, default=1)
+    parser.add_argument("--segment", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    results = [benchmark_transport(args.ip_address, t, args.queries, args.samples, args.channel, args.segment)
+               for t in args.transports]
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
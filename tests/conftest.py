@@ -0,0 +1,52 @@
+import itertools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AWG"))
+
+from AWGController import AWG_Controller  # noqa: E402
+from AWGSimulator import AWG_simulated_instrument, simulated_instruments  # noqa: E402
+
+_addresses = itertools.count(1)
+
+
+@pytest.fixture(autouse=True)
+def log_directory(tmp_path, monkeypatch):
+    # Session logs are written to the working directory on connect()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def address():
+    number = next(_addresses)
+    address = f"10.99.{number // 250}.{number % 250 + 1}"
+    yield address
+    simulated_instruments.pop(address, None)
+
+
+@pytest.fixture
+def sim(address):
+    """A fresh in-process simulated M8195A, registered for transport="sim"."""
+    instrument = AWG_simulated_instrument(memory_samples=16 * 1024 * 1024, sequence_entries=1024 * 1024)
+    simulated_instruments[address] = instrument
+    return instrument
+
+
+@pytest.fixture
+def make_awg(sim, address):
+    """Factory for connected controllers on the simulated instrument."""
+    controllers = []
+
+    def make(**options):
+        awg = AWG_Controller(address, transport="sim", **options)
+        response = awg.connection.connect()
+        assert "Error" not in response, response
+        controllers.append(awg)
+        return awg
+
+    yield make
+    for awg in controllers:
+        awg.connection.disconnect()
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from AWGAsyncController import AsyncAWG_Controller, shared_io_executor
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_controller_built_outside_the_loop(sim, address):
+    awg = AsyncAWG_Controller(address, transport="sim", verification_policy="never")
+
+    async def session():
+        async with awg:
+            await awg.VoltageSubsystem.set_output_offset(1, 0.1)
+            return await awg.VoltageSubsystem.get_output_offset(1)
+
+    assert run(session())["Offset (V)"] == pytest.approx(0.1)
+    # A second event loop gets its own ordering lock
+    assert run(session())["Offset (V)"] == pytest.approx(0.1)
+
+
+def test_calls_to_one_instrument_keep_their_order(sim, address):
+    awg = AsyncAWG_Controller(address, transport="sim")
+    order = []
+
+    def record(index):
+        time.sleep(0.001 * (index % 3))
+        order.append(index)
+
+    async def fire():
+        await asyncio.gather(*(awg._run(record, index) for index in range(30)))
+
+    run(fire())
+    assert order == list(range(30))
+
+
+def test_instruments_share_the_pool_but_not_the_lock(sim, address):
+    first = AsyncAWG_Controller(address, transport="sim")
+    second = AsyncAWG_Controller("10.98.0.9", transport="sim")
+    assert first.io_executor._executor is second.io_executor._executor is shared_io_executor()
+    assert first.io_executor.lock is not second.io_executor.lock
+
+    active = {id(first): 0, id(second): 0}
+    peak = {id(first): 0, id(second): 0}
+    guard = threading.Lock()
+
+    def work(key):
+        with guard:
+            active[key] += 1
+            peak[key] = max(peak[key], active[key])
+        time.sleep(0.05)
+        with guard:
+            active[key] -= 1
+
+    async def fire():
+        start = time.perf_counter()
+        await asyncio.gather(*(awg._run(work, id(awg)) for awg in (first, second) for _ in range(2)))
+        return time.perf_counter() - start
+
+    elapsed = run(fire())
+    # Each instrument runs its calls one at a time, the two instruments in parallel
+    assert peak == {id(first): 1, id(second): 1}
+    assert elapsed < 0.18
+
+
+def test_direct_executor_calls_take_the_instrument_lock(sim, address):
+    awg = AsyncAWG_Controller(address, transport="sim")
+    with awg.io_executor.lock:
+        future = awg.io_executor.submit(lambda: "done")
+        time.sleep(0.02)
+        assert not future.done()
+    assert future.result(1) == "done"
+
+
+def test_async_batch(sim, address):
+    awg = AsyncAWG_Controller(address, transport="sim")
+
+    async def session():
+        async with awg:
+            async with awg.batch() as batch:
+                for channel in (1, 2):
+                    await awg.VoltageSubsystem.set_output_offset(channel, 0.05)
+            return batch.result
+
+    result = run(session())
+    assert result["Messages"] == 1 and result["Errors"] == []
+    assert float(sim.setting("VOLT2:OFFS")) == pytest.approx(0.05)
@@ -0,0 +1,99 @@
+import pytest
+
+from AWGBatch import is_query, split_unquoted
+
+
+def test_batch_sends_one_message(make_awg):
+    awg = make_awg(verification_policy="never")
+    with awg.batch() as batch:
+        for channel in (1, 2, 3):
+            awg.VoltageSubsystem.set_output_offset(channel, 0.1 * channel)
+
+    assert batch.result["Commands"] == 3
+    assert batch.result["Messages"] == 1
+    assert batch.result["Errors"] == []
+    assert float(awg.session.query(":VOLT3:OFFS?")) == pytest.approx(0.3)
+
+
+def test_batch_splits_long_messages(make_awg):
+    awg = make_awg(verification_policy="never")
+    with awg.batch(max_message_bytes=32) as batch:
+        for channel in (1, 2, 3, 4):
+            awg.VoltageSubsystem.set_output_offset(channel, 0.05)
+
+    assert batch.result["Messages"] > 1
+    assert float(awg.session.query(":VOLT4:OFFS?")) == pytest.approx(0.05)
+
+
+def test_batch_reports_rejected_commands(make_awg):
+    awg = make_awg(verification_policy="never")
+    with awg.batch() as batch:
+        awg.VoltageSubsystem.set_output_voltage(1, 2.5)
+
+    assert len(batch.result["Errors"]) == 1
+    assert batch.result["Errors"][0].startswith("-222")
+
+
+def test_aborted_batch_discards_queue_and_client_state(make_awg):
+    awg = make_awg(verification_policy="deferred", state_cache=True)
+    with pytest.raises(RuntimeError):
+        with awg.batch() as batch:
+            awg.arm_trig.set_custom_sample_delay(1, "10")
+            raise RuntimeError("abort")
+
+    assert batch.commands == []
+    assert awg.session._deferred_queries == []
+    assert awg.cache.stats()["Entries"] == 0
+    assert float(awg.session.query(":ARM:SDEL1?")) == 0
+
+
+def test_aborted_batch_drains_errors_of_sent_messages(make_awg):
+    awg = make_awg(verification_policy="never")
+    with pytest.raises(RuntimeError):
+        with awg.batch() as batch:
+            awg.VoltageSubsystem.set_output_voltage(1, 2.5)
+            awg.session.query(":VOLT2?")  # flushes the queue
+            raise RuntimeError("abort")
+
+    assert [error[:4] for error in batch.errors] == ["-222"]
+    assert awg.session.query(":SYST:ERR?").startswith("0")
+
+
+def test_default_policy_defers_read_backs_to_sync(make_awg):
+    awg = make_awg()
+    resource = awg.connection.get_resource()
+    queries = []
+    query = resource.query
+    resource.query = lambda message: queries.append(message) or query(message)
+
+    with awg.batch() as batch:
+        for channel in (1, 2, 3, 4):
+            awg.VoltageSubsystem.set_output_offset(channel, 0.01 * channel)
+
+    assert batch.result["Messages"] == 1
+    assert len(queries) == 1 and queries[0].startswith("*OPC?;:SYST:ERR?;")
+    assert float(batch.result["Verified"][":VOLT4:OFFS?"]) == pytest.approx(0.04)
+    # Outside a batch "always" still reads back right away
+    awg.VoltageSubsystem.set_output_offset(1, 0.2)
+    assert len(queries) == 2
+
+
+def test_quoted_separators_in_batch(make_awg):
+    awg = make_awg()
+    awg.TraceSubsyatem.define_waveform_segment(1, 1, 512)
+    with awg.batch() as batch:
+        awg.TraceSubsyatem.set_segment_name(1, 1, "a;b?c")
+        awg.VoltageSubsystem.set_output_offset(2, "abc")  # rejected: -222,"Data out of range;..."
+        awg.VoltageSubsystem.set_output_offset(1, 0.1)
+
+    assert batch.result["Messages"] == 1
+    assert batch.result["Verified"][":TRAC1:NAME? 1"] == '"a;b?c"'
+    assert float(batch.result["Verified"][":VOLT1:OFFS?"]) == pytest.approx(0.1)
+    assert float(batch.result["Verified"][":VOLT2:OFFS?"]) == 0
+    assert batch.result["Errors"] == ['-222,"Data out of range;could not convert string to float: \'abc\'"']
+
+
+def test_split_unquoted():
+    assert split_unquoted('1;"a;b";\'c;d\'') == ["1", '"a;b"', "'c;d'"]
+    assert split_unquoted('-222,"Data out of range;x"', ",") == ["-222", '"Data out of range;x"']
+    assert is_query(":TRAC1:NAME? 1") and not is_query(':TRAC1:NAME 1,"why?"')
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from AWGSimulator import AWG_simulator_server
+from AWGController import AWG_Controller
+from AWGTraceSubsystem import quantize_to_dac
+from IEEEBlock import ieee_block_header, ieee_block_message, parse_ieee_block
+
+
+def test_block_header():
+    assert ieee_block_header(0) == b"#10"
+    assert ieee_block_header(1024) == b"#41024"
+    assert ieee_block_header(123456789) == b"#9123456789"
+
+
+def test_block_message_is_terminated():
+    codes = np.array([1, -1, 10], dtype=np.int8)
+    assert ieee_block_message(":TRAC1:DATA 1,0,", codes) == b":TRAC1:DATA 1,0,#13\x01\xff\x0a\n"
+    assert ieee_block_message(":MMEM:DATA \"a\",", b"", "\r\n") == b":MMEM:DATA \"a\",#10\r\n"
+
+
+def test_quantize_to_dac():
+    codes = np.arange(-128, 128, dtype=np.int8)
+    assert np.shares_memory(quantize_to_dac(codes), codes)
+    assert quantize_to_dac(np.array([-1.0, -0.5, 0.0, 0.5, 1.0, 2.0])).tolist() == [-127, -64, 0, 64, 127, 127]
+    assert quantize_to_dac(np.array([[1, 2], [3, 4]])).tolist() == [1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        quantize_to_dac(np.array([200]))
+
+
+def test_binary_write_sends_terminated_chunks(make_awg, sim):
+    awg = make_awg()
+    resource = awg.connection.get_resource()
+    messages = []
+    write_raw = resource.write_raw
+    resource.write_raw = lambda message: messages.append(bytes(message)) or write_raw(message)
+
+    codes = (np.arange(3 * 512) % 255 - 127).astype(np.int8)
+    awg.TraceSubsyatem.define_waveform_segment(1, 1, len(codes))
+    response = awg.TraceSubsyatem.write_waveform_data_binary(1, 1, 0, codes, chunk_size=512)
+
+    assert response["Blocks"] == 3
+    assert [message[:message.index(b"#")] for message in messages] == [
+        b":TRAC1:DATA 1,0,", b":TRAC1:DATA 1,512,", b":TRAC1:DATA 1,1024,"]
+    assert all(message.endswith(b"\n") for message in messages)
+    assert np.array_equal(np.asarray(sim.segments[1][1]["data"], dtype=np.int8), codes)
+
+
+def test_binary_write_over_raw_socket(sim):
+    with AWG_simulator_server(sim, port=0) as server:
+        awg = AWG_Controller(server.host, transport="socket", port=server.port)
+        assert "Error" not in awg.connection.connect()
+        try:
+            codes = (np.arange(1024) % 256 - 128).astype(np.int8)  # payload contains '\n' bytes
+            awg.TraceSubsyatem.define_waveform_segment(2, 1, len(codes))
+            awg.TraceSubsyatem.write_waveform_data_binary(2, 1, 0, codes)
+
+            assert awg.session.query(":SYST:ERR?").startswith("0")
+            assert np.array_equal(np.asarray(sim.segments[2][1]["data"], dtype=np.int8), codes)
+        finally:
+            awg.connection.disconnect()
+
+
+def test_parse_block_returns_view():
+    raw = bytearray(b"#14abcd\n")
+    payload = parse_ieee_block(raw)
+
+    assert payload.obj is raw
+    assert bytes(payload) == b"abcd"
+    with pytest.raises(ValueError):
+        parse_ieee_block(b"abcd")
+
+
+@pytest.mark.parametrize("order", ["NORMal", "SWAPped"])
+def test_binary_read_back_is_a_view(make_awg, order):
+    awg = make_awg()
+    codes = (np.arange(512) % 200 - 100).astype(np.int8)
+    awg.TraceSubsyatem.define_waveform_segment(1, 1, len(codes))
+    awg.TraceSubsyatem.write_waveform_data_binary(1, 1, 0, codes)
+    awg.format.set_byte_order(order)
+
+    samples = awg.TraceSubsyatem.read_waveform_data_binary(1, 1, 0, len(codes), output="array")["Samples"]
+    assert not samples.flags.owndata and not samples.flags.writeable
+    assert samples.dtype == np.dtype(">f4" if order == "NORMal" else "<f4")
+    assert np.array_equal(samples, codes)
+
+    view = awg.TraceSubsyatem.read_waveform_data_binary(1, 1, 0, len(codes), output="memoryview")["Samples"]
+    assert isinstance(view, memoryview) and view.nbytes == 4 * len(codes)
+    assert awg.TraceSubsyatem.read_waveform_data_binary(1, 1, 0, 4)["Samples"] == codes[:4].tolist()
@@ -0,0 +1,85 @@
+import threading
+
+import numpy as np
+import pytest
+
+from AWGFleet import AWG_Fleet
+from AWGSimulator import AWG_simulated_instrument, simulated_instruments
+
+ADDRESSES = ["10.96.0.1", "10.96.0.2", "10.96.0.3", "10.96.0.4"]
+
+
+@pytest.fixture
+def fleet():
+    for address in ADDRESSES:
+        simulated_instruments[address] = AWG_simulated_instrument(memory_samples=1024 * 1024)
+    fleet = AWG_Fleet(ADDRESSES, transport="sim")
+    assert fleet.errors(fleet.connect()) == {}
+    yield fleet
+    fleet.close()
+    for address in ADDRESSES:
+        simulated_instruments.pop(address, None)
+
+
+def test_calls_run_in_parallel(fleet):
+    # Every call waits until all instruments are inside it, which only works if they run concurrently
+    barrier = threading.Barrier(len(ADDRESSES), timeout=5)
+    results = fleet.map(lambda awg: barrier.wait() is not None and awg.ip_address)
+
+    assert results == {address: address for address in ADDRESSES}
+    assert list(results) == ADDRESSES
+
+
+def test_one_failure_does_not_stop_the_others(fleet):
+    def set_offset(awg):
+        if awg.ip_address == ADDRESSES[1]:
+            raise RuntimeError("instrument fault")
+        return awg.VoltageSubsystem.set_output_offset(1, 0.1)
+
+    results = fleet.map(set_offset)
+    assert fleet.errors(results) == {ADDRESSES[1]: "instrument fault"}
+    for address in ADDRESSES[:1] + ADDRESSES[2:]:
+        assert "Error" not in results[address]
+        assert simulated_instruments[address].setting(":VOLT1:OFFS") == "0.1"
+
+
+def test_rejected_command_is_reported_per_instrument(fleet):
+    fleet[ADDRESSES[2]].connection.disconnect()
+    results = fleet.set_output_state(1, True)
+
+    assert list(fleet.errors(results)) == [ADDRESSES[2]]
+    for address in ADDRESSES[:2] + ADDRESSES[3:]:
+        assert simulated_instruments[address].setting(":OUTP1") == "ON"
+
+
+def test_map_by_method_path_and_subset(fleet):
+    results = fleet.map("VoltageSubsystem.set_output_offset", 2, 0.2, instruments=ADDRESSES[:2])
+
+    assert list(results) == ADDRESSES[:2]
+    assert simulated_instruments[ADDRESSES[0]].setting(":VOLT2:OFFS") == "0.2"
+    assert simulated_instruments[ADDRESSES[3]].setting(":VOLT2:OFFS") != "0.2"
+
+
+def test_upload_reaches_every_instrument(fleet):
+    codes = (np.arange(1024) % 256 - 128).astype(np.int8)
+    first = fleet.upload(1, codes)
+    second = fleet.upload(1, codes)
+
+    assert fleet.errors(first) == {}
+    assert not any(result["Hit"] for result in first.values())
+    assert all(result["Hit"] for result in second.values())
+    for address in ADDRESSES:
+        segment_id = first[address]["SegmentID"]
+        assert np.array_equal(np.asarray(simulated_instruments[address].segments[1][segment_id]["data"], dtype=np.int8), codes)
+
+
+def test_poll_status(fleet):
+    results = fleet.poll_status()
+
+    assert fleet.errors(results) == {}
+    assert all({"StatusByte", "QuestionableCondition", "OperationCondition"} <= set(result) for result in results.values())
+
+
+def test_duplicate_address_is_rejected():
+    with pytest.raises(ValueError):
+        AWG_Fleet(["10.96.1.1", "10.96.1.1"], transport="sim")
@@ -0,0 +1,30 @@
+import gc
+import weakref
+
+from logger import awg_logger
+
+
+def test_reinitialize_switches_file(log_directory):
+    log = awg_logger()
+    log._initialize_log_file("first")
+    first = log._log_file_path
+    log._log_command(":A")
+    log._initialize_log_file("second")
+    log._log_command(":B")
+    log.close()
+
+    assert ":A" in (log_directory / first).read_text()
+    assert ":B" in (log_directory / log._log_file_path).read_text()
+    assert ":B" not in (log_directory / first).read_text()
+
+
+def test_closed_logger_is_not_kept_alive(log_directory):
+    log = awg_logger()
+    log._initialize_log_file("collect")
+    log._log_command("*IDN?")
+    log.close()
+    reference = weakref.ref(log)
+    del log
+    gc.collect()
+
+    assert reference() is None
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from AWGFleet import AWG_Fleet
+from AWGMultiModule import AWG_multi_module_sequencer
+from AWGSimulator import AWG_simulated_instrument, simulated_instruments
+
+ADDRESSES = ["10.97.0.1", "10.97.0.2", "10.97.0.3"]
+
+
+@pytest.fixture
+def fleet():
+    for address in ADDRESSES:
+        simulated_instruments[address] = AWG_simulated_instrument()
+    fleet = AWG_Fleet(ADDRESSES, transport="sim")
+    fleet.connect()
+    yield fleet
+    fleet.close()
+    for address in ADDRESSES:
+        simulated_instruments.pop(address, None)
+
+
+@pytest.mark.parametrize("strategy", ["loop", "threads"])
+def test_synchronized_start(fleet, strategy):
+    sequencer = AWG_multi_module_sequencer(fleet, strategy=strategy)
+    staged = sequencer.stage(module_delays={ADDRESSES[1]: 1e-9})
+    assert fleet.errors(staged) == {}
+
+    result = sequencer.start()
+    assert set(result["Modules"]) == set(ADDRESSES)
+    assert all(simulated_instruments[address].started_ns is not None for address in ADDRESSES)
+
+
+def test_rejected_setting_is_not_staged(fleet):
+    def prepare(awg):
+        if awg.ip_address == ADDRESSES[0]:
+            awg.VoltageSubsystem.set_output_voltage(1, 2.5)  # rejected: out of range
+
+    sequencer = AWG_multi_module_sequencer(fleet)
+    staged = sequencer.stage(prepare=prepare)
+
+    assert list(fleet.errors(staged)) == [ADDRESSES[0]]
+    assert ADDRESSES[0] not in sequencer.staged
+
+
+def test_broken_barrier_is_reported(fleet, monkeypatch):
+    sequencer = AWG_multi_module_sequencer(fleet, strategy="threads")
+    sequencer.stage()
+
+    def broken_wait(self, timeout=None):
+        raise threading.BrokenBarrierError
+
+    monkeypatch.setattr(threading.Barrier, "wait", broken_wait)
+    result = sequencer.start(timeout=0.1)
+
+    assert all("Error" in module for module in result["Modules"].values())
+    assert result["Spread(us)"] is None
@@ -0,0 +1,59 @@
+from AWGSimulator import AWG_simulated_instrument, simulated_instruments
+
+
+def test_invalid_channel_returns_error(make_awg):
+    allocator = make_awg().allocator
+
+    for response in (allocator.free_space(5), allocator.next_segment_id(5),
+                     allocator.check_define(5, 1024), allocator.plan_defragmentation(5, 1024),
+                     allocator.define(5, 1024)):
+        assert response == {"Error": "Invalid channel. Must be 1, 2, 3, or 4"}
+
+
+def test_define_picks_lowest_free_id(make_awg):
+    allocator = make_awg().allocator
+
+    assert allocator.define(1, 1024)["SegmentID"] == 1
+    assert allocator.define(1, 1024)["SegmentID"] == 2
+    assert allocator.next_segment_id(1) == {"SegmentID": 3}
+
+
+def test_plan_reports_requested_length(make_awg):
+    allocator = make_awg().allocator
+    allocator.define(1, 1000)
+
+    assert allocator.plan_defragmentation(1, 1000)["Length"] == 1000
+    assert allocator.plan_defragmentation(1)["Length"] is None
+
+
+def test_execute_plan_keeps_moved_segment_ids(make_awg, address):
+    simulated_instruments[address] = AWG_simulated_instrument(memory_samples=4096)
+    awg = make_awg()
+    allocator = awg.allocator
+    for _ in range(4):
+        allocator.define(1, 1024)
+    allocator.delete(1, 2)
+    allocator.delete(1, 4)
+    reuploaded = []
+
+    plan = allocator.plan_defragmentation(1, 2048)
+    response = allocator.execute_plan(1, plan, lambda *args: reuploaded.append(args), length=2048)
+
+    assert "Error" not in response, response
+    assert response["SegmentID"] not in plan["Delete"]
+    assert reuploaded == [(1, moved_id, 1024) for moved_id in plan["Delete"]]
+    assert awg.session.query(":SYST:ERR?").startswith("0")
+    assert dict(awg.TraceSubsyatem.get_segment_catalog(1)["Segments"]) == {
+        **{moved_id: 1024 for moved_id in plan["Delete"]}, 3: 1024, response["SegmentID"]: 2048}
+
+
+def test_execute_plan_reports_rejected_define(make_awg):
+    awg = make_awg()
+    allocator = awg.allocator
+    allocator.define(1, 1024)
+    plan = {"Feasible": True, "Delete": [], "Redefine": []}
+    awg.TraceSubsyatem.define_waveform_segment(1, 2, 512)  # behind the allocator's back
+
+    response = allocator.execute_plan(1, plan, None, length=1024, segment_id=2)
+    assert response["Error"].startswith("-222")
+    assert 2 not in allocator.channels[1]["Lengths"]
@@ -0,0 +1,63 @@
+import numpy as np
+
+from AWGSequenceTable import (AWG_sequence_table, CONTROL_END_SCENARIO, CONTROL_END_SEQUENCE,
+                              CONTROL_INIT_SEQUENCE, pack_control_words, unpack_control_words)
+
+
+def test_control_word_round_trip():
+    control = pack_control_words(init_sequence=[True, False], end_sequence=[False, True], marker_enable=True,
+                                 sequence_advance="COND", segment_advance=[2, 3])
+    assert control.tolist() == [0x11120000, 0x41130000]
+
+    fields = unpack_control_words(control)
+    assert fields["init_sequence"].tolist() == [True, False]
+    assert fields["end_sequence"].tolist() == [False, True]
+    assert fields["segment_advance"].tolist() == [2, 3]
+
+
+def test_from_segments_marks_sequences():
+    table = AWG_sequence_table.from_segments([1, 2, 3, 4, 5], segment_loops=[1, 2, 3, 4, 5],
+                                             sequence_lengths=[2, 3], sequence_loops=[10, 20])
+    control = table["control"]
+
+    assert np.flatnonzero(control & CONTROL_INIT_SEQUENCE).tolist() == [0, 2]
+    assert np.flatnonzero(control & CONTROL_END_SEQUENCE).tolist() == [1, 4]
+    assert np.flatnonzero(control & CONTROL_END_SCENARIO).tolist() == [4]
+    assert table["sequence_loops"][[0, 2]].tolist() == [10, 20]
+    assert table.validate({1: 256, 2: 256, 3: 256, 4: 256, 5: 256}) == []
+
+
+def test_word_view_and_block_round_trip():
+    table = AWG_sequence_table.from_segments(np.arange(1, 101), segment_loops=3)
+    words = np.asarray(table)
+
+    assert words.shape == (100, 6) and words.dtype == np.uint32
+    assert np.shares_memory(words, table.entries)
+    assert words[:, 3].tolist() == list(range(1, 101))
+    for order in ("NORMal", "SWAPped"):
+        assert AWG_sequence_table.from_block(table.to_block(order), order) == table
+
+
+def test_slicing_and_concatenation():
+    first = AWG_sequence_table.from_segments([1, 2])
+    second = AWG_sequence_table.from_segments([3])
+    joined = first + second
+
+    assert len(joined) == 3
+    assert joined["segment_id"].tolist() == [1, 2, 3]
+    assert joined[1:]["segment_id"].tolist() == [2, 3]
+    joined["segment_loops"] = 7
+    assert first["segment_loops"].tolist() == [1, 1]
+
+
+def test_validate_reports_rejected_entries():
+    table = AWG_sequence_table.from_segments([1, 0, 9])
+    table["segment_loops"][2] = 0
+    table["start_offset"][0] = 300
+
+    errors = table.validate({1: 256, 9: 256})
+    assert "Invalid segment ID at entries 1" in errors
+    assert "Segment loop count of 0 at entries 2" in errors
+    assert "Offset beyond segment length at entries 0" in errors
+    assert "Segment not defined at entries 1" in errors
+    assert AWG_sequence_table(0).validate() == ["Sequence table is empty"]
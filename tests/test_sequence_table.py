@@ -0,0 +1,127 @@
+import numpy as np
+
+from AWGSequenceTable import AWG_sequence_table
+
+
+def table_words(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 2 ** 32, size=(count, 6), dtype=np.uint64).astype(np.uint32)
+
+
+def test_block_round_trip(make_awg):
+    awg = make_awg()
+    words = table_words(1000)
+    response = awg.Stable.write_sequence_table_block(10, words, block_entries=256)
+
+    assert response["Blocks"] == 4
+    read = awg.Stable.read_sequence_table_block(10, 1000)
+    assert np.array_equal(np.asarray(read["Entries"]), words)
+
+
+def test_block_messages_are_terminated(make_awg):
+    awg = make_awg()
+    resource = awg.connection.get_resource()
+    messages = []
+    write_raw = resource.write_raw
+    resource.write_raw = lambda message: messages.append(bytes(message)) or write_raw(message)
+
+    awg.Stable.write_sequence_table_block(0, table_words(300), block_entries=256)
+
+    assert len(messages) == 2
+    assert all(message.endswith(b"\n") for message in messages)
+    assert messages[1].startswith(b":STAB:DATA:BLOC 256,#41056")
+
+
+def test_commit_sends_only_changed_ranges(make_awg):
+    awg = make_awg()
+    words = table_words(500)
+    assert awg.Stable.commit_sequence_table(words)["Ranges"] == [(0, 500)]
+    assert awg.Stable.commit_sequence_table(words)["Ranges"] == []
+
+    changed = words.copy()
+    changed[100, 2] ^= 1
+    changed[400, 0] ^= 1
+    assert awg.Stable.commit_sequence_table(changed, merge_gap=8)["Ranges"] == [(100, 101), (400, 401)]
+
+
+def test_commit_syncs_once(make_awg):
+    awg = make_awg()
+    words = table_words(500)
+    awg.Stable.commit_sequence_table(words)
+    words[[10, 200, 400], 1] ^= 1
+    queries = []
+    query = awg.session.query
+    awg.session.query = lambda command: queries.append(command) or query(command)
+
+    assert len(awg.Stable.commit_sequence_table(words, merge_gap=8)["Ranges"]) == 3
+    assert queries == ["*OPC?;:SYST:ERR?"]
+
+
+def test_entry_write_syncs_only_when_shadow_is_used(make_awg):
+    awg = make_awg()
+    queries = []
+    query = awg.session.query
+    awg.session.query = lambda command: queries.append(command) or query(command)
+
+    awg.Stable.write_sequence_table_entry(0, [1, 2, 3, 4, 5, 6])
+    awg.Stable.write_sequence_table_block(1, table_words(4))
+    assert queries == []
+
+    awg.Stable.commit_sequence_table(table_words(8))
+    awg.Stable.write_sequence_table_entry(0, [1, 2, 3, 4, 5, 6])
+    assert queries == ["*OPC?;:SYST:ERR?"] * 2
+
+
+def test_block_write_after_commit_updates_shadow(make_awg):
+    awg = make_awg()
+    awg.Stable.commit_sequence_table(table_words(64))
+    words = table_words(64, seed=1)
+    awg.Stable.write_sequence_table_block(0, words)
+
+    assert awg.Stable.commit_sequence_table(words)["Ranges"] == []
+
+
+def test_queued_errors_are_not_blamed_on_the_write(make_awg):
+    awg = make_awg()
+    words = table_words(16)
+    awg.Stable.commit_sequence_table(words)
+    awg.VoltageSubsystem.set_output_offset(1, 99)  # rejected, left in the error queue
+
+    response = awg.Stable.write_sequence_table_entry(3, [1, 2, 3, 4, 5, 6])
+    assert "Error" not in response
+    assert response["Errors"][0].startswith("-222")
+    # The entry can't be trusted, so the next commit resends it
+    assert awg.Stable.commit_sequence_table(words)["Ranges"] == [(3, 4)]
+
+
+def test_rejected_write_is_resent(make_awg, sim):
+    awg = make_awg()
+    words = table_words(4)
+    awg.Stable.commit_sequence_table(words, sequence_id=sim.sequence_entries - 4)
+    response = awg.Stable.write_sequence_table_block(sim.sequence_entries - 2, table_words(4, seed=1))
+
+    assert response["Errors"][0].startswith("-222")
+    assert awg.Stable.commit_sequence_table(words, sequence_id=sim.sequence_entries - 4)["Ranges"] == [(2, 4)]
+
+
+def test_aborted_batch_invalidates_shadow(make_awg):
+    awg = make_awg()
+    words = table_words(16)
+    awg.Stable.commit_sequence_table(words)
+    try:
+        with awg.batch():
+            awg.Stable.write_sequence_table_entry(3, [1, 2, 3, 4, 5, 6])
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+
+    assert awg.Stable.commit_sequence_table(words)["Ranges"] == [(0, 16)]
+
+
+def test_reset_invalidates_shadow(make_awg):
+    awg = make_awg()
+    table = AWG_sequence_table.from_segments([1, 2, 3], segment_loops=[1, 10, 1])
+    awg.Stable.commit_sequence_table(table)
+    awg.Stable.reset_sequence_table()
+
+    assert awg.Stable.commit_sequence_table(table)["Ranges"] == [(0, 3)]
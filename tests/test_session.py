@@ -0,0 +1,31 @@
+from AWGController import AWG_Controller
+from AWGVoltageSubsystem import AWG_Voltage_Subsystem
+
+
+def test_subsystems_share_one_session():
+    awg = AWG_Controller("10.98.0.2")
+    subsystems = [awg.common_commands, awg.status, awg.arm_trig, awg.VoltageSubsystem, awg.output,
+                  awg.Stable, awg.TraceSubsyatem]
+
+    assert all(subsystem.session is awg.session for subsystem in subsystems)
+    assert all(subsystem.connection is awg.connection for subsystem in subsystems)
+    assert all(subsystem.log is awg.session.log for subsystem in subsystems)
+
+
+def test_subsystems_see_resource_opened_after_construction(make_awg):
+    awg = make_awg()
+
+    assert awg.VoltageSubsystem.resource
+    assert awg.VoltageSubsystem.set_output_offset(1, 0.1)["Status"]
+    assert float(awg.session.query(":VOLT1:OFFS?")) == 0.1
+
+    awg.connection.disconnect()
+    assert not awg.VoltageSubsystem.resource
+    assert awg.VoltageSubsystem.set_output_offset(1, 0.2) == {"Error": "Device not connected"}
+
+
+def test_standalone_subsystem_owns_a_session():
+    voltage = AWG_Voltage_Subsystem("10.98.0.3")
+
+    assert voltage.session.connection is voltage.connection
+    assert not voltage.resource
@@ -0,0 +1,29 @@
+import pytest
+
+from AWGSimulator import AWG_simulated_instrument
+
+
+def test_sequence_table_is_allocated_lazily():
+    instrument = AWG_simulated_instrument()
+    assert instrument.sequence_table.nbytes == 0
+
+    instrument.handle(b":STAB:DATA 10,1,2,3,4,5,6")
+    assert instrument.sequence_table.nbytes < 1024
+    assert instrument.handle(b":STAB:DATA? 10,6").strip() == b"1,2,3,4,5,6"
+    assert instrument.handle(b":STAB:DATA? 1000,6").strip() == b"0,0,0,0,0,0"
+
+    instrument.handle(b"*RST")
+    assert instrument.sequence_table.nbytes == 0
+
+
+def test_sequence_table_bounds():
+    instrument = AWG_simulated_instrument(sequence_entries=16)
+    instrument.handle(b":STAB:DATA 16,1,2,3,4,5,6")
+    assert instrument.handle(b":SYST:ERR?").startswith(b"-222")
+
+
+@pytest.mark.parametrize("command", [":INIT:IMM", ":ABOR"])
+def test_run_state(command):
+    instrument = AWG_simulated_instrument()
+    instrument.handle(command.encode())
+    assert (instrument.started_ns is not None) == (command == ":INIT:IMM")
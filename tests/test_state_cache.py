@@ -0,0 +1,78 @@
+import pytest
+
+
+def test_rejected_write_is_not_served(make_awg):
+    awg = make_awg(verification_policy="never", state_cache=True)
+    awg.VoltageSubsystem.set_output_voltage(1, 2.5)  # out of range: -222
+
+    assert awg.VoltageSubsystem.get_output_voltage(1)["Amplitude (V)"] == pytest.approx(0.5)
+    assert awg.cache.dirty_headers() == []
+
+
+def test_aborted_batch_does_not_skip_later_write(make_awg, sim):
+    awg = make_awg(verification_policy="never", state_cache=True)
+    with pytest.raises(RuntimeError):
+        with awg.batch():
+            awg.VoltageSubsystem.set_output_offset(1, 0.2)
+            raise RuntimeError("abort")
+
+    assert awg.VoltageSubsystem.get_output_offset(1)["Offset (V)"] == 0
+    awg.VoltageSubsystem.set_output_offset(1, 0.2)
+    assert float(sim.setting("VOLT1:OFFS")) == pytest.approx(0.2)
+
+
+def test_pending_value_is_not_served_or_skipped(make_awg):
+    awg = make_awg(verification_policy="never", state_cache=True)
+    awg.VoltageSubsystem.set_output_offset(1, 0.2)
+
+    assert awg.cache.dirty_headers() == [":VOLT1:OFFS"]
+    assert awg.cache.lookup(":VOLT1:OFFS?") is None
+    awg.VoltageSubsystem.set_output_offset(1, 0.2)
+    assert awg.cache.stats()["SkippedWrites"] == 0
+
+
+def test_clean_batch_confirms_and_skips_unchanged_writes(make_awg):
+    awg = make_awg(verification_policy="never", state_cache=True)
+    with awg.batch() as batch:
+        awg.VoltageSubsystem.set_output_offset(1, 0.2)
+    assert batch.result["Errors"] == []
+    assert awg.cache.dirty_headers() == []
+
+    awg.VoltageSubsystem.set_output_offset(1, 0.2)
+    assert awg.cache.stats()["SkippedWrites"] == 1
+    assert float(awg.session.query(":VOLT1:OFFS?")) == pytest.approx(0.2)
+
+
+def test_reset_clears_cache(make_awg):
+    awg = make_awg(verification_policy="always", state_cache=True)
+    awg.arm_trig.set_custom_sample_delay(1, "10")
+    assert awg.cache.stats()["Entries"] == 1
+
+    awg.session.write("*RST")
+    assert awg.cache.stats()["Entries"] == 0
+
+
+def test_hit_returns_the_instrument_response(make_awg):
+    awg = make_awg(verification_policy="never", state_cache=True)
+    sampling = awg.SamplingFrequency
+
+    assert sampling.get_dac_sample_frequency()["DAC Sample Frequency (Hz)"] == "6.4E10"
+    assert sampling.get_dac_sample_frequency()["DAC Sample Frequency (Hz)"] == "6.4E10"
+    assert awg.cache.stats()["Hits"] == 1
+
+    # Same value in another notation: skipped, and the getter still returns the instrument's text
+    sampling.set_dac_custom_frequency(64e9)
+    assert awg.cache.stats()["SkippedWrites"] == 1
+    assert sampling.get_dac_sample_frequency()["DAC Sample Frequency (Hz)"] == "6.4E10"
+
+
+def test_confirmed_write_is_not_served(make_awg, sim):
+    awg = make_awg(verification_policy="never", state_cache=True)
+    with awg.batch():
+        awg.SamplingFrequency.set_dac_custom_frequency(60e9)
+    sim.settings["FREQ:RAST"] = "6.0E10"  # the instrument's own formatting
+
+    assert awg.cache.lookup(":FREQ:RAST?") is None
+    assert awg.SamplingFrequency.get_dac_sample_frequency()["DAC Sample Frequency (Hz)"] == "6.0E10"
+    awg.SamplingFrequency.set_dac_custom_frequency(60e9)
+    assert awg.cache.stats()["SkippedWrites"] == 1
@@ -0,0 +1,106 @@
+import time
+
+from AWGStatusMonitor import AWG_status_transitions
+from AWGStatusRegisters import RunStatus, StatusByte, VoltageStatus
+
+
+def test_monitor_reads_only_fired_groups(make_awg, sim):
+    awg = make_awg()
+    monitor = awg.status_monitor
+    response = monitor.configure(["QUES:VOLT", "OPER:RUN"])
+    assert response["Mechanism"] == "simulated"
+    assert monitor.wait(0.05) is None
+
+    sim.set_condition("QUES:VOLT", 0b101)
+    result = monitor.wait(1.0)
+
+    assert set(result["Groups"]) == {"QUES", "QUES:VOLT"}
+    assert result["Groups"]["QUES:VOLT"]["Condition"] == VoltageStatus.CHANNEL1 | VoltageStatus.CHANNEL3
+    assert monitor.wait(0.05) is None
+
+
+def test_monitor_drains_error_queue(make_awg):
+    awg = make_awg()
+    awg.status_monitor.configure(["OPER:RUN"])
+    awg.session.write(":NOT:A:COMMAND")
+
+    result = awg.status_monitor.wait(1.0)
+    assert result["Groups"] == {}
+    assert result["Errors"][0].startswith("-113")
+
+
+def test_background_monitor_calls_back(make_awg):
+    awg = make_awg()
+    monitor = awg.status_monitor
+    monitor.configure(["OPER:RUN"])
+    results = []
+    monitor.start(results.append)
+    try:
+        awg.session.write(":INIT:IMM")
+        deadline = time.time() + 2
+        while not results and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        monitor.stop()
+
+    assert results[0]["Groups"]["OPER:RUN"]["Condition"] == RunStatus.RUNNING
+    assert isinstance(results[0]["StatusByte"], StatusByte)
+    assert StatusByte.OPERATION in results[0]["StatusByte"]
+
+
+def test_monitor_requires_connection():
+    from AWGController import AWG_Controller
+
+    awg = AWG_Controller("10.98.0.1")
+    assert awg.status_monitor.configure() == {"Error": "Device not connected"}
+    assert awg.status.questionable_positive_transition(1) == {"Error": "Device not connected"}
+
+
+def test_snapshot_diff(make_awg, sim):
+    awg = make_awg()
+    first = awg.status.snapshot()
+    assert first["Changes"] is None
+    assert first["StatusByte"]["Value"] == StatusByte(0)
+
+    sim.set_condition("QUES:VOLT", 0b10)
+    second = awg.status.snapshot()
+    assert second["Changes"] == {"QUES:VOLT": {"Set": ["CHANNEL2"], "Cleared": []}}
+
+
+def test_snapshot_without_events_leaves_them_to_the_monitor(make_awg, sim):
+    awg = make_awg()
+    awg.status_monitor.configure(["QUES:VOLT"])
+    sim.set_condition("QUES:VOLT", 0b1)
+
+    snapshot = awg.status.snapshot(events=False)
+    assert "Event" not in snapshot["Groups"]["QUES:VOLT"]
+    result = awg.status_monitor.wait(1.0)
+    assert result["Groups"]["QUES:VOLT"]["Event"] == VoltageStatus.CHANNEL1
+
+
+def test_transitions_report_flipped_bits(make_awg, sim):
+    awg = make_awg()
+    sim.set_condition("QUES:VOLT", 0b10)
+    transitions = awg.status_transitions
+    transitions.sample()
+    sim.set_condition("QUES:VOLT", 0)
+    awg.session.write(":INIT:IMM")
+    transitions.sample()
+
+    edges = {(edge["Group"], edge["Bit"], edge["Rising"]) for edge in transitions.transitions(0)}
+    assert edges == {("QUES:VOLT", "CHANNEL2", False), ("OPER:RUN", "RUNNING", True)}
+
+
+def test_transitions_ring_buffer_and_stream(make_awg, sim):
+    awg = make_awg()
+    transitions = AWG_status_transitions(awg.status, depth=4)
+    for value in (0, 1, 0, 1, 0, 1):
+        sim.set_condition("QUES:VOLT", value)
+        transitions.sample()
+
+    # Only the transitions into the samples still held (3..5) are reported
+    assert [edge["Rising"] for edge in transitions.transitions(0)] == [True, False, True]
+
+    sim.set_condition("QUES:VOLT", 0)
+    edges = list(transitions.stream(interval=0, polls=1))
+    assert [(edge["Group"], edge["Bit"], edge["Rising"]) for edge in edges] == [("QUES:VOLT", "CHANNEL1", False)]
@@ -0,0 +1,122 @@
+import numpy as np
+
+from AWGStreamUploader import AWG_stream_uploader
+
+
+def fail_once(resource, name, call_number, predicate=lambda *args: True):
+    """Make the `call_number`-th matching call of a resource method time out once."""
+    method = getattr(resource, name)
+    calls = []
+
+    def wrapper(*args):
+        if predicate(*args):
+            calls.append(args)
+            if len(calls) == call_number:
+                raise TimeoutError("simulated timeout")
+        return method(*args)
+
+    setattr(resource, name, wrapper)
+    return calls
+
+
+def test_stream_upload_reblocks_chunks(make_awg, sim):
+    awg = make_awg()
+    codes = (np.arange(5120) % 251 - 125).astype(np.int8)
+    awg.TraceSubsyatem.define_waveform_segment(1, 1, len(codes))
+
+    uploader = AWG_stream_uploader(awg.TraceSubsyatem, block_size=1024, ack_interval=2)
+    chunks = np.array_split(codes, [700, 2000, 2100, 4500])
+    response = uploader.upload(1, 1, iter(chunks), total_samples=len(codes))
+
+    assert "Error" not in response, response
+    assert response["Samples"] == len(codes)
+    assert response["Blocks"] == 5
+    assert response["AcknowledgedOffset"] == len(codes)
+    assert np.array_equal(np.asarray(sim.segments[1][1]["data"], dtype=np.int8), codes)
+
+
+def test_write_timeout_resumes_from_acknowledged_offset(make_awg, sim):
+    awg = make_awg()
+    codes = (np.arange(4096) % 240 - 120).astype(np.int8)
+    awg.TraceSubsyatem.define_waveform_segment(1, 1, len(codes))
+    writes = fail_once(awg.connection.get_resource(), "write_raw", 4)
+    progress = []
+
+    uploader = AWG_stream_uploader(awg.TraceSubsyatem, block_size=512, ack_interval=3,
+                                   progress_callback=progress.append)
+    response = uploader.upload(1, 1, iter([codes]))
+
+    assert response["Retries"] == 1
+    assert response["AcknowledgedOffset"] == len(codes)
+    assert [p["AcknowledgedOffset"] for p in progress] == [1536, 3072, 4096]
+    # 8 blocks plus the one that timed out; the unacknowledged block 4 is sent again
+    assert len(writes) == 9
+    assert np.array_equal(np.asarray(sim.segments[1][1]["data"], dtype=np.int8), codes)
+
+
+def test_acknowledge_timeout_resends_pending_blocks(make_awg, sim):
+    awg = make_awg()
+    codes = (np.arange(2048) % 100 - 50).astype(np.int8)
+    awg.TraceSubsyatem.define_waveform_segment(1, 1, len(codes))
+    resource = awg.connection.get_resource()
+    writes = fail_once(resource, "write_raw", 0)
+    fail_once(resource, "query", 1, lambda message: message == "*OPC?")
+
+    uploader = AWG_stream_uploader(awg.TraceSubsyatem, block_size=512, ack_interval=2)
+    response = uploader.upload(1, 1, iter([codes]))
+
+    assert response["Retries"] == 1
+    assert len(writes) == 6
+    assert np.array_equal(np.asarray(sim.segments[1][1]["data"], dtype=np.int8), codes)
+
+
+def test_too_many_timeouts_report_acknowledged_offset(make_awg):
+    awg = make_awg()
+    codes = np.zeros(2048, dtype=np.int8)
+    awg.TraceSubsyatem.define_waveform_segment(1, 1, len(codes))
+    resource = awg.connection.get_resource()
+    write_raw = resource.write_raw
+    sent = []
+
+    def flaky(message):
+        sent.append(message)
+        if len(sent) > 2:
+            raise TimeoutError("simulated timeout")
+        return write_raw(message)
+
+    resource.write_raw = flaky
+    uploader = AWG_stream_uploader(awg.TraceSubsyatem, block_size=512, ack_interval=2, max_retries=2)
+    response = uploader.upload(1, 1, iter([codes]))
+
+    assert response["Error"] == "simulated timeout"
+    assert response["AcknowledgedOffset"] == 1024
+
+
+def test_stream_upload_from_file(make_awg, sim, tmp_path):
+    awg = make_awg()
+    codes = (np.arange(4096) % 200 - 100).astype(np.int8)
+    path = tmp_path / "waveform.bin"
+    codes.tofile(path)
+
+    uploader = AWG_stream_uploader(awg.TraceSubsyatem, block_size=1024)
+    response = uploader.upload_file(2, 1, str(path))
+
+    assert response["SegmentLength"] == len(codes)
+    assert np.array_equal(np.asarray(sim.segments[2][1]["data"], dtype=np.int8), codes)
+
+
+def test_resume_keeps_written_samples(make_awg, sim, tmp_path):
+    awg = make_awg()
+    codes = (np.arange(4096) % 120 - 60).astype(np.int8)
+    path = tmp_path / "waveform.bin"
+    codes.tofile(path)
+    uploader = AWG_stream_uploader(awg.TraceSubsyatem, block_size=1024)
+
+    awg.TraceSubsyatem.define_waveform_segment(3, 1, len(codes))
+    head = uploader.upload(3, 1, iter([codes[:2048]]))
+    assert head["AcknowledgedOffset"] == 2048
+
+    response = uploader.upload_file(3, 1, str(path), offset=head["AcknowledgedOffset"])
+    assert response["Samples"] == 2048
+    assert awg.session.query(":SYST:ERR?").startswith("0")  # no redefinition attempted
+    assert np.array_equal(np.asarray(sim.segments[3][1]["data"], dtype=np.int8), codes)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from AWGTrace import AWG_latency_histogram, command_header, read_trace
+
+
+def test_command_header():
+    assert command_header(":volt1:offs 0.1;:VOLT2:OFFS 0.2") == ":VOLT1:OFFS"
+    assert command_header(b":TRAC1:DATA 1,0,#41024" + bytes(1024)) == ":TRAC1:DATA"
+    assert command_header("*OPC?") == "*OPC?"
+    assert command_header("  ") == ""
+
+
+def test_histogram_percentiles():
+    histogram = AWG_latency_histogram()
+    for value in range(1, 100001):
+        histogram.record(value)
+
+    assert histogram.count == 100000
+    assert histogram.percentile(50) == pytest.approx(50000, rel=0.016)
+    assert histogram.percentile(99) == pytest.approx(99000, rel=0.016)
+    assert histogram.percentile(100) == histogram.max == 100000
+    assert histogram.summary()["Mean(ms)"] == pytest.approx(0.0500005)
+
+
+def test_histogram_is_exact_for_small_values():
+    histogram = AWG_latency_histogram()
+    for value in (3, 7, 7, 100):
+        histogram.record(value)
+
+    assert histogram.percentile(50) == 7
+    assert histogram.percentile(100) == 100
+    assert AWG_latency_histogram().percentile(50) == 0
+
+
+@pytest.mark.parametrize("format", ["jsonl", "binary"])
+def test_session_trace(make_awg, tmp_path, format):
+    awg = make_awg(verification_policy="never")
+    path = tmp_path / f"trace.{format}"
+    trace = awg.enable_trace(str(path), format)
+
+    awg.VoltageSubsystem.set_output_offset(1, 0.1)
+    awg.VoltageSubsystem.get_output_offset(1)
+    awg.TraceSubsyatem.define_waveform_segment(1, 1, 512)
+    awg.TraceSubsyatem.write_waveform_data_binary(1, 1, 0, np.zeros(512, dtype=np.int8))
+    assert awg.disable_trace() is trace
+
+    records = list(read_trace(str(path)))
+    assert [record["header"] for record in records] == [":VOLT1:OFFS", ":VOLT1:OFFS?", ":TRAC1:DEF", ":TRAC1:DATA"]
+    assert records[1]["received"] > 0
+    assert records[3]["sent"] > 512
+    assert all(record["latency_ns"] >= 0 and not record["error"] for record in records)
+    assert set(trace.summary()) == {":VOLT1:OFFS", ":VOLT1:OFFS?", ":TRAC1:DEF", ":TRAC1:DATA"}
+
+
+def test_trace_records_errors(make_awg):
+    awg = make_awg()
+    trace = awg.enable_trace()
+    with pytest.raises(TimeoutError):
+        awg.session.read()  # nothing to read
+
+    assert trace.records == 1 and trace.errors == 1
@@ -0,0 +1,66 @@
+import time
+
+import numpy as np
+import pytest
+
+from AWGConnection import AWG_connection
+from AWGSimulator import AWG_simulator_server
+from AWGTransport import socket_transport, visa_resource_string
+from IEEEBlock import ieee_block_message, parse_ieee_block
+
+
+@pytest.fixture
+def server(sim):
+    with AWG_simulator_server(sim, port=0) as server:
+        yield server
+
+
+@pytest.fixture
+def transport(server):
+    transport = socket_transport(server.host, server.port)
+    yield transport
+    transport.close()
+
+
+def test_resource_strings():
+    assert visa_resource_string("10.0.0.5") == "TCPIP0::10.0.0.5::inst0::INSTR"
+    assert visa_resource_string("10.0.0.5", "hislip") == "TCPIP0::10.0.0.5::hislip0::INSTR"
+    assert visa_resource_string("10.0.0.5", "visa-socket", 5026) == "TCPIP0::10.0.0.5::5026::SOCKET"
+    with pytest.raises(ValueError):
+        visa_resource_string("10.0.0.5", "socket")
+    with pytest.raises(ValueError):
+        AWG_connection("10.0.0.5", transport="gpib")
+
+
+def test_query(transport):
+    assert transport.query("*IDN?").startswith("Keysight")
+    assert transport.query(":VOLT1:OFFS 0.25;:VOLT1:OFFS?") == "0.25"
+
+
+def test_read_raw_reads_blocks_by_length(transport, sim):
+    codes = (np.arange(512) % 256 - 128).astype(np.int8)  # contains '\n' (10) bytes
+    transport.write(":TRAC1:DEF 1,512")
+    transport.write_raw(ieee_block_message(":TRAC1:DATA 1,0,", codes))
+    transport.write(":FORM:BORD SWAP;:TRAC1:DATA:BLOC? 1,0,512")
+
+    payload = parse_ieee_block(transport.read_raw())
+    assert np.array_equal(np.frombuffer(payload, dtype="<f4"), codes)
+    # The block's terminator was consumed, so the next response lines up
+    assert transport.query(":SYST:ERR?").startswith("0")
+
+
+def test_clear_discards_unread_responses(transport):
+    transport.write("*IDN?")
+    time.sleep(0.05)  # let the response arrive
+    transport.clear()
+    assert transport.query("*OPC?") == "1"
+
+
+def test_connect_over_socket(server):
+    connection = AWG_connection(server.host, transport="socket", port=server.port)
+    response = connection.connect()
+    try:
+        assert "Error" not in response
+        assert connection.get_resource().resource_name == f"TCPIP0::{server.host}::{server.port}::SOCKET"
+    finally:
+        connection.disconnect()
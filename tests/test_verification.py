@@ -0,0 +1,80 @@
+import pytest
+
+
+def test_always_reads_back_each_setter(make_awg):
+    awg = make_awg(verification_policy="always", state_cache=True)
+    awg.arm_trig.set_custom_sample_delay(1, "10")
+
+    # The read-back confirmed the written value
+    assert awg.cache.dirty_headers() == []
+    assert awg.cache.lookup(":ARM:SDEL1?") is not None
+
+
+def test_never_skips_read_back(make_awg):
+    awg = make_awg(verification_policy="never", state_cache=True)
+    awg.arm_trig.set_custom_sample_delay(1, "10")
+
+    assert awg.cache.dirty_headers() == [":ARM:SDEL1"]
+    assert awg.session.verified == {}
+
+
+def test_deferred_read_backs_ride_on_batch_sync(make_awg):
+    awg = make_awg(verification_policy="deferred")
+    with awg.batch() as batch:
+        for channel in (1, 2):
+            awg.arm_trig.set_custom_sample_delay(channel, "10")
+
+    assert set(batch.result["Verified"]) == {":ARM:SDEL1?", ":ARM:SDEL2?"}
+    assert float(batch.result["Verified"][":ARM:SDEL2?"]) == pytest.approx(10)
+    assert awg.session._deferred_queries == []
+
+
+def test_flush_verifications_outside_batch(make_awg):
+    awg = make_awg(verification_policy="deferred")
+    awg.arm_trig.set_custom_sample_delay(3, "20")
+
+    verified = awg.flush_verifications()
+    assert float(verified[":ARM:SDEL3?"]) == pytest.approx(20)
+
+
+def test_invalid_policy_is_rejected(make_awg):
+    awg = make_awg()
+    with pytest.raises(ValueError):
+        awg.set_verification_policy("sometimes")
+
+
+def test_deferred_queue_is_flushed_at_limit(make_awg, monkeypatch):
+    import AWGSession
+
+    monkeypatch.setattr(AWGSession, "MAX_DEFERRED_QUERIES", 3)
+    awg = make_awg(verification_policy="deferred")
+    for channel in (1, 2, 3, 4):
+        awg.arm_trig.set_custom_sample_delay(channel, "10")
+
+    assert set(awg.session.verified) == {":ARM:SDEL1?", ":ARM:SDEL2?", ":ARM:SDEL3?"}
+    assert awg.session._deferred_queries == [":ARM:SDEL4?"]
+
+
+def test_flush_verifications_splits_long_messages(make_awg):
+    awg = make_awg(verification_policy="deferred")
+    resource = awg.connection.get_resource()
+    messages = []
+    query = resource.query
+    resource.query = lambda message: messages.append(message) or query(message)
+    for channel in (1, 2, 3, 4):
+        awg.arm_trig.set_custom_sample_delay(channel, str(10 * channel))
+
+    verified = awg.session.flush_verifications(max_message_bytes=30)
+    assert messages == [":ARM:SDEL1?;:ARM:SDEL2?", ":ARM:SDEL3?;:ARM:SDEL4?"]
+    assert float(verified[":ARM:SDEL4?"]) == pytest.approx(40)
+
+
+def test_batch_sync_carries_read_backs_that_fit(make_awg):
+    awg = make_awg(verification_policy="deferred")
+    with awg.batch(max_message_bytes=45) as batch:
+        for channel in (1, 2, 3, 4):
+            awg.arm_trig.set_custom_sample_delay(channel, "10")
+
+    assert batch.result["Messages"] == 2
+    assert len(batch.result["Verified"]) == 4
+    assert awg.session._deferred_queries == []
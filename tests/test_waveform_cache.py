@@ -0,0 +1,69 @@
+import numpy as np
+
+from AWGWaveformCache import AWG_waveform_cache
+
+
+def waveform(seed, length=1024):
+    return np.random.default_rng(seed).integers(-128, 128, size=length, dtype=np.int8)
+
+
+def catalog(awg, channel=1):
+    # An empty catalog is reported as segment 0 of length 0
+    return {segment_id: length for segment_id, length in awg.TraceSubsyatem.get_segment_catalog(channel)["Segments"]
+            if segment_id != 0}
+
+
+def test_second_upload_is_a_hit(make_awg):
+    awg = make_awg()
+    cache = awg.waveform_cache
+    first = cache.upload(1, waveform(0))
+    second = cache.upload(1, waveform(0))
+
+    assert not first["Hit"] and second["Hit"]
+    assert second["SegmentID"] == first["SegmentID"]
+    assert awg.TraceSubsyatem.get_segment_selection(1)["Selected_Segment"] == first["SegmentID"]
+    assert cache.upload(2, waveform(0))["Hit"] is False  # segment memory is per channel
+    assert cache.stats()["Hits"] == 1 and cache.stats()["Misses"] == 2
+
+
+def test_rebuild_after_reconnect(make_awg):
+    awg = make_awg()
+    segment_id = awg.waveform_cache.upload(1, waveform(0))["SegmentID"]
+    awg.connection.disconnect()
+    awg.connection.connect()
+
+    cache = AWG_waveform_cache(awg.TraceSubsyatem)
+    response = cache.upload(1, waveform(0))
+    assert response["Hit"] and response["SegmentID"] == segment_id
+
+
+def test_overwritten_segment_is_uploaded_again(make_awg):
+    awg = make_awg()
+    cache = awg.waveform_cache
+    segment_id = cache.upload(1, waveform(0))["SegmentID"]
+    awg.TraceSubsyatem.set_segment_comment(1, segment_id, "changed elsewhere")
+
+    assert cache.upload(1, waveform(0))["Hit"] is False
+
+
+def test_least_recently_used_is_evicted(make_awg):
+    awg = make_awg()
+    cache = AWG_waveform_cache(awg.TraceSubsyatem, awg.allocator, max_samples=2048)
+    first = cache.upload(1, waveform(0))["SegmentID"]
+    cache.upload(1, waveform(1))
+    cache.upload(1, waveform(0))  # the first waveform is now the most recently used
+    third = cache.upload(1, waveform(2))["SegmentID"]
+
+    assert cache.lookup(1, waveform(1)) is None
+    assert cache.lookup(1, waveform(0)) == first
+    assert set(catalog(awg)) == {first, third}
+
+
+def test_failed_upload_releases_segment(make_awg):
+    awg = make_awg()
+    awg.TraceSubsyatem.write_waveform_data_binary = lambda *args, **kwargs: {"Error": "write failed"}
+
+    assert awg.waveform_cache.upload(1, waveform(0)) == {"Error": "write failed"}
+    assert catalog(awg) == {}
+    assert awg.allocator.channels[1]["Lengths"] == {}
+    assert awg.waveform_cache.lookup(1, waveform(0)) is None
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from AWGWaveforms import (AWG_waveform_synthesizer, PRBS_TAPS, chirp, iq_component, multitone, prbs,
+                          prbs_bits, pulse_train, qam_symbols, sine)
+
+
+def reference_lfsr(order, length):
+    """Bit-serial Fibonacci LFSR, all-ones seed: bit i of the state is b[n + i]."""
+    degree, tap = PRBS_TAPS[order]
+    state = (1 << degree) - 1
+    bits = []
+    for _ in range(length):
+        bits.append(state & 1)
+        feedback = (state ^ (state >> (degree - tap))) & 1
+        state = (state >> 1) | (feedback << (degree - 1))
+    return bits
+
+
+@pytest.mark.parametrize("order", sorted(PRBS_TAPS))
+def test_prbs_bits_match_reference_lfsr(order):
+    assert prbs_bits(order, 5000).tolist() == reference_lfsr(order, 5000)
+
+
+@pytest.mark.parametrize("order", [7, 9, 11])
+def test_prbs_bits_are_maximal_length(order):
+    period = 2 ** order - 1
+    bits = prbs_bits(order, 2 * period)
+
+    assert np.array_equal(bits[:period], bits[period:])
+    assert bits[:period].sum() == 2 ** (order - 1)
+
+
+def test_prbs_generator_holds_each_bit_for_a_symbol():
+    synth = AWG_waveform_synthesizer(64e9, chunk_samples=1000)
+    codes = synth.render(prbs(7, 16e9), 4 * 300)
+
+    expected = np.where(np.repeat(prbs_bits(7, 300), 4), 127, -127)
+    assert np.array_equal(codes[:1200], expected)
+
+
+def test_render_pads_to_granularity():
+    synth = AWG_waveform_synthesizer(64e9)
+    codes = synth.render(sine(1e9), 1000, pad_value=5)
+
+    assert len(codes) == 1024 and codes.dtype == np.int8
+    assert np.all(codes[1000:] == 5)
+    with pytest.raises(ValueError):
+        synth.render(sine(1e9), 1000, out=np.empty(1000, dtype=np.int8))
+
+
+@pytest.mark.parametrize("generator", [sine(1.1e9, phase=0.3), multitone([1e9, 2.5e9, 7e9]),
+                                       chirp(1e9, 5e9, 1e-7), pulse_train(1e-9, 3e-10, 5e-11)])
+def test_chunking_does_not_change_the_waveform(generator):
+    whole = AWG_waveform_synthesizer(64e9).render(generator, 10000)
+    chunked = AWG_waveform_synthesizer(64e9, chunk_samples=777)
+
+    assert np.array_equal(chunked.render(generator, 10000), whole)
+    assert np.array_equal(np.concatenate([chunk.copy() for chunk in chunked.chunks(generator, 10000)]), whole)
+
+
+def test_sine_matches_reference_far_from_zero():
+    synth = AWG_waveform_synthesizer(64e9, chunk_samples=4096)
+    frequency = synth.coherent_frequency(1.234e9, 4096)
+    work = np.empty(4096, dtype=np.float32)
+    start = 10 ** 10  # several seconds into a long waveform
+    sine(frequency, phase=0.5)(synth, start, work)
+
+    index = np.arange(start, start + 4096, dtype=np.float64)
+    cycles = np.mod(index * (frequency / 64e9), 1.0)
+    reference = np.sin(2 * np.pi * cycles + 0.5)
+    assert np.max(np.abs(work - reference)) < 0.5 / 127
+
+
+def test_coherent_frequency_has_whole_cycles():
+    synth = AWG_waveform_synthesizer(64e9)
+    frequency = synth.coherent_frequency(1.234e9, 4096)
+
+    assert (frequency * 4096 / 64e9) == pytest.approx(round(frequency * 4096 / 64e9))
+    assert synth.coherent_frequency(1.0, 4096) == 64e9 / 4096
+
+
+def test_pulse_train_levels():
+    synth = AWG_waveform_synthesizer(64e9)
+    codes = synth.render(pulse_train(1e-9, 2.5e-10), 64)
+
+    assert codes[:16].tolist() == [127] * 16 and codes[16:64].tolist() == [-127] * 48
+
+
+def test_qam_symbols_have_unit_power():
+    symbols = qam_symbols(16, 100000, seed=1)
+
+    assert np.mean(np.abs(symbols) ** 2) == pytest.approx(1.0, rel=0.02)
+    assert len(np.unique(np.round(symbols.real, 6))) == 4
+    with pytest.raises(ValueError):
+        qam_symbols(8, 10)
+
+
+def test_iq_component_repeats_baseband():
+    baseband = np.array([0.5 + 0.25j, -0.5 - 1j, 1j, 0.0])
+    synth = AWG_waveform_synthesizer(64e9)
+    out = np.empty(10, dtype=np.float32)
+    iq_component(baseband, "Q")(synth, 2, out)
+
+    assert out.tolist() == [1.0, 0.0, 0.25, -1.0, 1.0, 0.0, 0.25, -1.0, 1.0, 0.0]